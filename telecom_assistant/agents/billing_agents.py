@@ -1,6 +1,11 @@
 # CrewAI implementation
+import asyncio
 import os
-from typing import Dict, Any  # Removed Optional (unused)
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from config.config import BILLING_CREW_POOL_SIZE
 
 # MUST disable telemetry BEFORE importing CrewAI
 os.environ["OTEL_SDK_DISABLED"] = "true"
@@ -14,6 +19,9 @@ except Exception:  # pragma: no cover
     ChatOpenAI = None  # type: ignore
     get_all_crewai_tools = None  # type: ignore
 
+from utils.streaming import emit_message
+from orchestration.resources import RESOURCES
+
 try:
     from loguru import logger  # type: ignore
 except Exception:
@@ -59,14 +67,26 @@ Be specific about potential savings or benefits of your recommendations.
 # References to constants (to silence unused warnings until integrated)
 _ = (BILLING_PROMPT, ADVISOR_PROMPT)
 
-_CREW_CACHE = None
+def _crew_step(step: Any) -> None:
+    """Crew step_callback: surface agent thoughts/tool calls while the crew runs."""
+    tool = getattr(step, "tool", None)
+    text = f"Using {tool}" if tool else getattr(step, "thought", "") or getattr(step, "output", "")
+    emit_message("crew_ai", str(text)[:500], speaker="agent")
+
+
+def _crew_task(output: Any) -> None:
+    """Crew task_callback: report each finished task (bill analysis, plan review, ...)."""
+    agent = getattr(output, "agent", "")
+    summary = getattr(output, "summary", None) or str(getattr(output, "raw", output))[:300]
+    emit_message("crew_ai", str(summary), speaker=str(agent))
 
 
-def create_billing_crew(db_uri: str = "sqlite:///telecom_assistant/data/telecom.db"):
-    global _CREW_CACHE
-    if _CREW_CACHE is not None:
-        return _CREW_CACHE
+def create_billing_crew():
+    """A standalone billing crew; None while CrewAI or the API key is missing."""
+    return build_billing_crew()
 
+
+def build_billing_crew():
     llm = None
     if ChatOpenAI is not None:
         try:  # pragma: no cover
@@ -224,6 +244,9 @@ def create_billing_crew(db_uri: str = "sqlite:///telecom_assistant/data/telecom.
                 process=Process.sequential,
                 verbose=True,  # Enable output so user can see progress
                 max_rpm=10,  # Limit API calls
+                # Progress for streamed turns (no-ops otherwise)
+                step_callback=_crew_step,
+                task_callback=_crew_task,
             )
             if logger:
                 logger.info("Crew created successfully")
@@ -234,43 +257,149 @@ def create_billing_crew(db_uri: str = "sqlite:///telecom_assistant/data/telecom.
     else:
         if logger:
             logger.error(f"Cannot create crew: Crew={Crew}, billing_task={billing_task}, advisor_task={advisor_task}, synthesis_task={synthesis_task}")
-    _CREW_CACHE = crew
     if logger:
-        logger.info(f"Final crew cache: {crew is not None}")
+        logger.info(f"Crew created: {crew is not None}")
     return crew
 
 
+class BillingCrewPool:
+    """Billing crews checked out one per turn; at most `max_idle` are kept between turns.
+
+    A Crew keeps per-run state (task outputs, usage metrics, its rate limiter), so
+    concurrent kickoffs each take their own crew (more are built on demand) and a
+    crew is only reused once its previous turn has finished.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any] = build_billing_crew,
+        max_idle: int = BILLING_CREW_POOL_SIZE,
+        idle: Iterable[Any] = (),
+    ):
+        self.factory = factory
+        self.max_idle = max_idle
+        self._idle: List[Any] = list(idle)[:max_idle]
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "in_use": 0}
+
+    def acquire(self) -> Optional[Any]:
+        with self._lock:
+            crew = self._idle.pop() if self._idle else None
+            self._stats["reused" if crew is not None else "created"] += 1
+            self._stats["in_use"] += 1
+        if crew is None:
+            try:
+                crew = self.factory()
+            except Exception:
+                self._done(None)
+                raise
+        return crew
+
+    def release(self, crew: Any) -> None:
+        self._done(crew)
+
+    def _done(self, crew: Any) -> None:
+        with self._lock:
+            self._stats["in_use"] -= 1
+            if crew is not None and len(self._idle) < self.max_idle:
+                self._idle.append(crew)
+            else:
+                self._stats["discarded"] += 1
+
+    @contextmanager
+    def crew(self) -> Iterator[Optional[Any]]:
+        crew = self.acquire()
+        try:
+            yield crew
+        finally:
+            self.release(crew)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "idle": len(self._idle), "max_idle": self.max_idle}
+
+
+def build_billing_crews() -> Optional[BillingCrewPool]:
+    # The first crew shows whether CrewAI and the API key are usable at all
+    crew = build_billing_crew()
+    if crew is None:
+        return None
+    return BillingCrewPool(idle=[crew])
+
+
+def billing_crews() -> Optional[BillingCrewPool]:
+    """The process-wide crew pool; None while CrewAI or the API key is missing."""
+    return RESOURCES.get("billing_crews")
+
+
+def _not_initialized(customer_id: str, query: str) -> Dict[str, Any]:
+    return {
+        "query": query,
+        "customer_id": customer_id,
+        "error": "CrewAI not initialized",
+        "detail": "Missing dependencies or API key.",
+    }
+
+
+def _billing_result(customer_id: str, query: str, result: Any) -> Dict[str, Any]:
+    # Return the actual CrewAI response directly
+    return {
+        "customer_id": customer_id,
+        "query": query,
+        "bill_analysis": "Generated bill analysis (see raw)",
+        "plan_review": "Generated plan suitability review",
+        "recommendations": "Generated optimization suggestions",
+        "raw": str(result),
+        "status": "ok"
+    }
+
+
+def _billing_error(customer_id: str, query: str, e: Exception) -> Dict[str, Any]:
+    if logger:
+        logger.error(f"CrewAI billing execution error: {e}")
+    return {
+        "query": query,
+        "customer_id": customer_id,
+        "error": "Crew execution failed",
+        "detail": str(e)[:500],
+        "fallback": "Review recent bill vs previous; check unusual one-time charges; verify plan matches usage.",
+        "status": "error"
+    }
+
+
 def process_billing_query(customer_id: str, query: str) -> Dict[str, Any]:
-    crew = create_billing_crew()
-    if not crew:
-        return {
-            "query": query,
-            "customer_id": customer_id,
-            "error": "CrewAI not initialized",
-            "detail": "Missing dependencies or API key.",
-        }
-    try:  # pragma: no cover
-        result = crew.kickoff(inputs={"customer_id": customer_id, "query": query})
-        result_text = str(result)
-        
-        # Return the actual CrewAI response directly
-        return {
-            "customer_id": customer_id,
-            "query": query,
-            "bill_analysis": "Generated bill analysis (see raw)",
-            "plan_review": "Generated plan suitability review",
-            "recommendations": "Generated optimization suggestions",
-            "raw": result_text,
-            "status": "ok"
-        }
+    pool = billing_crews()
+    if pool is None:
+        return _not_initialized(customer_id, query)
+    # Each turn kicks off its own crew, so concurrent turns never share run state
+    try:
+        with pool.crew() as crew:
+            if not crew:
+                return _not_initialized(customer_id, query)
+            result = crew.kickoff(inputs={"customer_id": customer_id, "query": query})
+        return _billing_result(customer_id, query, result)
     except Exception as e:
-        if logger:
-            logger.error(f"CrewAI billing execution error: {e}")
-        return {
-            "query": query,
-            "customer_id": customer_id,
-            "error": "Crew execution failed",
-            "detail": str(e)[:500],
-            "fallback": "Review recent bill vs previous; check unusual one-time charges; verify plan matches usage.",
-            "status": "error"
-        }
+        return _billing_error(customer_id, query, e)
+
+
+async def aprocess_billing_query(customer_id: str, query: str) -> Dict[str, Any]:
+    """Async variant via Crew.kickoff_async.
+
+    CrewAI's kickoff_async still runs the crew on a worker thread, so billing turns
+    hold a thread for the crew's duration; the event loop itself stays free.
+    """
+    pool = billing_crews()
+    if pool is None:
+        return _not_initialized(customer_id, query)
+    try:
+        inputs = {"customer_id": customer_id, "query": query}
+        with pool.crew() as crew:
+            if not crew:
+                return _not_initialized(customer_id, query)
+            if hasattr(crew, "kickoff_async"):
+                result = await crew.kickoff_async(inputs=inputs)
+            else:
+                result = await asyncio.to_thread(crew.kickoff, inputs=inputs)
+        return _billing_result(customer_id, query, result)
+    except Exception as e:
+        return _billing_error(customer_id, query, e)
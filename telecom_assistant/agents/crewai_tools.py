@@ -2,10 +2,8 @@
 
 from typing import Type
 from pydantic import BaseModel, Field
+from utils.customer_context import context_customer, context_plan, context_usage
 from utils.database import (
-    get_customer,
-    get_customer_usage,
-    get_service_plan,
     list_active_incidents,
     # New imports
     get_customer_tickets,
@@ -46,7 +44,7 @@ class CustomerDataTool(BaseTool):
 
     def _run(self, customer_id: str) -> str:
         """Fetch customer data from database"""
-        customer = get_customer(customer_id)
+        customer = context_customer(customer_id)
         if not customer:
             return f"Customer {customer_id} not found in database."
         
@@ -79,7 +77,7 @@ class UsageDataTool(BaseTool):
 
     def _run(self, customer_id: str) -> str:
         """Fetch customer usage data from database"""
-        usage_records = get_customer_usage(customer_id)
+        usage_records = context_usage(customer_id)
         if not usage_records:
             return f"No usage data found for customer {customer_id}."
         
@@ -112,7 +110,7 @@ class ServicePlanTool(BaseTool):
 
     def _run(self, plan_id: str) -> str:
         """Fetch service plan details from database"""
-        plan = get_service_plan(plan_id)
+        plan = context_plan(plan_id)
         if not plan:
             return f"Service plan {plan_id} not found in database."
         
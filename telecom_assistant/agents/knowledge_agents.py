@@ -1,15 +1,20 @@
 # LlamaIndex implementation
-from typing import Dict, Any
+import asyncio
+import os
+import time
+from typing import Dict, Any, Optional
 
 try:
     from llama_index.core import Settings, SimpleDirectoryReader, VectorStoreIndex, SQLDatabase  # type: ignore
+    from llama_index.core import StorageContext, load_index_from_storage  # type: ignore
     from llama_index.core.query_engine import RouterQueryEngine  # type: ignore
     from llama_index.core.tools import QueryEngineTool  # type: ignore
     from llama_index.core.selectors import LLMSingleSelector  # type: ignore
     from llama_index.llms.openai import OpenAI  # type: ignore
     from sqlalchemy import create_engine  # type: ignore
 except Exception as e:
-    Settings = SimpleDirectoryReader = VectorStoreIndex = OpenAI = object  # type: ignore
+    Settings = SimpleDirectoryReader = VectorStoreIndex = OpenAI = StorageContext = object  # type: ignore
+    load_index_from_storage = None  # type: ignore
     SQLDatabase = RouterQueryEngine = QueryEngineTool = LLMSingleSelector = object  # type: ignore
     create_engine = None  # type: ignore
     _IMPORT_ERROR = str(e)
@@ -21,7 +26,11 @@ try:  # Optional pandas import
 except Exception:  # pragma: no cover
     pd = None  # type: ignore
 
-from config.config import DOCUMENTS_DIR
+from config.config import DOCUMENTS_DIR, LLAMA_INDEX_DIR
+from utils.embeddings import LlamaIndexEmbedding, get_embedding_service
+from utils.ingestion import IngestionPipeline, LlamaIndexSink, Progress
+from utils.streaming import emit_token
+from orchestration.resources import RESOURCES
 try:
     from langchain_openai import OpenAIEmbeddings  # type: ignore
 except Exception:
@@ -50,32 +59,78 @@ Based on the query, select the most appropriate engine by analyzing if the quest
 Query: {query}
 """.strip()
 
-_ENGINE_CACHE = None
+INDEX_MANIFEST = "ingest_manifest.json"
+
+
+def _embed_model_name() -> str:
+    try:
+        return str(getattr(Settings.embed_model, "model_name", "") or type(Settings.embed_model).__name__)
+    except Exception:
+        return ""
+
+
+def load_vector_index(
+    documents_dir: str = DOCUMENTS_DIR, persist_dir: str = LLAMA_INDEX_DIR, progress: Optional[Progress] = None
+) -> Any:
+    """Vector index over `documents_dir`, persisted in `persist_dir` and updated incrementally.
+
+    The stored index is loaded and utils.ingestion embeds only the chunks of files
+    that changed since the last run; without a usable store everything is ingested once.
+    """
+    manifest_path = os.path.join(persist_dir, INDEX_MANIFEST)
+    index = None
+    if os.path.exists(manifest_path):
+        try:
+            start = time.perf_counter()
+            index = load_index_from_storage(StorageContext.from_defaults(persist_dir=persist_dir))
+            if logger:
+                logger.info(f"Loaded persisted knowledge index in {(time.perf_counter() - start) * 1000:.0f} ms")
+        except Exception as e:
+            if logger:
+                logger.warning(f"Persisted knowledge index unusable, re-ingesting: {e}")
+            os.remove(manifest_path)
+    if index is None:
+        index = VectorStoreIndex(nodes=[])
+    IngestionPipeline(
+        [LlamaIndexSink(index, persist_dir)], manifest_path, documents_dir,
+        embed_model=_embed_model_name(), progress=progress,
+    ).run()
+    return index
 
 
 def create_knowledge_engine() -> Any:
+    """The process-wide knowledge engine; an error dict (not cached) while it cannot be built."""
+    return RESOURCES.get("knowledge_engine")
+
+
+def build_knowledge_engine(progress: Optional[Progress] = None) -> Any:
     """Create and return a LlamaIndex router query engine for knowledge retrieval.
 
     Returns a RouterQueryEngine or placeholder when dependencies unavailable.
+    `progress` receives ingestion progress (see utils.ingestion).
     """
-    global _ENGINE_CACHE
     if Settings is object or OpenAI is object:
         return {"error": "Import failure", "detail": _IMPORT_ERROR}
-    if _ENGINE_CACHE is not None:
-        return _ENGINE_CACHE
     
     # Initialize LLM and service context (using Settings for newer API)
     try:
         Settings.llm = OpenAI(model="gpt-4o-mini", temperature=0)
     except Exception as e:
         return {"error": "LLM init failed", "detail": str(e)}
+
+    # Embed through the shared batched, cached service instead of LlamaIndex's default client
+    if LlamaIndexEmbedding is not None:
+        try:
+            Settings.embed_model = LlamaIndexEmbedding(get_embedding_service())
+        except Exception as e:
+            if logger:
+                logger.warning(f"Embedding service unavailable, using the LlamaIndex default: {e}")
     
-    # Load and index documents for vector search
+    # Load (or, when documents changed, build and persist) the index for vector search
     try:
-        reader = SimpleDirectoryReader(DOCUMENTS_DIR)
-        docs = reader.load_data()
-        vector_index = VectorStoreIndex.from_documents(docs)
-        vector_query_engine = vector_index.as_query_engine(similarity_top_k=3)
+        vector_index = load_vector_index(progress=progress)
+        # Streaming engine: process_knowledge_query forwards tokens as they are generated
+        vector_query_engine = vector_index.as_query_engine(similarity_top_k=3, streaming=True)
     except Exception as e:
         return {"error": "Vector index build failed", "detail": str(e)}
     
@@ -107,8 +162,7 @@ def create_knowledge_engine() -> Any:
     if sql_query_engine is None:
         if logger:
             logger.info("Using simple vector query engine (SQL engine not available)")
-        _ENGINE_CACHE = vector_query_engine
-        return _ENGINE_CACHE
+        return vector_query_engine
     
     # Create QueryEngineTools for both engines
     try:
@@ -140,8 +194,7 @@ def create_knowledge_engine() -> Any:
         if logger:
             logger.warning(f"Could not create QueryEngineTools: {e}")
         # Fallback to simple vector engine
-        _ENGINE_CACHE = vector_query_engine
-        return _ENGINE_CACHE
+        return vector_query_engine
     
     # Create RouterQueryEngine with LLMSingleSelector
     try:
@@ -156,33 +209,83 @@ def create_knowledge_engine() -> Any:
         if logger:
             logger.info("RouterQueryEngine created successfully with Vector + SQL routing")
         
-        _ENGINE_CACHE = router_query_engine
-        return _ENGINE_CACHE
+        return router_query_engine
         
     except Exception as e:
         if logger:
             logger.warning(f"Could not create RouterQueryEngine: {e}. Using simple vector engine.")
         # Fallback to simple vector engine (preserve existing functionality)
-        _ENGINE_CACHE = vector_query_engine
-        return _ENGINE_CACHE
+        return vector_query_engine
+
+
+def _engine_error(query: str, engine: Any) -> Dict[str, Any]:
+    if logger:
+        logger.error(f"Knowledge engine error: {engine}")
+    return {"query": query, "error": engine["error"], "detail": engine.get("detail"), "status": "error"}
+
+
+def _sources(response: Any) -> list:
+    if not hasattr(response, 'source_nodes'):
+        return []
+    return [getattr(s, 'node', None).get_content()[:120] for s in response.source_nodes if getattr(s,'node',None)]
+
+
+def _knowledge_result(query: str, answer: str, sources: list) -> Dict[str, Any]:
+    return {"query": query, "answer": answer, "sources": sources, "summary": "Knowledge response generated", "status": "ok"}
 
 
 def process_knowledge_query(query: str) -> Dict[str, Any]:
     """Process a knowledge retrieval query using the LlamaIndex query engine."""
     engine = create_knowledge_engine()
     if isinstance(engine, dict) and engine.get("error"):
-        if logger:
-            logger.error(f"Knowledge engine error: {engine}")
-        return {"query": query, "error": engine["error"], "detail": engine.get("detail"), "status": "error"}
+        return _engine_error(query, engine)
     answer = ""
     sources = []
     try:  # pragma: no cover
         response = engine.query(query)
-        answer = getattr(response, 'response', str(response))
-        if hasattr(response, 'source_nodes'):
-            sources = [getattr(s, 'node', None).get_content()[:120] for s in response.source_nodes if getattr(s,'node',None)]
+        if hasattr(response, 'response_gen'):
+            # StreamingResponse (vector engine); the SQL engine returns a plain Response
+            pieces = []
+            for token in response.response_gen:
+                emit_token("llamaindex", token)
+                pieces.append(token)
+            answer = "".join(pieces)
+        else:
+            answer = getattr(response, 'response', str(response))
+        sources = _sources(response)
     except Exception as e:
         if logger:
             logger.error(f"Knowledge query failed: {e}")
         answer = "Knowledge query failed; placeholder answer provided."
-    return {"query": query, "answer": answer, "sources": sources, "summary": "Knowledge response generated", "status": "ok"}
+    return _knowledge_result(query, answer, sources)
+
+
+async def aprocess_knowledge_query(query: str) -> Dict[str, Any]:
+    """Async variant built on engine.aquery (retrieval and synthesis are awaited)."""
+    engine = create_knowledge_engine()
+    if isinstance(engine, dict) and engine.get("error"):
+        return _engine_error(query, engine)
+    answer = ""
+    sources = []
+    try:  # pragma: no cover
+        response = await engine.aquery(query)
+        if hasattr(response, 'async_response_gen'):
+            pieces = []
+            async for token in response.async_response_gen():
+                emit_token("llamaindex", token)
+                pieces.append(token)
+            answer = "".join(pieces)
+        elif hasattr(response, 'response_gen'):
+            # Older LlamaIndex returns a sync generator from aquery; drain it off the loop
+            pieces = await asyncio.to_thread(list, response.response_gen)
+            for token in pieces:
+                emit_token("llamaindex", token)
+            answer = "".join(pieces)
+        else:
+            answer = getattr(response, 'response', str(response))
+        sources = _sources(response)
+    except Exception as e:
+        if logger:
+            logger.error(f"Knowledge query failed: {e}")
+        answer = "Knowledge query failed; placeholder answer provided."
+    return _knowledge_result(query, answer, sources)
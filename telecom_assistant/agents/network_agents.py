@@ -1,6 +1,10 @@
 # AutoGen implementation
-from typing import Tuple, Dict, Any, List
-from config.config import OPENAI_API_KEY
+import asyncio
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+from config.config import NETWORK_SESSION_POOL_SIZE, OPENAI_API_KEY
 from utils.database import (
     list_active_incidents,
     search_common_network_issues,
@@ -8,6 +12,12 @@ from utils.database import (
     get_device_compatibility,
     get_covered_regions
 )
+from utils.async_database import (
+    alist_active_incidents,
+    asearch_common_network_issues,
+    aget_device_compatibility,
+    aget_covered_regions,
+)
 
 try:
     import autogen  # type: ignore
@@ -15,6 +25,9 @@ try:
 except Exception:  # pragma: no cover
     UserProxyAgent = AssistantAgent = GroupChat = GroupChatManager = object  # type: ignore
 
+from utils.streaming import emit_message
+from orchestration.resources import RESOURCES
+
 try:
     from loguru import logger  # type: ignore
 except Exception:
@@ -80,7 +93,12 @@ Your final answer should always be a numbered list of actions the customer can t
 IMPORTANT: End your response with "TERMINATE" after providing the complete troubleshooting plan to signal conversation completion.
 """.strip()
 
-_NETWORK_AGENT_CACHE = None
+def _forward_message(sender: Any, message: Any, recipient: Any, silent: bool) -> Any:
+    """process_message_before_send hook: stream each group-chat turn, message unchanged."""
+    content = message.get("content") if isinstance(message, dict) else message
+    if content:
+        emit_message("autogen", str(content), speaker=getattr(sender, "name", ""))
+    return message
 
 
 def _build_llm_config() -> Dict[str, Any]:
@@ -100,82 +118,158 @@ def _build_llm_config() -> Dict[str, Any]:
     }
 
 
-def create_network_agents(db_uri: str = "sqlite:///telecom_assistant/data/telecom.db") -> Tuple[Any, Any]:
-    global _NETWORK_AGENT_CACHE
-    if _NETWORK_AGENT_CACHE is not None:
-        return _NETWORK_AGENT_CACHE
+# Tool functions for AutoGen function calling
+#
+# Each tool has a sync version (used by initiate_chat) and an async one (used by
+# a_initiate_chat): AutoGen awaits coroutine tools but calls plain ones on the event
+# loop, so the async versions run their lookups through utils.async_database and
+# start independent lookups together.
+
+def _uncovered_region_message(region: str, covered_regions: List[str]) -> Optional[str]:
+    """Message for a region outside network monitoring, None when covered (or no region)."""
+    if not region:
+        return None
+    # Check if the region is covered (case-insensitive partial match)
+    is_covered = any(region.lower() in loc.lower() or loc.lower() in region.lower() for loc in covered_regions)
+    if is_covered:
+        return None
+    regions_list = ", ".join(covered_regions)
+    return (
+        f"'{region}' is not in our network monitoring coverage area. "
+        f"We currently monitor these regions: {regions_list}. "
+        f"For issues in other areas, please contact your local carrier support."
+    )
+
+
+def _format_incidents(region: str, incidents: List[Dict[str, Any]]) -> str:
+    if not incidents:
+        return f"No active incidents{' in ' + region if region else ''}. All networks operating normally."
+    result = f"Found {len(incidents)} active incident(s):\n"
+    for inc in incidents:
+        result += (
+            f"- [{inc['incident_id']}] {inc['incident_type']} in {inc['location']}\n"
+            f"  Affected: {inc['affected_services']}, Severity: {inc['severity']}, Status: {inc['status']}\n"
+        )
+    return result
+
+
+def _format_issues(keyword: str, issues: List[Dict[str, Any]]) -> str:
+    if not issues:
+        return f"No knowledge base entries found for: {keyword}"
+    result = f"Found {len(issues)} common issue(s) matching '{keyword}':\n"
+    for issue in issues[:3]:  # Limit to top 3
+        result += (
+            f"\n{issue['issue_category']}:\n"
+            f"  Symptoms: {issue['typical_symptoms'][:100]}...\n"
+            f"  Steps: {issue['troubleshooting_steps'][:150]}...\n"
+        )
+    return result
+
+
+def _format_devices(device_make: str, devices: List[Dict[str, Any]]) -> str:
+    if not devices:
+        return f"No device information found for: {device_make}"
+    result = f"Device compatibility info for {device_make}:\n"
+    for device in devices[:2]:
+        result += (
+            f"\n{device['device_model']} - {device['network_technology']}:\n"
+            f"  Known Issues: {device['known_issues']}\n"
+            f"  Settings: {device['recommended_settings']}\n"
+        )
+    return result
+
+
+def check_network_incidents(region: str = "") -> str:
+    """Check for active network incidents in a region. Returns incident details or confirms no issues."""
+    message = _uncovered_region_message(region, get_covered_regions())
+    return message or _format_incidents(region, list_active_incidents(region if region else None))
+
+
+async def acheck_network_incidents(region: str = "") -> str:
+    # Both lookups at once; the incidents are dropped if the region turns out not to be covered
+    covered_regions, incidents = await asyncio.gather(
+        aget_covered_regions(), alist_active_incidents(region if region else None))
+    return _uncovered_region_message(region, covered_regions) or _format_incidents(region, incidents)
+
+
+def search_network_issue_kb(keyword: str) -> str:
+    """Search knowledge base for common network issues and troubleshooting steps"""
+    return _format_issues(keyword, search_common_network_issues(keyword))
+
+
+async def asearch_network_issue_kb(keyword: str) -> str:
+    return _format_issues(keyword, await asearch_common_network_issues(keyword))
+
 
+def get_device_info(device_make: str) -> str:
+    """Get device-specific troubleshooting information"""
+    return _format_devices(device_make, get_device_compatibility(device_make))
+
+
+async def aget_device_info(device_make: str) -> str:
+    return _format_devices(device_make, await aget_device_compatibility(device_make))
+
+
+FUNCTION_MAP = {
+    "check_network_incidents": check_network_incidents,
+    "search_network_issue_kb": search_network_issue_kb,
+    "get_device_info": get_device_info,
+}
+ASYNC_FUNCTION_MAP = {
+    "check_network_incidents": acheck_network_incidents,
+    "search_network_issue_kb": asearch_network_issue_kb,
+    "get_device_info": aget_device_info,
+}
+
+
+class NetworkAgentConfig:
+    """What every conversation shares: LLM configs, tool schemas and the tool functions.
+
+    Built once per process; nothing here changes while a chat runs.
+    """
+
+    def __init__(
+        self,
+        llm_config: Dict[str, Any],
+        llm_config_with_functions: Dict[str, Any],
+        function_map: Dict[str, Any],
+        async_function_map: Optional[Dict[str, Any]] = None,
+    ):
+        self.llm_config = llm_config
+        self.llm_config_with_functions = llm_config_with_functions
+        self.function_map = function_map
+        # Coroutine tools for a_initiate_chat sessions
+        self.async_function_map = async_function_map or function_map
+
+
+def _is_termination_msg(msg: Dict[str, Any]) -> bool:
+    """Check if message contains TERMINATE or is from solution_integrator"""
+    if msg.get("content"):
+        content = str(msg.get("content", "")).strip()
+        # Terminate if TERMINATE keyword found
+        if "TERMINATE" in content:
+            return True
+        # Terminate if solution integrator has provided a complete solution
+        # (numbered list with at least 5 steps)
+        if msg.get("name") == "solution_integrator" and content:
+            # Check for numbered steps (1., 2., etc.)
+            steps = re.findall(r'^\d+\.', content, re.MULTILINE)
+            if len(steps) >= 5:  # Complete solution has 5+ steps
+                return True
+    return False
+
+
+def build_network_config() -> Optional[NetworkAgentConfig]:
     llm_config = _build_llm_config()
     
     # If no API key, return None to trigger fallback
     if not llm_config:
         if logger:
             logger.warning("AutoGen agents not created: No API key")
-        _NETWORK_AGENT_CACHE = (None, None)
-        return None, None
-
-    # Create network incident checking function for AutoGen
-    def check_network_incidents(region: str = "") -> str:
-        """Check for active network incidents in a region. Returns incident details or confirms no issues."""
-        # Get list of regions we monitor
-        covered_regions = get_covered_regions()
-        
-        # If region specified, check if it's in our coverage
-        if region:
-            # Check if the region is covered (case-insensitive partial match)
-            is_covered = any(region.lower() in loc.lower() or loc.lower() in region.lower() for loc in covered_regions)
-            
-            if not is_covered:
-                regions_list = ", ".join(covered_regions)
-                return (
-                    f"'{region}' is not in our network monitoring coverage area. "
-                    f"We currently monitor these regions: {regions_list}. "
-                    f"For issues in other areas, please contact your local carrier support."
-                )
-        
-        # Check for incidents
-        incidents = list_active_incidents(region if region else None)
-        if not incidents:
-            return f"No active incidents{' in ' + region if region else ''}. All networks operating normally."
-        
-        result = f"Found {len(incidents)} active incident(s):\n"
-        for inc in incidents:
-            result += (
-                f"- [{inc['incident_id']}] {inc['incident_type']} in {inc['location']}\n"
-                f"  Affected: {inc['affected_services']}, Severity: {inc['severity']}, Status: {inc['status']}\n"
-            )
-        return result
-    
-    def search_network_issue_kb(keyword: str) -> str:
-        """Search knowledge base for common network issues and troubleshooting steps"""
-        issues = search_common_network_issues(keyword)
-        if not issues:
-            return f"No knowledge base entries found for: {keyword}"
-        
-        result = f"Found {len(issues)} common issue(s) matching '{keyword}':\n"
-        for issue in issues[:3]:  # Limit to top 3
-            result += (
-                f"\n{issue['issue_category']}:\n"
-                f"  Symptoms: {issue['typical_symptoms'][:100]}...\n"
-                f"  Steps: {issue['troubleshooting_steps'][:150]}...\n"
-            )
-        return result
-    
-    def get_device_info(device_make: str) -> str:
-        """Get device-specific troubleshooting information"""
-        devices = get_device_compatibility(device_make)
-        if not devices:
-            return f"No device information found for: {device_make}"
-        
-        result = f"Device compatibility info for {device_make}:\n"
-        for device in devices[:2]:
-            result += (
-                f"\n{device['device_model']} - {device['network_technology']}:\n"
-                f"  Known Issues: {device['known_issues']}\n"
-                f"  Settings: {device['recommended_settings']}\n"
-            )
-        return result
-    
+        return None
+    if UserProxyAgent is object or GroupChat is object:
+        return None
+
     # Register functions for AutoGen function calling
     functions_for_agents = [
         {
@@ -222,45 +316,29 @@ def create_network_agents(db_uri: str = "sqlite:///telecom_assistant/data/teleco
         }
     ]
     
-    # Add function map for execution
-    function_map = {
-        "check_network_incidents": check_network_incidents,
-        "search_network_issue_kb": search_network_issue_kb,
-        "get_device_info": get_device_info
-    }
-    
     # Update llm_config with functions
     llm_config_with_functions = {
         **llm_config,
         "functions": functions_for_agents
     }
 
-    # User proxy agent
-    user_proxy = None
-    network_diag_agent = None
-    device_expert_agent = None
-    soln_integrator_agent = None
+    return NetworkAgentConfig(llm_config, llm_config_with_functions, FUNCTION_MAP, ASYNC_FUNCTION_MAP)
+
+
+class NetworkSession:
+    """One conversation's agents and group chat, built on the shared config.
 
-    if UserProxyAgent is not object:
+    AutoGen agents keep per-peer chat history and reply counters, and the GroupChat
+    keeps the transcript, so a session is used by one conversation at a time and
+    reset() before it is reused.
+    """
+
+    def __init__(self, config: NetworkAgentConfig, asynchronous: bool = False):
+        self.asynchronous = asynchronous
+        self.user_proxy = None
+        self.manager = None
+        function_map = config.async_function_map if asynchronous else config.function_map
         try:  # pragma: no cover
-            # Define termination condition - stop when solution is provided
-            def is_termination_msg(msg):
-                """Check if message contains TERMINATE or is from solution_integrator"""
-                if msg.get("content"):
-                    content = str(msg.get("content", "")).strip()
-                    # Terminate if TERMINATE keyword found
-                    if "TERMINATE" in content:
-                        return True
-                    # Terminate if solution integrator has provided a complete solution
-                    # (numbered list with at least 5 steps)
-                    if msg.get("name") == "solution_integrator" and content:
-                        # Check for numbered steps (1., 2., etc.)
-                        import re
-                        steps = re.findall(r'^\d+\.', content, re.MULTILINE)
-                        if len(steps) >= 5:  # Complete solution has 5+ steps
-                            return True
-                return False
-            
             # User proxy - can respond to clarifying questions
             user_proxy = UserProxyAgent(
                 name="user_proxy",
@@ -269,14 +347,14 @@ def create_network_agents(db_uri: str = "sqlite:///telecom_assistant/data/teleco
                 max_consecutive_auto_reply=3,  # Allow up to 3 automatic responses
                 code_execution_config={"use_docker": False},
                 function_map=function_map,  # Register function execution
-                is_termination_msg=is_termination_msg,  # Add termination condition
+                is_termination_msg=_is_termination_msg,  # Add termination condition
             )
 
             # Network diagnostics agent with function calling
             network_diag_agent = AssistantAgent(
                 name="network_diagnostics",
                 system_message=NETWORK_DIAG_SYSMSG,
-                llm_config=llm_config_with_functions,  # Use config with functions
+                llm_config=config.llm_config_with_functions,  # Use config with functions
                 function_map=function_map,  # Register function execution
             )
 
@@ -284,7 +362,7 @@ def create_network_agents(db_uri: str = "sqlite:///telecom_assistant/data/teleco
             device_expert_agent = AssistantAgent(
                 name="device_expert",
                 system_message=DEVICE_EXPERT_SYSMSG,
-                llm_config=llm_config_with_functions,  # Enable function calling
+                llm_config=config.llm_config_with_functions,  # Enable function calling
                 function_map=function_map,  # Register function execution
             )
 
@@ -292,53 +370,134 @@ def create_network_agents(db_uri: str = "sqlite:///telecom_assistant/data/teleco
             soln_integrator_agent = AssistantAgent(
                 name="solution_integrator",
                 system_message=SOLN_INTEGRATOR_SYSMSG,
-                llm_config=llm_config,
+                llm_config=config.llm_config,
             )
-        except Exception:
-            user_proxy = network_diag_agent = device_expert_agent = soln_integrator_agent = None
 
-    manager = None
-    if GroupChat is not object and all([user_proxy, network_diag_agent, device_expert_agent, soln_integrator_agent]):
-        try:  # pragma: no cover
             group_chat = GroupChat(
                 agents=[user_proxy, network_diag_agent, device_expert_agent, soln_integrator_agent],
                 messages=[],
                 max_round=6,  # Reduced from 8 to 6 for more focused conversations
                 speaker_selection_method="auto",  # Let AutoGen decide speaker order
             )
-            manager = GroupChatManager(groupchat=group_chat, llm_config=llm_config)
-        except Exception:
-            manager = None
+            manager = GroupChatManager(groupchat=group_chat, llm_config=config.llm_config)
+            # Group-chat turns are surfaced as they happen when the turn is streamed
+            for agent in group_chat.agents:
+                if hasattr(agent, "register_hook"):
+                    agent.register_hook("process_message_before_send", _forward_message)
+            self.user_proxy, self.manager = user_proxy, manager
+        except Exception as e:
+            if logger:
+                logger.error(f"Failed to create AutoGen session: {e}")
 
-    _NETWORK_AGENT_CACHE = (user_proxy, manager)
-    return user_proxy, manager
+    @property
+    def ready(self) -> bool:
+        return self.user_proxy is not None and self.manager is not None
 
+    def transcript(self) -> List[str]:
+        return _transcript(self.manager)
 
-def process_network_query(query: str) -> Dict[str, Any]:
-    user_proxy, manager = create_network_agents()
-    if not user_proxy or not manager:
-        return {"query": query, "error": "AutoGen not initialized", "detail": "Missing autogen dependency or agent setup."}
-    chat_transcript = []
-    try:  # pragma: no cover
-        user_proxy.initiate_chat(manager, message=query)
-        if hasattr(manager.groupchat, 'messages'):
-            chat_transcript = [m.get('content','') if isinstance(m, dict) else str(m) for m in manager.groupchat.messages]
-    except Exception as e:
-        if logger:
-            logger.error(f"AutoGen network chat error: {e}")
-        return {
-            "query": query,
-            "error": "AutoGen chat failed",
-            "detail": str(e)[:500],
-            "fallback_plan": [
-                "Check for regional outages",
-                "Toggle airplane mode",
-                "Reset network/APN settings",
-                "Verify SIM provisioning",
-                "Escalate to Tier-2 with logs"
-            ],
-            "status": "error"
-        }
+    def reset(self) -> None:
+        """Forget this conversation: group-chat messages and every agent's history."""
+        group_chat = getattr(self.manager, "groupchat", None)
+        if group_chat is not None:
+            if hasattr(group_chat, "reset"):
+                group_chat.reset()
+            else:
+                group_chat.messages.clear()
+            for agent in group_chat.agents:
+                if hasattr(agent, "reset"):
+                    agent.reset()
+        if hasattr(self.manager, "reset"):
+            self.manager.reset()
+
+
+class NetworkSessionPool:
+    """Reusable NetworkSessions; at most `max_idle` are kept between conversations.
+
+    Concurrent conversations each take their own session (more are built on demand),
+    so the number of live sessions follows concurrency, not the number of users.
+    Sync and async sessions carry different tool functions and are pooled apart.
+    """
+
+    def __init__(self, config: NetworkAgentConfig, max_idle: int = NETWORK_SESSION_POOL_SIZE):
+        self.config = config
+        self.max_idle = max_idle
+        self._idle: Dict[bool, List[NetworkSession]] = {False: [], True: []}
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "in_use": 0}
+
+    def acquire(self, asynchronous: bool = False) -> NetworkSession:
+        with self._lock:
+            idle = self._idle[asynchronous]
+            session = idle.pop() if idle else None
+            self._stats["reused" if session else "created"] += 1
+            self._stats["in_use"] += 1
+        return session or NetworkSession(self.config, asynchronous)
+
+    def release(self, session: NetworkSession) -> None:
+        try:
+            session.reset()
+            keep = session.ready
+        except Exception as e:
+            if logger:
+                logger.warning(f"Discarding AutoGen session that failed to reset: {e}")
+            keep = False
+        with self._lock:
+            self._stats["in_use"] -= 1
+            idle = self._idle[session.asynchronous]
+            if keep and len(idle) < self.max_idle:
+                idle.append(session)
+            else:
+                self._stats["discarded"] += 1
+
+    @contextmanager
+    def session(self, asynchronous: bool = False) -> Iterator[NetworkSession]:
+        session = self.acquire(asynchronous)
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "idle": sum(map(len, self._idle.values())), "max_idle": self.max_idle}
+
+
+def build_network_sessions() -> Optional[NetworkSessionPool]:
+    config = build_network_config()
+    return NetworkSessionPool(config) if config is not None else None
+
+
+def network_sessions() -> Optional[NetworkSessionPool]:
+    """The process-wide session pool; None while AutoGen or the API key is missing."""
+    return RESOURCES.get("network_sessions")
+
+
+def _transcript(manager: Any) -> List[str]:
+    if not hasattr(manager.groupchat, 'messages'):
+        return []
+    return [m.get('content','') if isinstance(m, dict) else str(m) for m in manager.groupchat.messages]
+
+
+def _network_error(query: str, e: Exception) -> Dict[str, Any]:
+    if logger:
+        logger.error(f"AutoGen network chat error: {e}")
+    return {
+        "query": query,
+        "error": "AutoGen chat failed",
+        "detail": str(e)[:500],
+        "fallback_plan": [
+            "Check for regional outages",
+            "Toggle airplane mode",
+            "Reset network/APN settings",
+            "Verify SIM provisioning",
+            "Escalate to Tier-2 with logs"
+        ],
+        "status": "error"
+    }
+
+
+def _network_result(query: str, chat_transcript: List[str]) -> Dict[str, Any]:
     troubleshooting_plan = [
         "Check outages in region",
         "Toggle airplane mode",
@@ -353,3 +512,39 @@ def process_network_query(query: str) -> Dict[str, Any]:
         "summary": "Sequential troubleshooting generated",
         "status": "ok"
     }
+
+
+def _not_initialized(query: str) -> Dict[str, Any]:
+    return {"query": query, "error": "AutoGen not initialized", "detail": "Missing autogen dependency or agent setup."}
+
+
+def process_network_query(query: str) -> Dict[str, Any]:
+    pool = network_sessions()
+    if pool is None:
+        return _not_initialized(query)
+    # Each conversation gets its own group chat, so concurrent chats never share a transcript
+    with pool.session() as session:
+        if not session.ready:
+            return _not_initialized(query)
+        try:  # pragma: no cover
+            session.user_proxy.initiate_chat(session.manager, message=query)
+            chat_transcript = session.transcript()
+        except Exception as e:
+            return _network_error(query, e)
+    return _network_result(query, chat_transcript)
+
+
+async def aprocess_network_query(query: str) -> Dict[str, Any]:
+    """Async variant via a_initiate_chat (agent LLM calls and tool lookups are awaited)."""
+    pool = network_sessions()
+    if pool is None:
+        return _not_initialized(query)
+    with pool.session(asynchronous=True) as session:
+        if not session.ready:
+            return _not_initialized(query)
+        try:  # pragma: no cover
+            await session.user_proxy.a_initiate_chat(session.manager, message=query)
+            chat_transcript = session.transcript()
+        except Exception as e:
+            return _network_error(query, e)
+    return _network_result(query, chat_transcript)
@@ -1,6 +1,10 @@
 # LangChain implementation
-from typing import Dict, Any
-from utils.database import get_customer_usage, get_service_plan, get_coverage_quality, get_service_areas
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+from utils.database import fetch_all, get_customer_usage, get_service_plan, get_coverage_quality, get_service_areas
+from utils.async_database import afetch_all, aget_customer_usage, aget_service_plan, aget_coverage_quality, aget_service_areas
+from utils.streaming import langchain_callbacks
+from orchestration.resources import RESOURCES
 
 try:
     from langchain.agents import create_react_agent, AgentExecutor  # type: ignore
@@ -69,130 +73,129 @@ def _estimate_data_usage(activities: str) -> str:
     return f"Estimated monthly data need: ~{gb} GB (heuristic placeholder)"
 
 
-_SERVICE_EXECUTOR_CACHE = None
+def _format_usage(customer_id: str, usage: List[Dict[str, Any]]) -> str:
+    if not usage:
+        return f"No usage data found for {customer_id}"
+    latest = usage[0]
+    return (
+        f"Latest usage: {latest['data_used_gb']} GB data, "
+        f"{latest['voice_minutes_used']} voice mins, "
+        f"{latest['sms_count_used']} SMS, "
+        f"Bill: ₹{latest['total_bill_amount']}"
+    )
 
 
-def create_service_agent(db_uri: str = "sqlite:///telecom_assistant/data/telecom.db"):
-    global _SERVICE_EXECUTOR_CACHE
-    if _SERVICE_EXECUTOR_CACHE is not None:
-        return _SERVICE_EXECUTOR_CACHE
+def _format_plan(plan_id: str, plan: Optional[Dict[str, Any]]) -> str:
+    if not plan:
+        return f"Plan {plan_id} not found"
+    data = "Unlimited" if plan['unlimited_data'] else f"{plan['data_limit_gb']} GB"
+    voice = "Unlimited" if plan['unlimited_voice'] else f"{plan['voice_minutes']} mins"
+    intl_roaming = "Yes" if plan.get('international_roaming') else "No"
+    return (
+        f"{plan['name']}: ₹{plan['monthly_cost']}/month, "
+        f"Data: {data}, Voice: {voice}, "
+        f"International Roaming: {intl_roaming}, "
+        f"{plan['description']}"
+    )
+
+
+def _plans_query(filter_criteria: str) -> Tuple[str, str]:
+    """(cleaned filter, SQL) for list_all_plans."""
+    # Strip quotes if present (agent sometimes passes 'international' with quotes)
+    filter_criteria = filter_criteria.strip().strip("'").strip('"')
+    if filter_criteria.lower() == "international":
+        where = "WHERE international_roaming = 1"
+    elif filter_criteria.lower() == "unlimited":
+        where = "WHERE unlimited_data = 1"
+    else:
+        where = ""
+    sql = f"SELECT plan_id, name, monthly_cost, unlimited_data, international_roaming FROM service_plans {where} ORDER BY monthly_cost"
+    return filter_criteria, sql
+
+
+def _format_plans(filter_criteria: str, plans: List[Tuple]) -> str:
+    if not plans:
+        return f"No plans found matching '{filter_criteria}'"
+    result = f"Available plans ({len(plans)} found):\n"
+    for plan in plans:
+        plan_id, name, cost, unlimited, intl = plan
+        features = []
+        if unlimited:
+            features.append("Unlimited Data")
+        if intl:
+            features.append("Intl Roaming")
+        features_str = ", ".join(features) if features else "Standard"
+        result += f"  - {plan_id}: {name} (₹{cost}/month) [{features_str}]\n"
+    return result.strip()
+
+
+def _format_coverage(city: str, areas: List[Dict[str, Any]], coverage: List[List[Dict[str, Any]]]) -> str:
+    """`coverage[i]` is the coverage of `areas[i]`."""
+    if not areas:
+        return f"No coverage information found for {city}"
+    result = f"Coverage in {city}:\n"
+    for area, area_coverage in zip(areas, coverage):
+        if area_coverage:
+            cov = area_coverage[0]
+            result += f"  {area['district']}: {cov['signal_strength_category']}, {cov['avg_download_speed_mbps']} Mbps\n"
+    return result.strip()
+
+
+def create_service_agent():
+    """The process-wide recommendation AgentExecutor (built once, shared by every session)."""
+    return RESOURCES.get("service_executor")
+
+
+def build_service_agent():
     # TODO: Create an LLM instance
     llm = None
     if ChatOpenAI is not object:
         try:  # pragma: no cover
-            llm = ChatOpenAI(model_name="gpt-4o", temperature=0.2)
+            # streaming=True so callbacks see tokens; invoke() still returns the full result
+            llm = ChatOpenAI(model_name="gpt-4o", temperature=0.2, streaming=True)
         except Exception:
             llm = None
 
     # TODO: Create tools for the agent
-    # Create database query tools
+    # Create database query tools (each with a coroutine twin for executor.ainvoke)
     def get_usage_data(customer_id: str) -> str:
         """Get customer usage data from database"""
-        usage = get_customer_usage(customer_id)
-        if not usage:
-            return f"No usage data found for {customer_id}"
-        latest = usage[0]
-        return (
-            f"Latest usage: {latest['data_used_gb']} GB data, "
-            f"{latest['voice_minutes_used']} voice mins, "
-            f"{latest['sms_count_used']} SMS, "
-            f"Bill: ₹{latest['total_bill_amount']}"
-        )
-    
+        return _format_usage(customer_id, get_customer_usage(customer_id))
+
+    async def aget_usage_data(customer_id: str) -> str:
+        return _format_usage(customer_id, await aget_customer_usage(customer_id))
+
     def get_plan_details(plan_id: str) -> str:
         """Get service plan details from database"""
-        plan = get_service_plan(plan_id)
-        if not plan:
-            return f"Plan {plan_id} not found"
-        data = "Unlimited" if plan['unlimited_data'] else f"{plan['data_limit_gb']} GB"
-        voice = "Unlimited" if plan['unlimited_voice'] else f"{plan['voice_minutes']} mins"
-        intl_roaming = "Yes" if plan.get('international_roaming') else "No"
-        return (
-            f"{plan['name']}: ₹{plan['monthly_cost']}/month, "
-            f"Data: {data}, Voice: {voice}, "
-            f"International Roaming: {intl_roaming}, "
-            f"{plan['description']}"
-        )
-    
+        return _format_plan(plan_id, get_service_plan(plan_id))
+
+    async def aget_plan_details(plan_id: str) -> str:
+        return _format_plan(plan_id, await aget_service_plan(plan_id))
+
     def list_all_plans(filter_criteria: str = "all") -> str:
         """List all available service plans. Use filter_criteria to narrow down:
         'international' - plans with international roaming
         'unlimited' - plans with unlimited data
         'all' - all plans
         """
-        import sqlite3
-        import os
-        
-        # Strip quotes if present (agent sometimes passes 'international' with quotes)
-        filter_criteria = filter_criteria.strip().strip("'").strip('"')
-        
-        # Handle different database path formats
-        db_path = db_uri.replace("sqlite:///", "")
-        if not os.path.isabs(db_path):
-            # Relative path - make it absolute
-            db_path = os.path.join(os.getcwd(), db_path)
-        if not os.path.exists(db_path):
-            # Try with data/ prefix
-            db_path = os.path.join(os.getcwd(), "data", "telecom.db")
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        if filter_criteria.lower() == "international":
-            cursor.execute("""
-                SELECT plan_id, name, monthly_cost, unlimited_data, international_roaming 
-                FROM service_plans 
-                WHERE international_roaming = 1
-                ORDER BY monthly_cost
-            """)
-        elif filter_criteria.lower() == "unlimited":
-            cursor.execute("""
-                SELECT plan_id, name, monthly_cost, unlimited_data, international_roaming 
-                FROM service_plans 
-                WHERE unlimited_data = 1
-                ORDER BY monthly_cost
-            """)
-        else:
-            cursor.execute("""
-                SELECT plan_id, name, monthly_cost, unlimited_data, international_roaming 
-                FROM service_plans 
-                ORDER BY monthly_cost
-            """)
-        
-        plans = cursor.fetchall()
-        conn.close()
-        
-        if not plans:
-            return f"No plans found matching '{filter_criteria}'"
-        
-        result = f"Available plans ({len(plans)} found):\n"
-        for plan in plans:
-            plan_id, name, cost, unlimited, intl = plan
-            features = []
-            if unlimited:
-                features.append("Unlimited Data")
-            if intl:
-                features.append("Intl Roaming")
-            features_str = ", ".join(features) if features else "Standard"
-            result += f"  - {plan_id}: {name} (₹{cost}/month) [{features_str}]\n"
-        
-        return result.strip()
-    
+        filter_criteria, sql = _plans_query(filter_criteria)
+        return _format_plans(filter_criteria, fetch_all(sql))
+
+    async def alist_all_plans(filter_criteria: str = "all") -> str:
+        filter_criteria, sql = _plans_query(filter_criteria)
+        return _format_plans(filter_criteria, await afetch_all(sql))
+
     def check_coverage_in_area(city: str) -> str:
         """Check coverage quality in a specific city"""
-        areas = get_service_areas(city)
-        if not areas:
-            return f"No coverage information found for {city}"
-        
-        coverage = get_coverage_quality()
-        result = f"Coverage in {city}:\n"
-        for area in areas[:3]:
-            area_coverage = [c for c in coverage if c['area_id'] == area['area_id']]
-            if area_coverage:
-                cov = area_coverage[0]
-                result += f"  {area['district']}: {cov['signal_strength_category']}, {cov['avg_download_speed_mbps']} Mbps\n"
-        return result.strip()
-    
+        areas = get_service_areas(city)[:3]
+        return _format_coverage(city, areas, [get_coverage_quality(area_id=area['area_id']) for area in areas])
+
+    async def acheck_coverage_in_area(city: str) -> str:
+        areas = (await aget_service_areas(city))[:3]
+        # One coverage lookup per district, all at once
+        coverage = await asyncio.gather(*(aget_coverage_quality(area_id=area['area_id']) for area in areas))
+        return _format_coverage(city, areas, list(coverage))
+
     usage_query_tool = None
     plan_query_tool = None
     list_plans_tool = None
@@ -202,21 +205,25 @@ def create_service_agent(db_uri: str = "sqlite:///telecom_assistant/data/telecom
             usage_query_tool = Tool(
                 name="get_customer_usage",
                 func=get_usage_data,
+                coroutine=aget_usage_data,
                 description="Get customer usage history from database. Input: customer_id (e.g., CUST001)"
             )
             plan_query_tool = Tool(
                 name="get_plan_details",
                 func=get_plan_details,
+                coroutine=aget_plan_details,
                 description="Get service plan details from database. Input: plan_id (e.g., STD_500, BASIC_100)"
             )
             list_plans_tool = Tool(
                 name="list_all_plans",
                 func=list_all_plans,
+                coroutine=alist_all_plans,
                 description="List all available plans. Input: 'international' for plans with international roaming, 'unlimited' for unlimited data plans, or 'all' for all plans"
             )
             coverage_tool = Tool(
                 name="check_coverage_quality",
                 func=check_coverage_in_area,
+                coroutine=acheck_coverage_in_area,
                 description="Check coverage quality in a city. Input: city name (e.g., 'Mumbai', 'Delhi')"
             )
         except Exception:
@@ -278,31 +285,51 @@ def create_service_agent(db_uri: str = "sqlite:///telecom_assistant/data/telecom
             if logger:
                 logger.error(f"Failed to create AgentExecutor: {e}")
             executor = None
-    _SERVICE_EXECUTOR_CACHE = executor
     return executor
 
 
+def _recommendation_result(query: str, result: Any) -> Dict[str, Any]:
+    return {
+        "query": query,
+        "plan": "Derived plan (see raw)",
+        "benefits": ["Cost optimization", "Usage alignment", "Upgrade path"],
+        "estimated_usage": _estimate_data_usage(query),
+        "raw": str(result),
+        "status": "ok",
+    }
+
+
+def _recommendation_error(query: str, e: Exception) -> Dict[str, Any]:
+    if logger:
+        logger.error(f"LangChain service execution error: {e}")
+    return {
+        "query": query,
+        "error": "Service agent execution failed",
+        "detail": str(e)[:500],
+        "fallback": "Compare data/call/SMS usage to current limits; suggest next tier if >80% usage consistently.",
+        "status": "error",
+    }
+
+
 def process_recommendation_query(query: str) -> Dict[str, Any]:
     executor = create_service_agent()
     if not executor:
         return {"query": query, "error": "LangChain not initialized", "detail": "Dependencies or API key missing."}
     try:  # pragma: no cover
-        result = executor.invoke({"input": query})
-        return {
-            "query": query,
-            "plan": "Derived plan (see raw)",
-            "benefits": ["Cost optimization", "Usage alignment", "Upgrade path"],
-            "estimated_usage": _estimate_data_usage(query),
-            "raw": str(result),
-            "status": "ok",
-        }
+        # Final-answer tokens and tool calls go to the chat when the turn is streamed
+        result = executor.invoke({"input": query}, config={"callbacks": langchain_callbacks("langchain")})
+        return _recommendation_result(query, result)
+    except Exception as e:
+        return _recommendation_error(query, e)
+
+
+async def aprocess_recommendation_query(query: str) -> Dict[str, Any]:
+    """Async variant: the executor awaits the LLM instead of holding a thread."""
+    executor = create_service_agent()
+    if not executor:
+        return {"query": query, "error": "LangChain not initialized", "detail": "Dependencies or API key missing."}
+    try:  # pragma: no cover
+        result = await executor.ainvoke({"input": query}, config={"callbacks": langchain_callbacks("langchain")})
+        return _recommendation_result(query, result)
     except Exception as e:
-        if logger:
-            logger.error(f"LangChain service execution error: {e}")
-        return {
-            "query": query,
-            "error": "Service agent execution failed",
-            "detail": str(e)[:500],
-            "fallback": "Compare data/call/SMS usage to current limits; suggest next tier if >80% usage consistently.",
-            "status": "error",
-        }
+        return _recommendation_error(query, e)
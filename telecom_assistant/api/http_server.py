@@ -0,0 +1,361 @@
+# Headless HTTP/JSON service for the assistant (IVR, mobile app)
+#
+# One process-wide AsyncDispatcher (async graph behind the response cache) serves
+# every request. Connections are handled by a bounded worker pool with a bounded
+# wait queue: when all workers are busy and the queue is full, new connections get
+# an immediate 429 with Retry-After instead of piling up. Each turn has a timeout
+# (504 when exceeded).
+#
+#   GET  /healthz           liveness
+#   GET  /stats             server, dispatcher, cache and latency counters
+#   POST /v1/query          {"query", "customer_id"?, "history"?, "timeout"?} -> JSON answer
+#   POST /v1/query/stream   same body -> NDJSON events (status/message/token ..., then done|error)
+#
+# Run with:  python -m api.http_server --port 8080
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from config.config import API_HOST, API_PORT, API_QUEUE_SIZE, API_REQUEST_TIMEOUT, API_WORKERS
+from orchestration.streaming import stream_workflow, streaming_stats
+from utils.memory import ConversationMemory
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+MAX_BODY_BYTES = 64 * 1024
+# State keys returned to clients (the full state carries customer rows and evidence)
+RESPONSE_KEYS = ("final_response", "classification", "classifications", "status", "cache")
+
+
+class RequestError(Exception):
+    """Client error mapped to an HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _TimedWorkflow:
+    """invoke() through the dispatcher with a per-request timeout (for stream_workflow)."""
+
+    def __init__(self, dispatcher: Any, timeout: float):
+        self.dispatcher = dispatcher
+        self.timeout = timeout
+        self.timed_out = False
+
+    def invoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.dispatcher.invoke(state, self.timeout)
+        except (asyncio.TimeoutError, FutureTimeout):
+            self.timed_out = True
+            raise TimeoutError(f"No answer within {self.timeout:g}s")
+
+
+def build_state(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a request body and build the initial graph state."""
+    query = body.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'query' must be a non-empty string")
+    customer_info: Dict[str, Any] = {}
+    customer_context: Dict[str, Any] = {}
+    customer_id = body.get("customer_id")
+    if customer_id:
+        from utils.customer_context import load_customer_context
+        customer_context = load_customer_context(str(customer_id))
+        if not customer_context["customer"]:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown customer_id {customer_id!r}")
+        customer_info = customer_context["customer"]
+    history = body.get("history") or []
+    if not isinstance(history, list) or not all(isinstance(m, dict) for m in history):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'history' must be a list of {role, content}")
+    # Clients may send the whole chat; the turn carries only the bounded memory of it
+    history = ConversationMemory.from_history(history).history()
+    return {
+        "query": query.strip(),
+        "customer_info": customer_info,
+        "classification": "",
+        "intermediate_responses": {},
+        "final_response": "",
+        "chat_history": history,
+        "customer_context": customer_context,
+    }
+
+
+def _public(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: result[k] for k in RESPONSE_KEYS if k in result}
+
+
+class AssistantRequestHandler(BaseHTTPRequestHandler):
+    server: "AssistantHTTPServer"
+    server_version = "TelecomAssistant/1.0"
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(HTTPStatus.OK, self.server.stats())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for GET {self.path}"})
+
+    def do_POST(self) -> None:
+        try:
+            if self.path == "/v1/query":
+                body, state = self._request_state()
+                self._answer(state, self._timeout(body))
+            elif self.path == "/v1/query/stream":
+                body, state = self._request_state()
+                self._stream(state, self._timeout(body))
+            else:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"No route for POST {self.path}")
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self.server.count("failed")
+            if logger:
+                logger.error(f"HTTP request failed: {e}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error", "detail": str(e)[:300]})
+
+    def _request_state(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return body, build_state(body)
+
+    def _timeout(self, body: Dict[str, Any]) -> float:
+        # Clients may ask for less time than the server default, never more
+        try:
+            requested = float(body.get("timeout") or self.server.request_timeout)
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'timeout' must be a number of seconds")
+        return max(0.001, min(requested, self.server.request_timeout))
+
+    def _answer(self, state: Dict[str, Any], timeout: float) -> None:
+        start = time.perf_counter()
+        future = self.server.dispatcher.dispatch(state, timeout)
+        try:
+            # The dispatcher enforces the timeout; the margin only covers scheduling
+            result = future.result(timeout + 1.0)
+        except (asyncio.TimeoutError, FutureTimeout):
+            future.cancel()
+            self.server.count("timed_out")
+            self._send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": f"No answer within {timeout:g}s"})
+            return
+        self.server.count("answered")
+        self._send_json(HTTPStatus.OK, {**_public(result), "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+    def _stream(self, state: Dict[str, Any], timeout: float) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        workflow = _TimedWorkflow(self.server.dispatcher, timeout)
+        events = stream_workflow(workflow, state)
+        self.close_connection = True
+        try:
+            for event in events:
+                if event["type"] == "done":
+                    event = {**event, "result": _public(event["result"])}
+                    self.server.count("answered")
+                elif event["type"] == "error":
+                    self.server.count("timed_out" if workflow.timed_out else "failed")
+                self.wfile.write(json.dumps(event, default=str).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; the 200 headers are already out, so there is nobody to tell
+            self.server.count("disconnected")
+            if logger:
+                logger.info(f"{self.address_string()} disconnected mid-stream")
+        finally:
+            events.close()
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 (stdlib signature)
+        if logger:
+            logger.debug(f"{self.address_string()} {format % args}")
+
+
+def _drain_request(request: socket.socket, wait: float = 0.2) -> None:
+    """Consume headers and body of a request on the accept thread, for at most `wait`s in total.
+
+    The deadline covers the whole read, so a client trickling a byte at a time cannot
+    hold the accept thread for longer than a fast one.
+    """
+    deadline = time.monotonic() + wait
+    data = b""
+    while len(data) <= MAX_BODY_BYTES + 8192:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        request.settimeout(remaining)
+        try:
+            chunk = request.recv(65536)
+        except socket.timeout:
+            return
+        if not chunk:
+            return
+        data += chunk
+        head, sep, body = data.partition(b"\r\n\r\n")
+        if sep:
+            length = 0
+            for line in head.split(b"\r\n"):
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length" and value.strip().isdigit():
+                    length = int(value.strip())
+            if len(body) >= length:
+                return
+
+
+class AssistantHTTPServer(HTTPServer):
+    """HTTPServer with a bounded worker pool and admission control.
+
+    At most `workers` requests are processed and `queue_size` more wait; beyond
+    that the accept loop answers 429 itself, so overload never queues unbounded work.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        dispatcher: Any,
+        workers: int = 32,
+        queue_size: int = 64,
+        request_timeout: float = 60.0,
+    ):
+        super().__init__(address, AssistantRequestHandler)
+        self.dispatcher = dispatcher
+        self.workers = workers
+        self.queue_size = queue_size
+        self.request_timeout = request_timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._counters = {"accepted": 0, "rejected": 0, "answered": 0, "timed_out": 0, "failed": 0,
+                          "disconnected": 0, "active": 0}
+
+    def process_request(self, request: socket.socket, client_address: Any) -> None:
+        if not self._slots.acquire(blocking=False):
+            self.count("rejected")
+            self._reject(request)
+            return
+        self.count("accepted")
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request: socket.socket, client_address: Any) -> None:
+        self.count("active")
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.count("active", -1)
+            self._slots.release()
+
+    def _reject(self, request: socket.socket) -> None:
+        body = json.dumps({"error": "Server busy, retry later"}).encode("utf-8")
+        head = (
+            "HTTP/1.0 429 Too Many Requests\r\nContent-Type: application/json\r\n"
+            f"Retry-After: 1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        ).encode("ascii")
+        try:
+            # Read the (small, bounded) request first so the client is not cut off mid-send
+            _drain_request(request)
+            request.settimeout(0.2)
+            request.sendall(head + body)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self._counters[key] += delta
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            server = dict(self._counters)
+        server.update(workers=self.workers, queue_size=self.queue_size, request_timeout=self.request_timeout)
+        report: Dict[str, Any] = {"server": server, "latency": streaming_stats()}
+        if hasattr(self.dispatcher, "stats"):
+            report["dispatcher"] = self.dispatcher.stats()
+        cache = getattr(getattr(self.dispatcher, "workflow", None), "cache", None)
+        if cache is not None:
+            report["response_cache"] = cache.stats()
+        return report
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_server(
+    host: str = API_HOST,
+    port: int = API_PORT,
+    dispatcher: Optional[Any] = None,
+    workers: int = API_WORKERS,
+    queue_size: int = API_QUEUE_SIZE,
+    request_timeout: float = API_REQUEST_TIMEOUT,
+) -> AssistantHTTPServer:
+    """Build the server (port 0 picks a free port); defaults to the shared dispatcher."""
+    if dispatcher is None:
+        from orchestration.dispatcher import get_dispatcher
+        dispatcher = get_dispatcher()
+    return AssistantHTTPServer((host, port), dispatcher, workers, queue_size, request_timeout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the telecom assistant over HTTP/JSON")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=API_QUEUE_SIZE)
+    parser.add_argument("--timeout", type=float, default=API_REQUEST_TIMEOUT)
+    args = parser.parse_args()
+    from orchestration.resources import RESOURCES
+    # Build the agents and graphs before accepting traffic, not on the first request
+    ready = RESOURCES.warm()
+    if logger:
+        logger.info(f"Resources ready: {', '.join(name for name, ok in ready.items() if ok) or 'none'}")
+    server = create_server(args.host, args.port, workers=args.workers, queue_size=args.queue_size,
+                           request_timeout=args.timeout)
+    if logger:
+        logger.info(f"Serving on http://{args.host}:{server.server_address[1]} "
+                    f"({args.workers} workers, queue {args.queue_size}, timeout {args.timeout:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        RESOURCES.close()
+
+
+if __name__ == "__main__":
+    main()
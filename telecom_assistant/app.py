@@ -18,8 +18,12 @@ except Exception:  # pragma: no cover
 
 def bootstrap():
     """Perform any startup initialization before launching UI."""
-    # Placeholder for future initialization (e.g., loading models, warm caches)
-    pass
+    # Open the connection pool early; this also applies pending schema migrations
+    try:
+        from utils.database import get_pool  # type: ignore
+        get_pool()
+    except Exception:
+        pass
 
 
 try:
@@ -0,0 +1,104 @@
+"""
+Classifier benchmark - per-query cost of the keyword classifier
+
+Times the precompiled single-pass classifier (orchestration.classifier) against
+the original chain of `any(k in text ...)` scans with sets rebuilt per call, over
+a mix of sample support queries. Also times the local intent model
+(orchestration.intent_model), the first tier in front of the LLM classifier.
+
+Usage:
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --queries 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.classifier import classify_text
+from orchestration.intent_model import TRAINING_EXAMPLES, LinearIntentModel
+
+SAMPLE_QUERIES = [
+    "Why did my bill increase by ₹200 this month?",
+    "I see a charge for international roaming but I haven't traveled recently",
+    "Can you explain the 'Value Added Services' charge on my bill?",
+    "What's the early termination fee if I cancel my contract?",
+    "I can't make calls from my home in Mumbai West",
+    "My data connection keeps dropping when I'm on the train",
+    "Why is my 5G connection slower than my friend's?",
+    "I get a 'No Service' error in my basement apartment",
+    "What's the best plan for a family of four who watches a lot of videos?",
+    "I need a plan with good international calling to the US",
+    "Which plan is best for someone who works from home and needs reliable data?",
+    "I'm a light user who mostly just calls and texts. What's my cheapest option?",
+    "How do I set up VoLTE on my Samsung phone?",
+    "What are the APN settings for Android devices?",
+    "How can I activate international roaming before traveling?",
+    "What areas in Delhi have 5G coverage?",
+    "Tell me a joke about telecom",
+    "I need help with both my bill and network issues",
+]
+
+
+def legacy_classify(query: str) -> str:
+    """The original classify_query keyword path (no LLM)."""
+    query = query.strip()
+    ql = query.lower()
+    if len(query) < 3 or ql in {"hi", "hello", "hey"}:
+        return "fallback"
+    irrelevant_keywords = {"joke", "funny", "story", "poem", "song", "game", "play", "chat", "talk"}
+    if any(k in ql for k in irrelevant_keywords):
+        return "fallback"
+    classification = "billing_account"
+    if any(w in ql for w in ["bill", "charge", "payment", "account"]):
+        classification = "billing_account"
+    elif any(w in ql for w in ["network", "signal", "connection", "call", "data", "slow"]):
+        classification = "network_troubleshooting"
+    billing_keywords = {"bill", "charge", "payment", "account", "invoice", "balance"}
+    has_billing_keywords = any(k in ql for k in billing_keywords)
+    knowledge_keywords = {"configure", "setup", "apn", "volte", "install", "enable"}
+    service_keywords = {"plan", "recommend", "best", "upgrade", "family"}
+    if any(k in ql for k in knowledge_keywords):
+        if not has_billing_keywords:
+            classification = "knowledge_retrieval"
+    elif any(k in ql for k in service_keywords) and not has_billing_keywords:
+        if classification not in {"billing_account", "network_troubleshooting"}:
+            classification = "service_recommendation"
+    elif ("what" in ql or "how" in ql) and any(k in ql for k in service_keywords) and not has_billing_keywords:
+        classification = "service_recommendation"
+    return classification
+
+
+def run(fn, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    queries = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] for i in range(args.queries)]
+    mismatches = [q for q in SAMPLE_QUERIES if classify_text(q)["label"] != legacy_classify(q)]
+    print(f"Label agreement with legacy rules: {len(SAMPLE_QUERIES) - len(mismatches)}/{len(SAMPLE_QUERIES)}")
+
+    model = LinearIntentModel().fit(TRAINING_EXAMPLES)
+
+    print(f"{'classifier':28} {'us/query':>10} {'queries/s':>12}")
+    print("-" * 52)
+    for name, fn, count in [
+        ("legacy substring chain", legacy_classify, args.queries),
+        ("compiled (label + evidence)", classify_text, args.queries),
+        ("local intent model", model.predict, max(1, args.queries // 10)),
+    ]:
+        elapsed = run(fn, queries[:count])
+        print(f"{name:28} {elapsed / count * 1e6:10.2f} {count / elapsed:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Index benchmark - full scan vs. migrated indexes on a synthetically scaled telecom.db
+
+Builds a throwaway database with the real schema, fills it with synthetic rows
+(default: 1M usage rows, 100k tickets), times the hot helper queries, applies the
+schema migrations and times them again.
+
+Usage:
+    python benchmarks/bench_indexes.py
+    python benchmarks/bench_indexes.py --usage-rows 200000 --tickets 20000 --repeat 50
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.migrations import apply_migrations
+from utils.queries import get_sql
+
+SOURCE_DB = os.path.join(os.path.dirname(__file__), '..', 'data', 'telecom.db')
+
+STATUSES = ["Open", "In Progress", "Assigned", "Resolved", "Resolved", "Resolved"]
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Billing Inquiry", "Connectivity Issue", "Service Request", "Technical Support"]
+TECHNOLOGIES = ["4G", "5G"]
+
+
+def build_database(path: str, customers: int, usage_rows: int, tickets: int, areas: int) -> None:
+    src = sqlite3.connect(SOURCE_DB)
+    schema = [r[0] for r in src.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%' AND name != 'schema_migrations'"
+    )]
+    src.close()
+
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode = OFF")
+    con.execute("PRAGMA synchronous = OFF")
+    for ddl in schema:
+        if "VIRTUAL TABLE" in ddl.upper():
+            continue
+        con.execute(ddl)
+
+    rng = random.Random(42)
+    con.executemany(
+        "INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, 'Active', '2023-01-01', '2024-01-01')",
+        ((f"CUST{i:07d}", f"Customer {i}", f"c{i}@example.com", "9000000000", "Street, Mumbai", "STD_500")
+         for i in range(customers)),
+    )
+    con.executemany(
+        "INSERT INTO customer_usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((f"U{i:08d}", f"CUST{i % customers:07d}", f"2023-{(i // customers) % 12 + 1:02d}-01",
+          f"2023-{(i // customers) % 12 + 1:02d}-28", rng.uniform(0, 50), rng.randint(0, 2000),
+          rng.randint(0, 500), rng.uniform(0, 300), rng.uniform(300, 2000))
+         for i in range(usage_rows)),
+    )
+    con.executemany(
+        "INSERT INTO support_tickets VALUES (?, ?, ?, ?, ?, NULL, ?, ?, NULL)",
+        ((f"TKT{i:08d}", f"CUST{rng.randrange(customers):07d}", rng.choice(CATEGORIES), "Synthetic issue",
+          f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+          rng.choice(STATUSES), rng.choice(PRIORITIES))
+         for i in range(tickets)),
+    )
+    con.executemany(
+        "INSERT INTO coverage_quality VALUES (?, ?, ?, 'Good', 100, 20, 30, '2024-01-01')",
+        ((f"COV{i:07d}", f"AREA{i // 2:06d}", TECHNOLOGIES[i % 2]) for i in range(areas * 2)),
+    )
+    con.executemany(
+        "INSERT INTO cell_towers VALUES (?, ?, 19.0, 72.8, 'Macro', 30, NULL, NULL, 'Active')",
+        ((f"TWR{i:07d}", f"AREA{i % areas:06d}") for i in range(areas * 4)),
+    )
+    con.executemany(
+        "INSERT INTO tower_technologies VALUES (?, ?, ?, 'n78', 100, 1000, ?)",
+        ((f"TT{i:08d}", f"TWR{i // 2:07d}", TECHNOLOGIES[i % 2], i % 5 != 0) for i in range(areas * 8)),
+    )
+    con.commit()
+    con.close()
+
+
+def workload(customers: int, areas: int):
+    rng = random.Random(7)
+    return [
+        ("usage.by_customer", lambda: (f"CUST{rng.randrange(customers):07d}",)),
+        ("tickets.by_customer", lambda: (f"CUST{rng.randrange(customers):07d}",)),
+        ("tickets.by_customer_status", lambda: (f"CUST{rng.randrange(customers):07d}", "Open")),
+        ("coverage.by_area_technology", lambda: (f"AREA{rng.randrange(areas):06d}", "5G")),
+        ("towers.by_area", lambda: (f"AREA{rng.randrange(areas):06d}",)),
+        ("tower_tech.active_by_tower", lambda: (f"TWR{rng.randrange(areas * 4):07d}",)),
+    ]
+
+
+def time_queries(path: str, customers: int, areas: int, repeat: int):
+    con = sqlite3.connect(path)
+    results = {}
+    for name, make_params in workload(customers, areas):
+        sql = get_sql(name)
+        plan = " | ".join(r[-1] for r in con.execute(f"EXPLAIN QUERY PLAN {sql}", make_params()))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            con.execute(sql, make_params()).fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+        results[name] = (elapsed_ms, plan)
+    return con, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--usage-rows", type=int, default=1_000_000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--areas", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="telecom_bench_") as tmp:
+        path = os.path.join(tmp, "telecom_scaled.db")
+        start = time.perf_counter()
+        build_database(path, args.customers, args.usage_rows, args.tickets, args.areas)
+        print(f"Built synthetic DB ({args.usage_rows:,} usage rows, {args.tickets:,} tickets) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        con, before = time_queries(path, args.customers, args.areas, args.repeat)
+        start = time.perf_counter()
+        apply_migrations(con)
+        print(f"Applied migrations in {time.perf_counter() - start:.1f}s")
+        con.close()
+        con, after = time_queries(path, args.customers, args.areas, args.repeat)
+        con.close()
+
+    print()
+    print(f"{'query':32} {'scan ms':>10} {'index ms':>10} {'speedup':>9}")
+    print("-" * 64)
+    for name, (scan_ms, _plan) in before.items():
+        idx_ms, plan = after[name]
+        speedup = scan_ms / idx_ms if idx_ms else float("inf")
+        print(f"{name:32} {scan_ms:10.3f} {idx_ms:10.3f} {speedup:8.0f}x")
+        print(f"    plan: {plan}")
+
+
+if __name__ == "__main__":
+    main()
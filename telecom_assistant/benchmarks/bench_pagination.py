@@ -0,0 +1,83 @@
+"""
+Pagination benchmark - keyset vs. OFFSET page latency on a synthetically scaled telecom.db
+
+Builds a throwaway database (see bench_indexes.py), applies the schema migrations
+and times fetching single pages of the admin ticket list at increasing depths,
+once with the keyset query used by list_support_tickets_page and once with the
+equivalent LIMIT/OFFSET query.
+
+Usage:
+    python benchmarks/bench_pagination.py
+    python benchmarks/bench_pagination.py --tickets 500000 --page-size 50 --status Open
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_indexes import build_database
+from utils.migrations import apply_migrations
+from utils.queries import get_sql, ticket_page_query
+
+
+def offset_sql(keyset_sql: str) -> str:
+    return keyset_sql.replace("LIMIT ?", "LIMIT ? OFFSET ?")
+
+
+def time_page(con: sqlite3.Connection, sql: str, params: tuple, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        con.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--status", default="", help="Optional status filter pushed into the query")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    filters = ["status"] if args.status else []
+    filter_params = (args.status,) if args.status else ()
+    first_sql = get_sql(ticket_page_query(filters, after_cursor=False))
+    keyset_sql = get_sql(ticket_page_query(filters, after_cursor=True))
+    skip_sql = offset_sql(first_sql)
+
+    with tempfile.TemporaryDirectory(prefix="telecom_bench_") as tmp:
+        path = os.path.join(tmp, "telecom_scaled.db")
+        start = time.perf_counter()
+        build_database(path, args.customers, 0, args.tickets, areas=10)
+        con = sqlite3.connect(path)
+        apply_migrations(con)
+        print(f"Built and migrated synthetic DB ({args.tickets:,} tickets) in {time.perf_counter() - start:.1f}s")
+
+        matching = con.execute(
+            "SELECT COUNT(*) FROM support_tickets" + (" WHERE status = ?" if filters else ""), filter_params
+        ).fetchone()[0]
+        last_page = max(1, (matching - 1) // args.page_size)
+        depths = sorted({d for d in (1, 10, 100, 1000, last_page // 2, last_page) if 1 <= d <= last_page})
+        print(f"Pages of {args.page_size} over {matching:,} matching tickets"
+              + (f" (status = {args.status})" if filters else ""))
+        print(f"keyset plan: {' | '.join(r[-1] for r in con.execute(f'EXPLAIN QUERY PLAN {keyset_sql}', filter_params + ('', '', 1)))}")
+        print()
+        print(f"{'page':>8} {'keyset ms':>10} {'offset ms':>10}")
+        print("-" * 30)
+        for depth in depths:
+            # The cursor a client would hold after reading the previous page
+            row = con.execute(skip_sql, filter_params + (1, depth * args.page_size - 1)).fetchone()
+            cursor = (row[5], row[0])
+            keyset_ms = time_page(con, keyset_sql, filter_params + cursor + (args.page_size,), args.repeat)
+            offset_ms = time_page(con, skip_sql, filter_params + (args.page_size, depth * args.page_size), args.repeat)
+            print(f"{depth + 1:>8} {keyset_ms:10.3f} {offset_ms:10.3f}")
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,98 @@ OPENAI_MODEL_AGENTS = os.getenv('OPENAI_MODEL_AGENTS', 'gpt-4o-mini')
 OPENAI_EMBED_MODEL = os.getenv('OPENAI_EMBED_MODEL', 'text-embedding-3-small')
 CHROMA_DIR = str(PROJECT_ROOT / 'data' / 'chromadb')
 DOCUMENTS_DIR = str(PROJECT_ROOT / 'data' / 'documents')
-SQLITE_DB_PATH = str(PROJECT_ROOT / 'data' / 'telecom.db')
+# Persisted LlamaIndex storage (reloaded while the documents are unchanged)
+LLAMA_INDEX_DIR = os.getenv('LLAMA_INDEX_DIR', str(PROJECT_ROOT / 'data' / 'llama_index'))
+SQLITE_DB_PATH = os.getenv('SQLITE_DB_PATH', str(PROJECT_ROOT / 'data' / 'telecom.db'))
+
+# SQLite connection pool
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_HEALTH_CHECK_INTERVAL', '30'))
+DB_WAL_MODE = os.getenv('DB_WAL_MODE', 'true').lower() == 'true'
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '128'))
+# Off by default so opening the pool never rewrites the tracked telecom.db; run
+# `python -m utils.migrations` once instead
+DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', 'false').lower() == 'true'
+# Threads used by utils.async_database (defaults to one per pooled reader)
+DB_ASYNC_WORKERS = int(os.getenv('DB_ASYNC_WORKERS', str(DB_POOL_SIZE)))
 
 DEFAULT_CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '800'))
 DEFAULT_CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '100'))
 
+# Embedding backend: "openai" (OPENAI_EMBED_MODEL) or "local" (CPU-only hashed n-gram
+# vectors of EMBED_LOCAL_DIM dimensions; no network, reproducible builds)
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'openai').lower()
+EMBED_LOCAL_DIM = int(os.getenv('EMBED_LOCAL_DIM', '384'))
+# Embedding client (utils.embeddings): texts per request, requests in flight, provider
+# limits (requests / tokens per minute), retries, and the on-disk vector cache
+EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', '64'))
+EMBED_CONCURRENCY = int(os.getenv('EMBED_CONCURRENCY', '4'))
+EMBED_REQUESTS_PER_MINUTE = int(os.getenv('EMBED_REQUESTS_PER_MINUTE', '3000'))
+EMBED_TOKENS_PER_MINUTE = int(os.getenv('EMBED_TOKENS_PER_MINUTE', '1000000'))
+EMBED_MAX_RETRIES = int(os.getenv('EMBED_MAX_RETRIES', '5'))
+EMBED_CACHE_PATH = os.getenv('EMBED_CACHE_PATH', str(PROJECT_ROOT / 'data' / 'embeddings_cache.db'))
+
+# Reference-data cache (per-table TTLs in seconds, overridable as "table=ttl,...")
+REF_CACHE_ENABLED = os.getenv('REF_CACHE_ENABLED', 'true').lower() == 'true'
+REF_CACHE_MAX_ENTRIES = int(os.getenv('REF_CACHE_MAX_ENTRIES', '1024'))
+REF_CACHE_DEFAULT_TTL = float(os.getenv('REF_CACHE_DEFAULT_TTL', '300'))
+REF_CACHE_TTLS = {
+    table.strip(): float(ttl)
+    for table, ttl in (
+        item.split('=') for item in os.getenv(
+            'REF_CACHE_TTLS',
+            'service_plans=3600,service_areas=3600,building_types=3600,device_compatibility=1800,'
+            'transportation_routes=1800,common_network_issues=1800,coverage_quality=300,'
+            'cell_towers=300,tower_technologies=300',
+        ).split(',') if '=' in item
+    )
+}
+
+# Response cache in front of the graph: exact (normalised) repeats by default. With
+# RESPONSE_CACHE_SEMANTIC, queries whose embeddings (remote EMBEDDING_BACKEND only) are
+# RESPONSE_CACHE_SIMILARITY similar and that name the same numbers and places also match
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '600'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '512'))
+RESPONSE_CACHE_SEMANTIC = os.getenv('RESPONSE_CACHE_SEMANTIC', 'false').lower() == 'true'
+RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.9'))
+
+# Async dispatcher: graph turns in flight per process, and per-turn timeout in seconds (0 = none)
+ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', '256'))
+ASYNC_REQUEST_TIMEOUT = float(os.getenv('ASYNC_REQUEST_TIMEOUT', '120'))
+
+# AutoGen network troubleshooting: idle group-chat sessions kept for reuse (busy ones are not capped)
+NETWORK_SESSION_POOL_SIZE = int(os.getenv('NETWORK_SESSION_POOL_SIZE', '8'))
+# CrewAI billing: idle crews kept for reuse; each turn kicks off its own crew (busy ones are not capped)
+BILLING_CREW_POOL_SIZE = int(os.getenv('BILLING_CREW_POOL_SIZE', '4'))
+
+# Conversation memory (utils.memory): token budget for the history a turn carries, how many
+# recent messages stay verbatim, the share of the budget for the summary of older ones,
+# and how many messages the chat UI keeps on screen
+MEMORY_MAX_TOKENS = int(os.getenv('MEMORY_MAX_TOKENS', '1500'))
+MEMORY_WINDOW_MESSAGES = int(os.getenv('MEMORY_WINDOW_MESSAGES', '8'))
+MEMORY_SUMMARY_TOKENS = int(os.getenv('MEMORY_SUMMARY_TOKENS', '300'))
+UI_HISTORY_LIMIT = int(os.getenv('UI_HISTORY_LIMIT', '100'))
+
+# Headless HTTP service (api/http_server.py): worker pool, wait queue (429 beyond it), per-turn timeout
+API_HOST = os.getenv('API_HOST', '127.0.0.1')
+API_PORT = int(os.getenv('API_PORT', '8080'))
+API_WORKERS = int(os.getenv('API_WORKERS', '32'))
+API_QUEUE_SIZE = int(os.getenv('API_QUEUE_SIZE', '64'))
+API_REQUEST_TIMEOUT = float(os.getenv('API_REQUEST_TIMEOUT', '60'))
+
 # Flags
+# Chat answers render token by token (time-to-first-token is tracked in orchestration.streaming)
+ENABLE_STREAMING = os.getenv('ENABLE_STREAMING', 'true').lower() == 'true'
 ENABLE_LLM_CLASSIFICATION = os.getenv('ENABLE_LLM_CLASSIFICATION', 'false').lower() == 'true'
+# Local intent model answers first; below this confidence the LLM (if enabled) decides, else the keyword rules
+ENABLE_LOCAL_CLASSIFICATION = os.getenv('ENABLE_LOCAL_CLASSIFICATION', 'true').lower() == 'true'
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.6'))
+# Multi-intent queries fan out to several agents in parallel; a secondary intent needs
+# its own clause with its own keywords and (when the local model runs) this probability for that clause
+MULTI_INTENT_ENABLED = os.getenv('MULTI_INTENT_ENABLED', 'true').lower() == 'true'
+MULTI_INTENT_MIN_PROBABILITY = float(os.getenv('MULTI_INTENT_MIN_PROBABILITY', '0.35'))
+MULTI_INTENT_MAX = int(os.getenv('MULTI_INTENT_MAX', '3'))
 
 LOG_LEVEL = os.getenv('LOG_LEVEL','INFO')
@@ -0,0 +1,194 @@
+# Precompiled keyword classifier used by classify_query
+#
+# All keyword families are compiled into one trie-shaped regex that is matched once
+# over each whitespace-separated word of the lowercased query (keywords contain no
+# spaces). A word's hits are remembered, so a query costs one str.split plus a dict
+# lookup per word; only words not seen before run the regex. Keywords keep their
+# original substring semantics ("play" also hits "display"), so the classification
+# rules behave exactly as before.
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+KEYWORD_FAMILIES: Dict[str, List[str]] = {
+    "off_topic": ["joke", "funny", "story", "poem", "song", "game", "play", "chat", "talk"],
+    "billing": ["bill", "charge", "payment", "account", "invoice", "balance"],
+    "network": ["network", "signal", "connection", "call", "data", "slow"],
+    "knowledge": ["configure", "setup", "apn", "volte", "install", "enable"],
+    "service": ["plan", "recommend", "best", "upgrade", "family"],
+}
+
+# Distinct words whose keyword hits are remembered (cleared when full)
+WORD_CACHE_SIZE = 50_000
+
+# Billing words used by the keyword heuristic when no LLM label is available
+HEURISTIC_BILLING = frozenset({"bill", "charge", "payment", "account"})
+GREETINGS = frozenset({"hi", "hello", "hey"})
+# Where one request ends and another may begin: "and", "also", "plus", "as well as", sentence ends
+CLAUSE_BREAK = re.compile(r"\b(?:and|also|plus|as well as)\b|[.?!;]")
+
+LABELS = ("billing_account", "network_troubleshooting", "service_recommendation", "knowledge_retrieval", "fallback")
+
+# Which classification each family is evidence for
+FAMILY_LABELS = {
+    "off_topic": "fallback",
+    "billing": "billing_account",
+    "network": "network_troubleshooting",
+    "knowledge": "knowledge_retrieval",
+    "service": "service_recommendation",
+}
+
+
+def _trie_regex(node: Dict[str, Any]) -> str:
+    # Python's re tries alternatives one by one; factoring shared prefixes into a trie
+    # ("c(?:all|ha(?:rge|t)|on(?:figure|nection))") lets it reject most positions after
+    # one character. Optional groups are greedy, so the longest keyword wins.
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+def compile_keywords(keywords: Iterable[str]) -> "re.Pattern[str]":
+    """One regex reporting every (possibly overlapping) keyword occurrence via findall."""
+    trie: Dict[str, Any] = {}
+    for word in keywords:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    # A zero-width lookahead is tried at every position, so overlapping keywords are all found
+    return re.compile(f"(?=({_trie_regex(trie)}))")
+
+
+class KeywordClassifier:
+    """Single-pass keyword scanner plus the priority rules of classify_query."""
+
+    def __init__(self, families: Dict[str, Iterable[str]]):
+        self.families = {name: list(words) for name, words in families.items()}
+        keywords = sorted({w for words in self.families.values() for w in words})
+        self._pattern = compile_keywords(keywords)
+        # Each reported keyword also implies the shorter keywords it starts with
+        # (only the longest match at a position is reported)
+        self._hits = {
+            match: tuple((family, k) for k in keywords if match.startswith(k)
+                         for family, words in self.families.items() if k in words)
+            for match in keywords
+        }
+        self._word_hits: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+
+    def _learn(self, word: str) -> Tuple[Tuple[str, str], ...]:
+        hits = tuple(hit for match in self._pattern.findall(word) for hit in self._hits[match])
+        if len(self._word_hits) >= WORD_CACHE_SIZE:
+            self._word_hits.clear()
+        self._word_hits[word] = hits
+        return hits
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Return {family: [keywords found]} for already-lowercased text."""
+        found: Dict[str, List[str]] = {}
+        known = self._word_hits
+        for word in text.split():
+            hits = known.get(word)
+            if hits is None:
+                hits = self._learn(word)
+            for family, keyword in hits:
+                words = found.get(family)
+                if words is None:
+                    found[family] = [keyword]
+                elif keyword not in words:
+                    words.append(keyword)
+        return found
+
+    def analyze(self, query: str) -> Dict[str, Any]:
+        """Scan a query and score each label by its share of keyword hits."""
+        text = query.strip()
+        lowered = text.lower()
+        evidence = self.scan(lowered)
+        scores = dict.fromkeys(LABELS, 0.0)
+        if evidence:
+            total = sum(map(len, evidence.values()))
+            for family, words in evidence.items():
+                scores[FAMILY_LABELS[family]] = len(words) / total
+        return {
+            "query": text,
+            "evidence": evidence,
+            "scores": scores,
+            "off_topic": len(text) < 3 or lowered in GREETINGS or "off_topic" in evidence,
+        }
+
+    def decide(self, analysis: Dict[str, Any], prior: Optional[str] = None) -> Dict[str, Any]:
+        """Apply the priority rules on top of `prior` (an LLM label) or the keyword heuristic."""
+        evidence = analysis["evidence"]
+        if analysis["off_topic"]:
+            return {**analysis, "label": "fallback", "rule": "off_topic"}
+
+        rule = "prior" if prior else "default"
+        label = prior or "billing_account"
+        if prior is None:
+            if HEURISTIC_BILLING.intersection(evidence.get("billing", ())):
+                label, rule = "billing_account", "heuristic_billing"
+            elif "network" in evidence:
+                label, rule = "network_troubleshooting", "heuristic_network"
+
+        has_billing = "billing" in evidence
+        # Priority 1: setup/configuration questions, unless billing is mentioned
+        if "knowledge" in evidence:
+            if not has_billing:
+                label, rule = "knowledge_retrieval", "knowledge_override"
+        # Priority 2: plan questions without billing context
+        elif "service" in evidence and not has_billing:
+            if label not in {"billing_account", "network_troubleshooting"}:
+                label, rule = "service_recommendation", "service_override"
+        return {**analysis, "label": label, "rule": rule}
+
+    def intents(
+        self,
+        decision: Dict[str, Any],
+        score: Optional[Callable[[str], Dict[str, float]]] = None,
+        min_probability: float = 0.35,
+        max_labels: int = 3,
+    ) -> List[str]:
+        """Primary label first, then every other label the query also asks about.
+
+        A secondary label needs independent evidence: the query must join clauses
+        ("... and ...", "also", a second sentence) with the primary label's keywords
+        in one and the secondary's keywords in another, so incidental words ("plans
+        under 500", "enable wifi calling") do not fan out. Families that also sit in
+        a primary clause describe the primary request ("a plan with the same data
+        and calls") and are not counted either. With `score` (the intent
+        model's text -> probabilities) the secondary's clause must also score at
+        least `min_probability` for it on its own.
+        """
+        primary = decision["label"]
+        labels = [primary]
+        if primary == "fallback":
+            return labels
+        primary_families = {f for f, label in FAMILY_LABELS.items() if label == primary}
+        clauses = [(text, self.scan(text)) for text in CLAUSE_BREAK.split(decision["query"].lower()) if text.strip()]
+        if not any(primary_families.intersection(found) for _, found in clauses):
+            return labels  # the primary label is a default or a model guess, not a stated request
+        incidental = {f for _, found in clauses if primary_families.intersection(found) for f in found}
+        candidates: Dict[str, float] = {}
+        for text, found in clauses:
+            if primary_families.intersection(found):
+                continue
+            secondary = {FAMILY_LABELS[f] for f in found if f not in incidental} - {primary, "fallback"}
+            probabilities = score(text) if score is not None and secondary else {}
+            for label in secondary:
+                p = probabilities.get(label, 1.0) if score is not None else 1.0
+                if p >= min_probability:
+                    candidates[label] = max(p, candidates.get(label, 0.0))
+        ranked = sorted(candidates, key=lambda label: (-candidates[label], LABELS.index(label)))
+        return labels + ranked[:max(max_labels - 1, 0)]
+
+    def classify(self, query: str, prior: Optional[str] = None) -> Dict[str, Any]:
+        return self.decide(self.analyze(query), prior)
+
+
+CLASSIFIER = KeywordClassifier(KEYWORD_FAMILIES)
+
+
+def classify_text(query: str, prior: Optional[str] = None) -> Dict[str, Any]:
+    """Classify a query with the shared precompiled classifier."""
+    return CLASSIFIER.classify(query, prior)
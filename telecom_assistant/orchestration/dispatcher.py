@@ -0,0 +1,144 @@
+# Async request dispatcher for the graph
+#
+# One event loop (on a daemon thread) runs every conversation turn as a task of the
+# async graph (create_async_graph + ainvoke). An asyncio.Semaphore caps the turns in
+# flight, so waiting on LLMs costs a coroutine rather than an OS thread per request.
+# Sync callers (Streamlit, scripts, the stream_workflow worker) use dispatch()/invoke();
+# async callers await submit() directly.
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.config import ASYNC_MAX_CONCURRENCY, ASYNC_REQUEST_TIMEOUT
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+
+class AsyncDispatcher:
+    """Run graph turns concurrently on one event loop, at most `max_concurrency` at a time."""
+
+    def __init__(self, workflow: Any, max_concurrency: int = 256, timeout: Optional[float] = None):
+        self.workflow = workflow
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    # Async API (caller already runs on an event loop)
+
+    async def submit(self, state: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run one turn; waits for a free slot first. Raises asyncio.TimeoutError on timeout."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._count("submitted")
+        async with self._semaphore:
+            self._enter()
+            try:
+                result = await asyncio.wait_for(self.workflow.ainvoke(state), timeout or self.timeout)
+            except asyncio.TimeoutError:
+                self._count("timed_out")
+                raise
+            except Exception:
+                self._count("failed")
+                raise
+            finally:
+                self._leave()
+        self._count("completed")
+        return result
+
+    async def run_many(self, states: Sequence[Dict[str, Any]], timeout: Optional[float] = None) -> List[Any]:
+        """Run turns concurrently; failed turns come back as their exception."""
+        return await asyncio.gather(*(self.submit(state, timeout) for state in states), return_exceptions=True)
+
+    # Sync API (callers on ordinary threads)
+
+    def start(self) -> "AsyncDispatcher":
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+
+                def run() -> None:
+                    self._loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(self._loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    self._loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="graph-dispatcher", daemon=True)
+                self._thread.start()
+                ready.wait()
+        return self
+
+    def dispatch(self, state: Dict[str, Any], timeout: Optional[float] = None) -> "concurrent.futures.Future[Dict[str, Any]]":
+        """Schedule a turn from any thread; the caller's context (stream emitter,
+        customer bundle) is carried over to the task."""
+        self.start()
+        context = contextvars.copy_context()
+
+        async def run() -> Dict[str, Any]:
+            for var, value in context.items():
+                var.set(value)
+            return await self.submit(state, timeout)
+
+        return asyncio.run_coroutine_threadsafe(run(), self._loop)  # type: ignore[arg-type]
+
+    def invoke(self, state: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking turn; same interface as a compiled graph's invoke()."""
+        return self.dispatch(state, timeout).result()
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=5)
+            loop.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["max_concurrency"] = self.max_concurrency
+        return snapshot
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._stats["in_flight"] += 1
+            self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._stats["in_flight"])
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._stats["in_flight"] -= 1
+
+
+def build_dispatcher() -> AsyncDispatcher:
+    """A started dispatcher over the shared async graph, behind the response cache."""
+    from orchestration.resources import RESOURCES
+    from orchestration.response_cache import cached_workflow
+    dispatcher = AsyncDispatcher(
+        cached_workflow(RESOURCES.get("async_graph")),
+        max_concurrency=ASYNC_MAX_CONCURRENCY,
+        timeout=ASYNC_REQUEST_TIMEOUT or None,
+    ).start()
+    if logger:
+        logger.info(f"Async dispatcher started (max {ASYNC_MAX_CONCURRENCY} concurrent turns)")
+    return dispatcher
+
+
+def get_dispatcher() -> AsyncDispatcher:
+    """Process-wide dispatcher (see orchestration.resources)."""
+    from orchestration.resources import RESOURCES
+    return RESOURCES.get("dispatcher")
@@ -1,11 +1,25 @@
 # LangGraph orchestration
 
-from typing import TypedDict, Dict, Any, List
-from config.config import ENABLE_LLM_CLASSIFICATION, OPENAI_MODEL_CLASSIFY
-from agents.billing_agents import process_billing_query  # type: ignore
-from agents.network_agents import process_network_query  # type: ignore
-from agents.service_agents import process_recommendation_query  # type: ignore
-from agents.knowledge_agents import process_knowledge_query  # type: ignore
+from typing import Annotated, TypedDict, Dict, Any, Iterator, List, Tuple
+from config.config import (
+    ENABLE_LLM_CLASSIFICATION,
+    ENABLE_LOCAL_CLASSIFICATION,
+    LOCAL_CLASSIFIER_THRESHOLD,
+    MULTI_INTENT_ENABLED,
+    MULTI_INTENT_MAX,
+    MULTI_INTENT_MIN_PROBABILITY,
+    OPENAI_MODEL_CLASSIFY,
+)
+from agents.billing_agents import aprocess_billing_query, process_billing_query  # type: ignore
+from agents.network_agents import aprocess_network_query, process_network_query  # type: ignore
+from agents.service_agents import aprocess_recommendation_query, process_recommendation_query  # type: ignore
+from agents.knowledge_agents import aprocess_knowledge_query, process_knowledge_query  # type: ignore
+from orchestration.classifier import CLASSIFIER as KEYWORD_CLASSIFIER
+from orchestration.intent_model import TieredIntentClassifier
+from utils.customer_context import aload_customer_context, use_customer_context
+from utils.memory import project
+from utils.streaming import emit_status, emit_token, has_streamed, hold_agent_tokens
+import asyncio
 import json
 import re
 
@@ -29,14 +43,23 @@ except Exception:  # pragma: no cover
     StateGraph = _DummyStateGraph  # type: ignore
     END = "END"  # type: ignore
 
+def merge_responses(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for intermediate_responses: parallel agent nodes each add their own key."""
+    return {**(left or {}), **(right or {})}
+
+
 # Define the state structure
 class TelecomAssistantState(TypedDict):
     query: str  # The user's original query
     customer_info: Dict[str, Any]  # Customer information if available
-    classification: str  # Query classification
-    intermediate_responses: Dict[str, Any]  # Responses from different nodes
+    classification: str  # Query classification (primary intent)
+    classifications: List[str]  # Every intent the query asks about, primary first
+    classification_evidence: Dict[str, Any]  # Keyword hits, per-label scores and the rule that decided
+    intermediate_responses: Annotated[Dict[str, Any], merge_responses]  # Responses from different nodes
+    status: str  # classified / ok / partial / error
     final_response: str  # Final formatted response
     chat_history: List[Dict[str, str]]  # Conversation history
+    customer_context: Dict[str, Any]  # Per-turn customer/usage/plan bundle (utils.customer_context)
 
 # Classification node - determines query type
 _llm_classifier = None
@@ -52,72 +75,83 @@ try:
 except Exception:
     logger = None
 
+def _llm_label(query: str) -> str:
+    classification = "billing_account"
+    try:  # pragma: no cover
+        prompt = (
+            "You are a telecom support query classifier. Classify ONLY legitimate telecom support queries.\n\n"
+            "Valid Categories:\n"
+            "- billing_account: Questions about bills, charges, payments, invoices, account balance, billing details\n"
+            "- network_troubleshooting: Issues with network, signal, connectivity, call quality, data speed, internet problems\n"
+            "- service_recommendation: Requests for plan recommendations, upgrades, best plans, comparing plans\n"
+            "- knowledge_retrieval: How-to questions, setup instructions, configuration guides, technical procedures\n"
+            "- fallback: Jokes, entertainment, chitchat, off-topic questions, anything not related to telecom support\n\n"
+            f"Query: {query}\n\n"
+            "If this is a legitimate telecom support question, respond with the category name.\n"
+            "If this is a joke, entertainment, or off-topic request, respond with 'fallback'.\n"
+            "Response:"
+        )
+        resp = _llm_classifier.invoke(prompt)  # type: ignore
+        raw = getattr(resp, 'content', '').lower().strip()
+        for label in ["billing_account","network_troubleshooting","service_recommendation","knowledge_retrieval","fallback"]:
+            if label in raw:
+                classification = label
+                break
+    except Exception:
+        pass
+    return classification
+
+
+# Tier 1: local model; tier 2: LLM only for low-confidence queries; else keyword heuristic
+_intent_classifier = TieredIntentClassifier(
+    threshold=LOCAL_CLASSIFIER_THRESHOLD,
+    llm=_llm_label if _llm_classifier else None,
+    enabled=ENABLE_LOCAL_CLASSIFICATION,
+)
+
+
+def classification_stats() -> Dict[str, Any]:
+    """Per-tier counts/latency and the LLM escalation rate of classify_query."""
+    return _intent_classifier.stats()
+
+
+def keyword_intents(query: str) -> List[str]:
+    """classify_query's labels from the keyword rules alone: no local model, no LLM call."""
+    decision = KEYWORD_CLASSIFIER.classify(query)
+    if not MULTI_INTENT_ENABLED:
+        return [decision["label"]]
+    return KEYWORD_CLASSIFIER.intents(decision, None, MULTI_INTENT_MIN_PROBABILITY, MULTI_INTENT_MAX)
+
+
 def classify_query(state: TelecomAssistantState) -> TelecomAssistantState:
     query = state.get("query", "").strip()
-    ql = query.lower()
-    
-    # Filter out non-support queries first
-    if len(query) < 3 or ql in {"hi", "hello", "hey"}:
-        return {**state, "classification": "fallback"}
     
-    # Detect irrelevant/entertainment queries
-    irrelevant_keywords = {"joke", "funny", "story", "poem", "song", "game", "play", "chat", "talk"}
-    if any(k in ql for k in irrelevant_keywords):
-        return {**state, "classification": "fallback"}
+    # Already classified upstream (e.g. by the response cache wrapper): keep that result
+    evidence = state.get("classification_evidence") or {}
+    if state.get("classification") and evidence.get("query") == query:
+        return state
     
-    classification = "billing_account"
-    if _llm_classifier:
-        try:  # pragma: no cover
-            prompt = (
-                "You are a telecom support query classifier. Classify ONLY legitimate telecom support queries.\n\n"
-                "Valid Categories:\n"
-                "- billing_account: Questions about bills, charges, payments, invoices, account balance, billing details\n"
-                "- network_troubleshooting: Issues with network, signal, connectivity, call quality, data speed, internet problems\n"
-                "- service_recommendation: Requests for plan recommendations, upgrades, best plans, comparing plans\n"
-                "- knowledge_retrieval: How-to questions, setup instructions, configuration guides, technical procedures\n"
-                "- fallback: Jokes, entertainment, chitchat, off-topic questions, anything not related to telecom support\n\n"
-                f"Query: {query}\n\n"
-                "If this is a legitimate telecom support question, respond with the category name.\n"
-                "If this is a joke, entertainment, or off-topic request, respond with 'fallback'.\n"
-                "Response:"
-            )
-            resp = _llm_classifier.invoke(prompt)  # type: ignore
-            raw = getattr(resp, 'content', '').lower().strip()
-            for label in ["billing_account","network_troubleshooting","service_recommendation","knowledge_retrieval","fallback"]:
-                if label in raw:
-                    classification = label
-                    break
-        except Exception:
-            pass
-    else:
-        if any(w in ql for w in ["bill","charge","payment","account"]):
-            classification = "billing_account"
-        elif any(w in ql for w in ["network","signal","connection","call","data","slow"]):
-            classification = "network_troubleshooting"
-    # Apply keyword overrides AFTER LLM or heuristic classification
-    # Check for billing keywords first to protect billing classification
-    billing_keywords = {"bill", "charge", "payment", "account", "invoice", "balance"}
-    has_billing_keywords = any(k in ql for k in billing_keywords)
+    # One pass over the query collects every keyword family (see orchestration.classifier)
+    analysis = KEYWORD_CLASSIFIER.analyze(query)
     
-    knowledge_keywords = {"configure", "setup", "apn", "volte", "install", "enable"}
-    service_keywords = {"plan", "recommend", "best", "upgrade", "family"}
+    # Filter out greetings and non-support (entertainment) queries before any model call
+    if analysis["off_topic"]:
+        return {**state, "classification": "fallback", "classifications": ["fallback"], "classification_evidence": analysis}
     
-    # Priority 1: Knowledge retrieval (setup/configuration questions)
-    if any(k in ql for k in knowledge_keywords):
-        # Only override to knowledge if there are no billing keywords
-        if not has_billing_keywords:
-            classification = "knowledge_retrieval"
-    # Priority 2: Service recommendations (plan questions without billing context)
-    elif any(k in ql for k in service_keywords) and not has_billing_keywords:
-        # Override to service_recommendation if not already billing or network troubleshooting
-        if classification not in {"billing_account", "network_troubleshooting"}:
-            classification = "service_recommendation"
-    # Priority 3: Generic "what" or "how" questions about plans = service recommendation
-    elif ("what" in ql or "how" in ql) and any(k in ql for k in service_keywords) and not has_billing_keywords:
-        classification = "service_recommendation"
+    # Local model / LLM label (None -> keyword heuristic), then the keyword priority overrides
+    intent = _intent_classifier.predict(query)
+    result = KEYWORD_CLASSIFIER.decide(analysis, intent["label"])
+    result["intent"] = intent
+    classification = result["label"]
+    # Secondary intents ("my bill went up and my data keeps dropping") fan out in parallel
+    classifications = [classification]
+    if MULTI_INTENT_ENABLED:
+        score = _intent_classifier.model.predict_proba if _intent_classifier.enabled else None
+        classifications = KEYWORD_CLASSIFIER.intents(result, score, MULTI_INTENT_MIN_PROBABILITY, MULTI_INTENT_MAX)
     if logger and state.get("classification") != classification:
-        logger.info(f"Classified query='{query}' -> {classification}")
-    return {**state, "classification": classification, "status": "classified"}
+        logger.info(f"Classified query='{query}' -> {'+'.join(classifications)} ({intent['tier']}, {result['rule']})")
+    return {**state, "classification": classification, "classifications": classifications,
+            "classification_evidence": result, "status": "classified"}
 
 
 def extract_city_from_address(address: str) -> str:
@@ -147,92 +181,145 @@ def extract_city_from_address(address: str) -> str:
     
     return ""
 
-# Routing function - determines next node based on classification
-def route_query(state: TelecomAssistantState) -> str:
-    """Route the query to the appropriate node based on classification"""
-    # TODO: Implement query routing logic
-    classification = state.get("classification", "")
+# Routing function - determines next node(s) based on classification
+LABEL_NODES = {
+    "billing_account": "crew_ai_node",
+    "network_troubleshooting": "autogen_node",
+    "service_recommendation": "langchain_node",
+    "knowledge_retrieval": "llamaindex_node",
+}
 
-    if classification == "billing_account":
-        return "crew_ai_node"
-    if classification == "network_troubleshooting":
-        return "autogen_node"
-    if classification == "service_recommendation":
-        return "langchain_node"
-    if classification == "knowledge_retrieval":
-        return "llamaindex_node"
 
-    # For any other classification, return fallback handler
-    return "fallback_handler"
+def route_query(state: TelecomAssistantState) -> List[str]:
+    """Route the query to one node per detected intent; several nodes run in parallel."""
+    labels = state.get("classifications") or [state.get("classification", "")]
+    nodes = list(dict.fromkeys(LABEL_NODES[label] for label in labels if label in LABEL_NODES))
+    if not nodes:
+        # For any other classification, return fallback handler
+        return ["fallback_handler"]
+    if len(nodes) > 1:
+        # Parallel agents would interleave their tokens; stream the merged answer instead
+        hold_agent_tokens()
+    return nodes
 
 # Node function templates for each framework
+#
+# Each agent node has a sync and an async variant sharing the request/response
+# helpers below; create_graph() wires the sync ones, create_async_graph() the async.
 
-def crew_ai_node(state: TelecomAssistantState) -> TelecomAssistantState:
+_SELECT_CUSTOMER_MESSAGE = (
+    "Please select a customer from the sidebar to view billing information. I need to know which "
+    "account to analyze before I can help with billing questions."
+)
+
+
+def _with_response(state: TelecomAssistantState, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    # Only this node's key: parallel branches are combined by the merge_responses reducer
+    return {"intermediate_responses": {key: result}}
+
+
+def _with_history(state: TelecomAssistantState, node: str, request: str) -> str:
+    """Prefix a node's request with the part of the conversation that node needs."""
+    context = project(state.get('chat_history'), node, state.get('query', ''))
+    return f"{context}\n\n{request}" if context else request
+
+
+def _billing_request(state: TelecomAssistantState) -> Tuple[str, str]:
+    """(customer_id, query with customer context); customer_id is '' when none is selected."""
     customer_info = state.get('customer_info', {})
     customer_id = customer_info.get('customer_id', 'UNKNOWN')
-    
-    # Check if customer is selected
     if not customer_info or customer_id == 'UNKNOWN':
-        # Return a helpful message asking user to select a customer
-        return {
-            **state, 
-            "intermediate_responses": {
-                "crew_ai": {
-                    "query": state.get('query', ''),
-                    "raw": "Please select a customer from the sidebar to view billing information. I need to know which account to analyze before I can help with billing questions.",
-                    "status": "ok"
-                }
-            }, 
-            "status": "ok"
-        }
-    
+        return "", ""
     # Pass full customer info context in the query for better responses
+    emit_status("crew_ai", "Reviewing your bill and plan...")
     query = state.get('query','')
     context_query = f"Customer: {customer_id} ({customer_info.get('name','')}), Plan: {customer_info.get('service_plan_id','')}. Query: {query}"
-    result = process_billing_query(customer_id=customer_id, query=context_query)
-    return {**state, "intermediate_responses": {"crew_ai": result}, "status": result.get("status", state.get("status"))}
+    return customer_id, _with_history(state, "crew_ai", context_query)
 
 
-def autogen_node(state: TelecomAssistantState) -> TelecomAssistantState:
-    """Process network troubleshooting with AutoGen, enriched with customer location."""
+def _network_request(state: TelecomAssistantState) -> str:
+    """Network query enriched with the customer's city when known."""
     query = state.get('query', '')
     customer_info = state.get('customer_info', {})
-    
+    enriched_query = query
     # Enrich query with customer location if available
     if customer_info:
-        address = customer_info.get('address', '')
-        city = extract_city_from_address(address)
-        
+        city = extract_city_from_address(customer_info.get('address', ''))
         if city:
             # Add location context to help agents find relevant incidents
             enriched_query = f"Customer location: {city}. Issue: {query}"
             if logger:
                 logger.info(f"Enriched network query with location: {city}")
-        else:
-            enriched_query = query
-    else:
-        enriched_query = query
-    
-    result = process_network_query(query=enriched_query)
-    return {**state, "intermediate_responses": {"autogen": result}, "status": result.get("status", state.get("status"))}
+    emit_status("autogen", "Diagnosing the network issue...")
+    return _with_history(state, "autogen", enriched_query)
 
 
-
-def langchain_node(state: TelecomAssistantState) -> TelecomAssistantState:
+def _recommendation_request(state: TelecomAssistantState) -> str:
     customer_info = state.get('customer_info', {})
     query = state.get('query','')
+    emit_status("langchain", "Comparing plans...")
     # Add customer context for personalized recommendations
     if customer_info:
-        context_query = f"Customer {customer_info.get('customer_id','')} on {customer_info.get('service_plan_id','')} plan. {query}"
-    else:
-        context_query = query
-    result = process_recommendation_query(query=context_query)
-    return {**state, "intermediate_responses": {"langchain": result}, "status": result.get("status", state.get("status"))}
+        query = f"Customer {customer_info.get('customer_id','')} on {customer_info.get('service_plan_id','')} plan. {query}"
+    return _with_history(state, "langchain", query)
+
+
+def crew_ai_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    customer_id, context_query = _billing_request(state)
+    if not customer_id:
+        # Ask the user to select a customer first
+        return _with_response(state, "crew_ai", {"query": state.get('query', ''), "raw": _SELECT_CUSTOMER_MESSAGE, "status": "ok"})
+    # Billing tools read customer, usage and plan from the turn's bundle instead of the DB
+    with use_customer_context(state.get('customer_context') or None):
+        result = process_billing_query(customer_id=customer_id, query=context_query)
+    return _with_response(state, "crew_ai", result)
+
+
+def autogen_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    """Process network troubleshooting with AutoGen, enriched with customer location."""
+    return _with_response(state, "autogen", process_network_query(query=_network_request(state)))
+
+
+def langchain_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    return _with_response(state, "langchain", process_recommendation_query(query=_recommendation_request(state)))
 
 
 def llamaindex_node(state: TelecomAssistantState) -> TelecomAssistantState:
-    result = process_knowledge_query(query=state.get('query',''))
-    return {**state, "intermediate_responses": {"llamaindex": result}, "status": result.get("status", state.get("status"))}
+    emit_status("llamaindex", "Searching the knowledge base...")
+    return _with_response(state, "llamaindex", process_knowledge_query(query=state.get('query','')))
+
+
+async def aclassify_query(state: TelecomAssistantState) -> TelecomAssistantState:
+    # Local tiers are sub-millisecond; only an LLM escalation is worth moving off the loop
+    if _llm_classifier is None:
+        return classify_query(state)
+    return await asyncio.to_thread(classify_query, state)
+
+
+async def acrew_ai_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    customer_id, context_query = _billing_request(state)
+    if not customer_id:
+        return _with_response(state, "crew_ai", {"query": state.get('query', ''), "raw": _SELECT_CUSTOMER_MESSAGE, "status": "ok"})
+    context = state.get('customer_context') or None
+    if not context or context.get('customer_id') != customer_id:
+        # Callers that did not preload the bundle: fetch it without blocking the loop
+        context = await aload_customer_context(customer_id)
+    with use_customer_context(context):
+        result = await aprocess_billing_query(customer_id=customer_id, query=context_query)
+    return _with_response(state, "crew_ai", result)
+
+
+async def aautogen_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    return _with_response(state, "autogen", await aprocess_network_query(query=_network_request(state)))
+
+
+async def alangchain_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    return _with_response(state, "langchain", await aprocess_recommendation_query(query=_recommendation_request(state)))
+
+
+async def allamaindex_node(state: TelecomAssistantState) -> TelecomAssistantState:
+    emit_status("llamaindex", "Searching the knowledge base...")
+    return _with_response(state, "llamaindex", await aprocess_knowledge_query(query=state.get('query','')))
 
 
 def fallback_handler(state: TelecomAssistantState) -> TelecomAssistantState:
@@ -241,88 +328,125 @@ def fallback_handler(state: TelecomAssistantState) -> TelecomAssistantState:
         "I'm not sure how to help with that specific question. Could you try rephrasing or ask "
         "about our services, billing, network issues, or technical support?"
     )
-    return {
-        **state, 
-        "intermediate_responses": {
-            "fallback": {
-                "query": state.get("query", ""),
-                "response": response,
-                "status": "ok"
-            }
-        }, 
-        "status": "ok"
-    }
+    return _with_response(state, "fallback", {"query": state.get("query", ""), "response": response, "status": "ok"})
+
+
+def format_intermediate(val: Any) -> str:
+    """Human-readable text for one node's entry in intermediate_responses."""
+    if not isinstance(val, dict):
+        return str(val)
+    if val.get("status") == "error" and "error" in val:
+        formatted = f"Error: {val['error']}\nDetail: {val.get('detail','')[:300]}"
+        if 'fallback' in val:
+            formatted += f"\nFallback: {val['fallback']}"
+        return formatted
+    # Extract human-readable response based on agent type
+    if "answer" in val:
+        # LlamaIndex knowledge response - direct answer
+        return val["answer"]
+    if "raw" in val and isinstance(val["raw"], str):
+        # CrewAI billing or LangChain service response - contains actual LLM output
+        raw_content = val["raw"]
+        # Try to parse as dict/eval to extract 'output' field (LangChain format)
+        try:
+            import ast
+            parsed = ast.literal_eval(raw_content)
+            if isinstance(parsed, dict) and "output" in parsed:
+                return parsed["output"]
+        except Exception:
+            pass
+        # If parsing fails, use raw content as-is (CrewAI format)
+        return raw_content
+    if "transcript" in val:
+        # AutoGen network response - use last message from transcript
+        transcript = val.get("transcript", [])
+        if transcript:
+            # Get the last assistant message
+            return transcript[-1] if isinstance(transcript[-1], str) else str(transcript[-1])
+        return "Network troubleshooting steps generated. Check the detailed view for more information."
+    if "response" in val:
+        # Generic response field
+        return val["response"]
+    # Fallback to generic formatting
+    formatted_lines = []
+    for k,v in val.items():
+        if k in {"status", "summary", "query", "customer_id"}:
+            continue
+        formatted_lines.append(f"{k}: {v if not isinstance(v,(list,dict)) else json.dumps(v)[:400]}")
+    return "\n".join(formatted_lines) if formatted_lines else str(val)
+
+
+_CHUNK_RE = re.compile(r"\S+\s*|\s+")
+
+# Section headings when one answer merges several agents
+SECTION_TITLES = {
+    "crew_ai": "Billing",
+    "autogen": "Network",
+    "langchain": "Plan Recommendation",
+    "llamaindex": "How-To",
+    "fallback": "Other",
+}
+
+
+def format_response_chunks(intermediate_responses: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Yield (node, text piece) of the final answer, word by word, in node order.
+
+    A single response is passed through as-is; several are merged under a heading each.
+    """
+    merged = len(intermediate_responses) > 1
+    for index, (key, val) in enumerate(intermediate_responses.items()):
+        if merged:
+            yield key, ("\n\n" if index else "") + f"**{SECTION_TITLES.get(key, key)}**\n\n"
+        for piece in _CHUNK_RE.findall(format_intermediate(val)):
+            yield key, piece
+
+
+def _merged_status(intermediate_responses: Dict[str, Any], default: str) -> str:
+    statuses = [v.get("status") for v in intermediate_responses.values() if isinstance(v, dict) and v.get("status")]
+    if not statuses:
+        return default
+    if all(status == "error" for status in statuses):
+        return "error"
+    return "partial" if "error" in statuses else statuses[0]
 
 
 def formulate_response(state: TelecomAssistantState) -> TelecomAssistantState:
     intermediate_responses = state.get("intermediate_responses", {})
     if not intermediate_responses:
         return {**state, "final_response": "No response generated."}
-    # Pick the only dict value and format
-    key, val = next(iter(intermediate_responses.items()))
-    if isinstance(val, dict):
-        if val.get("status") == "error" and "error" in val:
-            formatted = f"Error: {val['error']}\nDetail: {val.get('detail','')[:300]}"
-            if 'fallback' in val:
-                formatted += f"\nFallback: {val['fallback']}"
-        else:
-            # Extract human-readable response based on agent type
-            if "answer" in val:
-                # LlamaIndex knowledge response - direct answer
-                formatted = val["answer"]
-            elif "raw" in val and isinstance(val["raw"], str):
-                # CrewAI billing or LangChain service response - contains actual LLM output
-                raw_content = val["raw"]
-                # Try to parse as dict/eval to extract 'output' field (LangChain format)
-                try:
-                    import ast
-                    parsed = ast.literal_eval(raw_content)
-                    if isinstance(parsed, dict) and "output" in parsed:
-                        formatted = parsed["output"]
-                    else:
-                        formatted = raw_content
-                except Exception:
-                    # If parsing fails, use raw content as-is (CrewAI format)
-                    formatted = raw_content
-            elif "transcript" in val:
-                # AutoGen network response - use last message from transcript
-                transcript = val.get("transcript", [])
-                if transcript:
-                    # Get the last assistant message
-                    formatted = transcript[-1] if isinstance(transcript[-1], str) else str(transcript[-1])
-                else:
-                    formatted = "Network troubleshooting steps generated. Check the detailed view for more information."
-            elif "response" in val:
-                # Generic response field
-                formatted = val["response"]
-            else:
-                # Fallback to generic formatting
-                formatted_lines = []
-                for k,v in val.items():
-                    if k in {"status", "summary", "query", "customer_id"}:
-                        continue
-                    formatted_lines.append(f"{k}: {v if not isinstance(v,(list,dict)) else json.dumps(v)[:400]}")
-                formatted = "\n".join(formatted_lines) if formatted_lines else str(val)
-    else:
-        formatted = str(val)
-    return {**state, "final_response": formatted, "status": state.get("status","completed")}
+    # Stable section order regardless of which parallel branch finished first
+    order = {key: i for i, key in enumerate(SECTION_TITLES)}
+    intermediate_responses = dict(sorted(intermediate_responses.items(), key=lambda item: order.get(item[0], len(order))))
+    # When the turn is streamed, pass on the text of nodes whose agent did not stream tokens itself
+    already_streamed = {key for key in intermediate_responses if has_streamed(key)}
+    pieces = []
+    for key, piece in format_response_chunks(intermediate_responses):
+        if key not in already_streamed:
+            emit_token(key, piece, final=True)
+        pieces.append(piece)
+    status = _merged_status(intermediate_responses, state.get("status", "completed"))
+    return {**state, "final_response": "".join(pieces), "status": status}
 
 
-def create_graph():
-    """Create and return the workflow graph"""
+async def aformulate_response(state: TelecomAssistantState) -> TelecomAssistantState:
+    return formulate_response(state)
+
+
+async def afallback_handler(state: TelecomAssistantState) -> TelecomAssistantState:
+    return fallback_handler(state)
+
+
+def _build_graph(nodes: Dict[str, Any]):
     # Build the graph
     workflow = StateGraph(TelecomAssistantState)
 
     # Add nodes
-    workflow.add_node("classify_query", classify_query)
-    workflow.add_node("crew_ai_node", crew_ai_node)
-    workflow.add_node("autogen_node", autogen_node)
-    workflow.add_node("langchain_node", langchain_node)
-    workflow.add_node("llamaindex_node", llamaindex_node)
-    workflow.add_node("fallback_handler", fallback_handler)
-    workflow.add_node("formulate_response", formulate_response)
-
-    # Add conditional edges from classification to appropriate node
+    for name, node in nodes.items():
+        workflow.add_node(name, node)
+
+    # Conditional edges from classification; route_query may return several nodes,
+    # which LangGraph runs in the same step (fan-out), and formulate_response then
+    # runs once after all of them (fan-in)
     workflow.add_conditional_edges(
         "classify_query",
         route_query,
@@ -348,3 +472,29 @@ def create_graph():
 
     # Compile the graph
     return workflow.compile()
+
+
+def create_graph():
+    """Create and return the workflow graph"""
+    return _build_graph({
+        "classify_query": classify_query,
+        "crew_ai_node": crew_ai_node,
+        "autogen_node": autogen_node,
+        "langchain_node": langchain_node,
+        "llamaindex_node": llamaindex_node,
+        "fallback_handler": fallback_handler,
+        "formulate_response": formulate_response,
+    })
+
+
+def create_async_graph():
+    """Same workflow with async nodes; drive it with `await graph.ainvoke(state)`."""
+    return _build_graph({
+        "classify_query": aclassify_query,
+        "crew_ai_node": acrew_ai_node,
+        "autogen_node": aautogen_node,
+        "langchain_node": alangchain_node,
+        "llamaindex_node": allamaindex_node,
+        "fallback_handler": afallback_handler,
+        "formulate_response": aformulate_response,
+    })
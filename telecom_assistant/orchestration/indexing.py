@@ -0,0 +1,145 @@
+# Background indexing of uploaded documents
+#
+# Uploads enqueue a job instead of dropping the knowledge engine. One worker thread
+# runs the incremental ingestion (utils.ingestion) into a freshly loaded index and
+# swaps the rebuilt engine into the resource registry in one step; until then every
+# knowledge query keeps using the previous engine, so nobody pays for indexing
+# inline. Jobs queued while one is running are folded into the next run (one
+# ingestion covers every file written so far). Job status and progress are kept
+# for the admin UI.
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+class IndexingWorker:
+    """Single background thread that re-indexes documents and swaps in the new engine.
+
+    Job status: queued -> running -> done | failed; `stage`, `done` and `total`
+    follow the ingestion progress (chunks embedded so far).
+    """
+
+    def __init__(
+        self,
+        rebuild: Callable[[Callable[[str, int, int], None]], Any],
+        valid: Callable[[Any], bool] = lambda value: value is not None,
+        max_history: int = 50,
+    ):
+        # rebuild(progress) builds the new engine and swaps it in, returning it
+        self.rebuild = rebuild
+        self.valid = valid
+        self.max_history = max_history
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="indexing-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, files: Optional[List[str]] = None, reason: str = "upload") -> int:
+        """Queue a re-index (for `files`, informational) and return the job id."""
+        with self._lock:
+            job_id = next(self._ids)
+            self._jobs[job_id] = {
+                "id": job_id, "files": list(files or []), "reason": reason, "status": "queued",
+                "stage": "", "done": 0, "total": 0, "submitted_at": time.time(),
+                "started_at": None, "finished_at": None, "error": "",
+            }
+            self._trim()
+            self._pending += 1
+            self._idle.clear()
+        self._queue.put(self._jobs[job_id])
+        return job_id
+
+    def job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Every remembered job, newest first."""
+        with self._lock:
+            return [dict(job) for job in sorted(self._jobs.values(), key=lambda j: -j["id"])]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no job is queued or running; False on timeout."""
+        return self._idle.wait(timeout)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _trim(self) -> None:
+        finished = [j for j in sorted(self._jobs) if self._jobs[j]["status"] in ("done", "failed")]
+        for job_id in finished[:max(len(self._jobs) - self.max_history, 0)]:
+            del self._jobs[job_id]
+
+    def _update(self, batch: List[Dict[str, Any]], **fields: Any) -> None:
+        with self._lock:
+            for job in batch:
+                job.update(fields)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            while True:
+                try:
+                    queued = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is None:
+                    self._queue.put(None)
+                    break
+                batch.append(queued)
+            self._update(batch, status="running", stage="starting", started_at=time.time())
+            try:
+                engine = self.rebuild(lambda stage, done, total: self._update(batch, stage=stage, done=done, total=total))
+                if not self.valid(engine):
+                    reason = ": ".join(str(engine.get(k)) for k in ("error", "detail") if engine.get(k)) if isinstance(engine, dict) else ""
+                    raise RuntimeError(reason or "Index rebuild produced no usable engine")
+                self._update(batch, status="done", stage="swapped in", finished_at=time.time())
+            except Exception as e:
+                if logger:
+                    logger.error(f"Indexing job(s) {[j['id'] for j in batch]} failed: {e}")
+                self._update(batch, status="failed", error=str(e)[:500], finished_at=time.time())
+            with self._lock:
+                self._pending -= len(batch)
+                if self._pending == 0:
+                    self._idle.set()
+
+
+def _rebuild_knowledge_engine(progress: Callable[[str, int, int], None]) -> Any:
+    from agents.knowledge_agents import build_knowledge_engine
+    from orchestration.resources import RESOURCES
+    built: Dict[str, Any] = {}
+
+    def factory() -> Any:
+        built["engine"] = build_knowledge_engine(progress=progress)
+        return built["engine"]
+
+    # reload() keeps serving the old engine if this one is unusable; report the new one
+    RESOURCES.reload("knowledge_engine", factory)
+    return built.get("engine")
+
+
+def build_indexer() -> IndexingWorker:
+    from orchestration.resources import _usable_engine
+    return IndexingWorker(_rebuild_knowledge_engine, valid=_usable_engine)
+
+
+def get_indexer() -> IndexingWorker:
+    """Process-wide indexing worker (see orchestration.resources)."""
+    from orchestration.resources import RESOURCES
+    return RESOURCES.get("indexer")
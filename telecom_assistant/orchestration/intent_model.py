@@ -0,0 +1,263 @@
+# Local intent model and tiered classification
+#
+# Tier 1 is a multinomial logistic regression over hashed n-gram features
+# (utils.text_features), trained in-process on the labelled queries below
+# (ENABLE_LOCAL_CLASSIFICATION, on by default).
+# It answers in well under a millisecond on CPU. Only when its confidence is below a threshold
+# does the query escalate to tier 2 (the remote LLM, if enabled); otherwise the
+# keyword heuristic decides. Per-tier counts, latency and the escalation rate are
+# tracked for the admin/metrics views.
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.text_features import HashedNgramFeaturizer, SparseVector
+
+LABELS = ("billing_account", "network_troubleshooting", "service_recommendation", "knowledge_retrieval", "fallback")
+
+# Hand-written labelled queries, kept apart from the queries in the test suite
+# (tests/test_intent_model.py measures accuracy on its own held-out set)
+TRAINING_EXAMPLES: List[Tuple[str, str]] = [
+    # billing_account
+    ("My last invoice is much higher than usual, what happened?", "billing_account"),
+    ("Why was I charged twice for the same month?", "billing_account"),
+    ("There is an extra fee on my statement I don't recognise", "billing_account"),
+    ("When is my payment due?", "billing_account"),
+    ("How much do I owe on my account right now?", "billing_account"),
+    ("I paid yesterday but my balance still shows as outstanding", "billing_account"),
+    ("Please break down the taxes on my monthly bill", "billing_account"),
+    ("Can I get a refund for the overcharge last month?", "billing_account"),
+    ("Why am I paying more than my plan's monthly price?", "billing_account"),
+    ("What is this premium SMS charge?", "billing_account"),
+    ("I was billed for data roaming while I was at home", "billing_account"),
+    ("How do I change my billing address?", "billing_account"),
+    ("My autopay failed, will I get a late fee?", "billing_account"),
+    ("Explain the additional charges on this month's statement", "billing_account"),
+    ("How much will it cost to end my contract early?", "billing_account"),
+    ("Can I get a copy of my previous bills?", "billing_account"),
+    ("My account was suspended for non-payment", "billing_account"),
+    ("Why has my monthly amount gone up?", "billing_account"),
+    # network_troubleshooting
+    ("Calls keep dropping in the middle of conversations", "network_troubleshooting"),
+    ("I have no signal at my office since this morning", "network_troubleshooting"),
+    ("Mobile internet is extremely slow in the evenings", "network_troubleshooting"),
+    ("My phone shows full bars but nothing loads", "network_troubleshooting"),
+    ("Is there an outage in my area today?", "network_troubleshooting"),
+    ("People say my voice breaks up during calls", "network_troubleshooting"),
+    ("I can't connect to 4G, it keeps falling back to 3G", "network_troubleshooting"),
+    ("Text messages are not being delivered", "network_troubleshooting"),
+    ("The network disappears whenever I enter the metro", "network_troubleshooting"),
+    ("Video calls freeze and disconnect constantly", "network_troubleshooting"),
+    ("My internet speed dropped after the tower maintenance", "network_troubleshooting"),
+    ("Incoming calls go straight to voicemail", "network_troubleshooting"),
+    ("I lose coverage on the highway between two cities", "network_troubleshooting"),
+    ("Signal is weak indoors but fine outside", "network_troubleshooting"),
+    ("My hotspot keeps disconnecting", "network_troubleshooting"),
+    ("Why is the latency so high when I play online?", "network_troubleshooting"),
+    ("Emergency calls only is showing on my phone", "network_troubleshooting"),
+    ("Pages time out on mobile data since yesterday", "network_troubleshooting"),
+    ("My phone says no service since the software update", "network_troubleshooting"),
+    ("Service keeps cutting out in my building", "network_troubleshooting"),
+    ("Why is my connection slower than it used to be?", "network_troubleshooting"),
+    ("Downloads are slower on 5G than on 4G", "network_troubleshooting"),
+    # service_recommendation
+    ("Which plan should I pick if I stream movies every day?", "service_recommendation"),
+    ("Suggest a cheaper plan than the one I have", "service_recommendation"),
+    ("Do you have a package for students on a budget?", "service_recommendation"),
+    ("Should I upgrade to unlimited data?", "service_recommendation"),
+    ("Compare your two most popular plans for me", "service_recommendation"),
+    ("What plan works for a small business with five phones?", "service_recommendation"),
+    ("I travel abroad every month, which option suits me?", "service_recommendation"),
+    ("Recommend something for a senior who only makes calls", "service_recommendation"),
+    ("Is there a plan with more data for the same price?", "service_recommendation"),
+    ("What's a good option for two adults and two teenagers?", "service_recommendation"),
+    ("I game online a lot, which plan gives me the best speeds?", "service_recommendation"),
+    ("Which prepaid pack has the longest validity?", "service_recommendation"),
+    ("I want to downgrade because I barely use data", "service_recommendation"),
+    ("What do you offer for someone who works remotely?", "service_recommendation"),
+    ("Which of your plans includes calls to Canada?", "service_recommendation"),
+    ("Help me choose a plan that fits around 40 GB a month", "service_recommendation"),
+    ("Is the premium tier worth it for me?", "service_recommendation"),
+    ("What is the most affordable unlimited calling plan?", "service_recommendation"),
+    # knowledge_retrieval
+    ("How do I turn on wifi calling on an iPhone?", "knowledge_retrieval"),
+    ("What are the steps to activate an eSIM?", "knowledge_retrieval"),
+    ("How do I configure MMS settings?", "knowledge_retrieval"),
+    ("Where do I find the APN for iOS?", "knowledge_retrieval"),
+    ("How can I check if my phone supports 5G bands?", "knowledge_retrieval"),
+    ("What is the procedure to port my number from another carrier?", "knowledge_retrieval"),
+    ("How do I reset network settings on Android?", "knowledge_retrieval"),
+    ("Which cities have your 5G network?", "knowledge_retrieval"),
+    ("How do I set up voicemail?", "knowledge_retrieval"),
+    ("What documents do I need to get a new SIM?", "knowledge_retrieval"),
+    ("How do I enable data roaming in phone settings?", "knowledge_retrieval"),
+    ("What does VoLTE mean and how do I switch it on?", "knowledge_retrieval"),
+    ("How do I unlock my SIM with a PUK code?", "knowledge_retrieval"),
+    ("Instructions for setting up a mobile hotspot", "knowledge_retrieval"),
+    ("Is my area covered by fibre broadband?", "knowledge_retrieval"),
+    ("How do I block spam calls on my number?", "knowledge_retrieval"),
+    ("What is the coverage map for Bangalore?", "knowledge_retrieval"),
+    ("How do I install the carrier settings update?", "knowledge_retrieval"),
+    # fallback
+    ("What's the weather like today?", "fallback"),
+    ("Who won the cricket match yesterday?", "fallback"),
+    ("Write me a poem about the sea", "fallback"),
+    ("What is the capital of France?", "fallback"),
+    ("Can you help me with my maths homework?", "fallback"),
+    ("Recommend a good movie to watch tonight", "fallback"),
+    ("good morning", "fallback"),
+    ("thanks, bye", "fallback"),
+    ("What's your favourite colour?", "fallback"),
+    ("Translate hello into Spanish", "fallback"),
+    ("How do I bake a chocolate cake?", "fallback"),
+    ("Tell me something interesting", "fallback"),
+    ("Who are you?", "fallback"),
+    ("What time is it in Tokyo?", "fallback"),
+]
+
+
+def _normalize_scores(scores: Dict[str, float]) -> Dict[str, float]:
+    top = max(scores.values())
+    exps = {label: math.exp(s - top) for label, s in scores.items()}
+    total = sum(exps.values())
+    return {label: e / total for label, e in exps.items()}
+
+
+class LinearIntentModel:
+    """Multinomial logistic regression on sparse hashed n-gram features."""
+
+    def __init__(self, featurizer: Optional[HashedNgramFeaturizer] = None, labels: Sequence[str] = LABELS):
+        self.featurizer = featurizer or HashedNgramFeaturizer()
+        self.labels = tuple(labels)
+        self.weights: Dict[str, Dict[int, float]] = {label: {} for label in self.labels}
+        self.bias: Dict[str, float] = dict.fromkeys(self.labels, 0.0)
+        self._table: Dict[int, List[float]] = {}
+
+    def fit(self, examples: Sequence[Tuple[str, str]], epochs: int = 30, learning_rate: float = 0.5, seed: int = 13) -> "LinearIntentModel":
+        data = [(self.featurizer.transform(text), label) for text, label in examples]
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(data)
+            for x, target in data:
+                probs = self._softmax(x)
+                for label in self.labels:
+                    grad = probs[label] - (1.0 if label == target else 0.0)
+                    if not grad:
+                        continue
+                    w = self.weights[label]
+                    step = learning_rate * grad
+                    for k, v in x.items():
+                        w[k] = w.get(k, 0.0) - step * v
+                    self.bias[label] -= step
+        # Inference table: one lookup per feature yields the weights of every label
+        self._table = {}
+        for i, label in enumerate(self.labels):
+            for k, v in self.weights[label].items():
+                self._table.setdefault(k, [0.0] * len(self.labels))[i] = v
+        return self
+
+    def _softmax(self, x: SparseVector) -> Dict[str, float]:
+        scores = {}
+        for label in self.labels:
+            w = self.weights[label]
+            scores[label] = self.bias[label] + sum(v * w[k] for k, v in x.items() if k in w)
+        return _normalize_scores(scores)
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        scores = [self.bias[label] for label in self.labels]
+        table = self._table
+        for k, v in self.featurizer.transform(text).items():
+            row = table.get(k)
+            if row is not None:
+                for i, w in enumerate(row):
+                    scores[i] += v * w
+        return _normalize_scores(dict(zip(self.labels, scores)))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probs = self.predict_proba(text)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+
+class TieredIntentClassifier:
+    """Local model first; escalate to `llm` (query -> label) only below `threshold`."""
+
+    def __init__(
+        self,
+        threshold: float = 0.6,
+        llm: Optional[Callable[[str], str]] = None,
+        enabled: bool = True,
+        examples: Sequence[Tuple[str, str]] = TRAINING_EXAMPLES,
+    ):
+        self.threshold = threshold
+        self.llm = llm
+        self.enabled = enabled
+        self._examples = examples
+        self._model: Optional[LinearIntentModel] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def model(self) -> LinearIntentModel:
+        # Trained lazily (well under a second) so importing the graph stays cheap
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = LinearIntentModel().fit(self._examples)
+        return self._model
+
+    def predict(self, query: str) -> Dict[str, Any]:
+        """Return {"label", "tier", "confidence", "local_label", "probabilities"}.
+
+        label is None when no tier is sure; probabilities are the local model's
+        (empty when it is disabled) and feed multi-intent detection.
+        """
+        local_label, confidence, probabilities = None, 0.0, {}
+        if self.enabled:
+            model = self.model  # first call trains; keep that out of the latency figures
+            start = time.perf_counter()
+            probabilities = model.predict_proba(query)
+            local_label = max(probabilities, key=probabilities.get)
+            confidence = probabilities[local_label]
+            self._record("local", time.perf_counter() - start)
+            if confidence >= self.threshold:
+                return {"label": local_label, "tier": "local", "confidence": confidence,
+                        "local_label": local_label, "probabilities": probabilities}
+        if self.llm is not None:
+            start = time.perf_counter()
+            label = self.llm(query)
+            self._record("llm", time.perf_counter() - start, escalated=self.enabled)
+            return {"label": label, "tier": "llm", "confidence": confidence,
+                    "local_label": local_label, "probabilities": probabilities}
+        self._record("heuristic", 0.0, escalated=self.enabled)
+        return {"label": None, "tier": "heuristic", "confidence": confidence,
+                "local_label": local_label, "probabilities": probabilities}
+
+    def _record(self, tier: str, seconds: float, escalated: bool = False) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(tier, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "escalated": 0})
+            entry["count"] += 1
+            entry["total_ms"] += seconds * 1000
+            entry["max_ms"] = max(entry["max_ms"], seconds * 1000)
+            entry["escalated"] += escalated
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier counts and latency, plus the share of local attempts that escalated."""
+        with self._lock:
+            tiers = {
+                tier: {
+                    "count": int(e["count"]),
+                    "avg_ms": round(e["total_ms"] / e["count"], 4) if e["count"] else 0.0,
+                    "max_ms": round(e["max_ms"], 4),
+                }
+                for tier, e in self._stats.items()
+            }
+            local = self._stats.get("local", {}).get("count", 0)
+            escalated = sum(e["escalated"] for e in self._stats.values())
+        return {
+            "threshold": self.threshold,
+            "tiers": tiers,
+            "escalation_rate": round(escalated / local, 3) if local else 0.0,
+        }
@@ -0,0 +1,180 @@
+# Process-wide resource registry
+#
+# The compiled graphs, the dispatcher, the CrewAI crew pool, the AutoGen session pool, the
+# LangChain executor and the LlamaIndex engine are built once per process, no matter
+# how many browser sessions or HTTP workers use them. Each resource is built lazily
+# under its own lock (so two sessions never build the same crew twice, and building
+# the knowledge engine does not block a crew lookup), and has an explicit lifecycle:
+#   warm()    build everything (or a subset) up front, e.g. at server start
+#   reload()  rebuild and swap in atomically; in-flight calls keep the old instance
+#   close()   run each resource's closer and forget it
+# Factories that fail (missing API key or dependency) are not cached, so the next
+# call retries, matching the old per-module caches.
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+
+def _not_none(value: Any) -> bool:
+    return value is not None
+
+
+class _Resource:
+    def __init__(self, factory: Callable[[], Any], closer: Optional[Callable[[Any], None]], valid: Callable[[Any], bool]):
+        self.factory = factory
+        self.closer = closer
+        self.valid = valid
+        self.lock = threading.Lock()
+        self.instance: Any = None
+        self.built = False
+        self.build_ms = 0.0
+        self.builds = 0
+        self.hits = 0
+
+
+class ResourceRegistry:
+    """Named, lazily built, lock-protected process singletons."""
+
+    def __init__(self):
+        self._resources: Dict[str, _Resource] = {}
+        self._lock = threading.Lock()
+        self._warming: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        closer: Optional[Callable[[Any], None]] = None,
+        valid: Callable[[Any], bool] = _not_none,
+    ) -> None:
+        """Declare a resource; `valid` decides whether a built value is kept."""
+        with self._lock:
+            self._resources[name] = _Resource(factory, closer, valid)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._resources)
+
+    def _entry(self, name: str) -> _Resource:
+        try:
+            return self._resources[name]
+        except KeyError:
+            raise KeyError(f"Unknown resource {name!r}; registered: {', '.join(self.names())}")
+
+    def get(self, name: str) -> Any:
+        entry = self._entry(name)
+        if entry.built:
+            entry.hits += 1
+            return entry.instance
+        with entry.lock:
+            if not entry.built:
+                value = self._build(name, entry)
+                if not entry.valid(value):
+                    return value  # not cached; the next call retries
+                entry.instance, entry.built = value, True
+            return entry.instance
+
+    def _build(self, name: str, entry: _Resource, factory: Optional[Callable[[], Any]] = None) -> Any:
+        start = time.perf_counter()
+        value = (factory or entry.factory)()
+        entry.build_ms = round((time.perf_counter() - start) * 1000, 1)
+        entry.builds += 1
+        if logger:
+            logger.info(f"Built resource '{name}' in {entry.build_ms} ms")
+        return value
+
+    def warm(self, names: Optional[Iterable[str]] = None, background: bool = False) -> Dict[str, bool]:
+        """Build resources now; returns {name: usable}. With background=True returns at once."""
+        selected = list(names) if names is not None else self.names()
+        if background:
+            with self._lock:
+                if self._warming is None or not self._warming.is_alive():
+                    self._warming = threading.Thread(target=self.warm, args=(selected,), name="resource-warm", daemon=True)
+                    self._warming.start()
+            return {}
+        report = {}
+        for name in selected:
+            try:
+                report[name] = self._entry(name).valid(self.get(name))
+            except Exception as e:
+                report[name] = False
+                if logger:
+                    logger.warning(f"Warming resource '{name}' failed: {e}")
+        return report
+
+    def reload(self, name: str, factory: Optional[Callable[[], Any]] = None) -> Any:
+        """Rebuild `name` (with `factory` instead of the registered one, if given) and swap it in.
+
+        Readers keep getting the current instance until the swap; the old one is
+        closed after it.
+        """
+        entry = self._entry(name)
+        with entry.lock:
+            value = self._build(name, entry, factory)
+            if not entry.valid(value):
+                # Keep serving the old instance rather than dropping to a broken one
+                if logger:
+                    logger.warning(f"Reload of '{name}' produced no usable instance; keeping the current one")
+                return entry.instance if entry.built else value
+            old, had_old = entry.instance, entry.built
+            entry.instance, entry.built = value, True
+        if had_old and entry.closer is not None and old is not value:
+            entry.closer(old)
+        return value
+
+    def invalidate(self, name: str) -> None:
+        """Forget `name` without rebuilding; the next get() builds it."""
+        entry = self._entry(name)
+        with entry.lock:
+            old, had_old = entry.instance, entry.built
+            entry.instance, entry.built = None, False
+        if had_old and entry.closer is not None:
+            entry.closer(old)
+
+    def close(self) -> None:
+        """Close every built resource (reverse registration order)."""
+        for name in reversed(self.names()):
+            try:
+                self.invalidate(name)
+            except Exception as e:
+                if logger:
+                    logger.warning(f"Closing resource '{name}' failed: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entries = dict(self._resources)
+        return {
+            name: {"built": e.built, "build_ms": e.build_ms, "builds": e.builds, "hits": e.hits}
+            for name, e in entries.items()
+        }
+
+
+RESOURCES = ResourceRegistry()
+
+
+def _lazy(module: str, attribute: str) -> Callable[[], Any]:
+    # Import on first build: agent modules import this registry, not the other way round
+    return lambda: getattr(importlib.import_module(module), attribute)()
+
+
+def _usable_engine(engine: Any) -> bool:
+    return engine is not None and not (isinstance(engine, dict) and engine.get("error"))
+
+
+# Shared services and agents first so warm() builds them before the graphs that call into them
+RESOURCES.register("embeddings", _lazy("utils.embeddings", "build_embedding_service"),
+                   closer=lambda service: service.cache and service.cache.close())
+RESOURCES.register("billing_crews", _lazy("agents.billing_agents", "build_billing_crews"))
+RESOURCES.register("network_sessions", _lazy("agents.network_agents", "build_network_sessions"))
+RESOURCES.register("service_executor", _lazy("agents.service_agents", "build_service_agent"))
+RESOURCES.register("knowledge_engine", _lazy("agents.knowledge_agents", "build_knowledge_engine"), valid=_usable_engine)
+RESOURCES.register("graph", _lazy("orchestration.graph", "create_graph"))
+RESOURCES.register("async_graph", _lazy("orchestration.graph", "create_async_graph"))
+RESOURCES.register("dispatcher", _lazy("orchestration.dispatcher", "build_dispatcher"), closer=lambda dispatcher: dispatcher.close())
+RESOURCES.register("indexer", _lazy("orchestration.indexing", "build_indexer"), closer=lambda indexer: indexer.close())
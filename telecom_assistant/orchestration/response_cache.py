@@ -0,0 +1,391 @@
+# Semantic response cache in front of the LangGraph workflow
+#
+# Answers are cached per (keyword classifications, customer, history). The partition
+# comes from the keyword rules alone, so a hit costs no model or LLM call; only a miss
+# runs the configured classifier, and its result goes into the graph. Inside
+# one such partition a new query is served from cache when it is an exact match after
+# normalisation. With RESPONSE_CACHE_SEMANTIC (and a remote embedding model) a query
+# whose embedding is at least RESPONSE_CACHE_SIMILARITY similar to a cached query also
+# matches, but only if both mention the same numbers, names and negations: "Mumbai
+# West"/"Mumbai East" or "cancel"/"not cancel" read alike yet need different answers.
+# Each entry keeps the data fingerprint taken before it was answered: the
+# data_versions counters of the tables the answer depends on (and the documents
+# folder for knowledge answers). A hit whose fingerprint has moved is discarded, so
+# any write to that data sends the next query back through the agents. The history part is a hash of
+# the conversation the answering agents are shown, so a follow-up ("and for my other
+# number?") never reuses an answer given in a different conversation.
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from config.config import (
+    DOCUMENTS_DIR,
+    RESPONSE_CACHE_ENABLED,
+    EMBEDDING_BACKEND,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_SEMANTIC,
+    RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_TTL,
+)
+from orchestration.graph import LABEL_NODES, classify_query, keyword_intents
+from utils.async_database import run_in_db_thread
+from utils.data_versions import customer_scope
+from utils.database import get_data_versions
+from utils.memory import project
+from utils.text_features import dense_cosine
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+# Data each kind of answer is built from ("customer" = that customer's rows)
+FINGERPRINT_SCOPES: Dict[str, Tuple[str, ...]] = {
+    "billing_account": ("customer", "service_plans"),
+    "network_troubleshooting": ("customer", "network_incidents", "coverage_quality"),
+    "service_recommendation": ("customer", "service_plans"),
+    "knowledge_retrieval": ("documents",),
+    "fallback": (),
+}
+
+# State keys a cached answer restores
+CACHED_KEYS = ("classification", "classifications", "classification_evidence", "intermediate_responses", "final_response", "status")
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_SENTENCE_RE = re.compile(r"[^.?!]+")
+_WORD_RE = re.compile(r"[\w'’]+")
+_NEGATIONS = frozenset({"not", "no", "never", "without", "cannot", "none", "nothing"})
+
+
+def normalize_query(query: str) -> str:
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", query.lower())).strip()
+
+
+def query_facts(query: str) -> Tuple[Tuple[str, ...], Tuple[str, ...], bool]:
+    """(numbers, names, negated) of a query; two queries share an answer only if these agree.
+
+    Names are capitalised words other than a sentence's first word ("Mumbai West",
+    "Premium", "US"); negated is whether the query says not/no/never/...n't.
+    """
+    numbers = sorted(n.replace(",", "") for n in _NUMBER_RE.findall(query))
+    names, negated = set(), False
+    for sentence in _SENTENCE_RE.findall(query):
+        words = _WORD_RE.findall(sentence)
+        for i, word in enumerate(words):
+            lowered = word.lower()
+            negated = negated or lowered in _NEGATIONS or lowered.endswith(("n't", "n’t"))
+            if i and word[0].isupper() and lowered != "i" and not lowered.startswith(("i'", "i’")):
+                names.add(lowered)
+    return tuple(numbers), tuple(sorted(names)), negated
+
+
+def documents_signature(path: str = DOCUMENTS_DIR) -> Tuple[int, int, int]:
+    """(file count, newest mtime, total size) of the knowledge-base folder."""
+    count = newest = total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    count += 1
+                    newest = max(newest, stat.st_mtime_ns)
+                    total += stat.st_size
+    except OSError:
+        pass
+    return count, newest, total
+
+
+def _scopes(classifications: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(s for label in classifications for s in FINGERPRINT_SCOPES.get(label, ())))
+
+
+def fingerprint(classifications: Sequence[str], customer_id: str) -> Tuple:
+    """Data versions behind an answer to `classifications` (one or several intents)."""
+    db_scopes = []
+    documents = None
+    for scope in _scopes(classifications):
+        if scope == "customer":
+            if customer_id:
+                db_scopes.append(customer_scope(customer_id))
+        elif scope == "documents":
+            documents = documents_signature()
+        else:
+            db_scopes.append(scope)
+    versions = get_data_versions(db_scopes) if db_scopes else ()
+    return tuple(zip(db_scopes, versions)) + ((("documents", documents),) if documents else ())
+
+
+def history_key(classifications: Sequence[str], state: Dict[str, Any]) -> str:
+    """Hash of the conversation the answering nodes see ('' when they see none)."""
+    query = state.get("query", "")
+    views = [
+        project(state.get("chat_history"), LABEL_NODES[label][:-len("_node")], query)
+        for label in classifications if label in LABEL_NODES
+    ]
+    if not any(views):
+        return ""
+    return hashlib.sha256("\x1f".join(views).encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticResponseCache:
+    """LRU + TTL cache of graph results, matched by normalised text.
+
+    Given `vectorize` (an embedding model's text -> vector), a query can also match
+    a cached one at least `similarity_threshold` similar with the same query_facts.
+    Leave it unset for lexical vectors such as hashed n-grams: they score
+    "Mumbai West" and "Mumbai East" closer than two real paraphrases.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl: float = 600.0,
+        similarity_threshold: float = 0.9,
+        vectorize: Optional[Callable[[str], Any]] = None,
+        similarity: Optional[Callable[[Any, Any], float]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._vectorize = vectorize
+        self._similarity = similarity or dense_cosine
+        # entry id -> (partition, normalised query, vector, result, expires_at, facts); order = LRU
+        self._entries: "OrderedDict[int, Tuple[Hashable, str, Any, Dict[str, Any], float, Tuple]]" = OrderedDict()
+        self._partitions: Dict[Hashable, Dict[str, int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "similar_hits": 0, "misses": 0, "stores": 0,
+                       "evictions": 0, "expirations": 0, "invalidations": 0, "stale": 0}
+
+    def lookup(self, partition: Hashable, query: str) -> Optional[Dict[str, Any]]:
+        """Return {"result", "similarity", "matched_query"} or None."""
+        normalized = normalize_query(query)
+        with self._lock:
+            bucket = self._partitions.get(partition)
+            entry_id = bucket.get(normalized) if bucket else None
+            if entry_id is not None and self._alive(entry_id, time.monotonic()):
+                return self._hit(entry_id, 1.0)
+            if not bucket or self._vectorize is None:
+                self._stats["misses"] += 1
+                return None
+        # Embedding may be a network round trip: never hold the lock for it
+        vector, facts = self._vectorize(normalized), query_facts(query)
+        now = time.monotonic()
+        with self._lock:
+            best, best_score = None, 0.0
+            for candidate_id in list(self._partitions.get(partition, {}).values()):
+                if not self._alive(candidate_id, now) or self._entries[candidate_id][5] != facts:
+                    continue
+                score = self._similarity(vector, self._entries[candidate_id][2])
+                if score > best_score:
+                    best, best_score = candidate_id, score
+            if best is None or best_score < self.similarity_threshold:
+                self._stats["misses"] += 1
+                return None
+            self._stats["similar_hits"] += 1
+            return self._hit(best, best_score)
+
+    def discard(self, partition: Hashable, matched_query: str) -> None:
+        """Drop an entry a caller found stale after lookup() returned it (counted as a miss)."""
+        with self._lock:
+            entry_id = self._partitions.get(partition, {}).get(matched_query)
+            if entry_id is not None:
+                self._drop(entry_id)
+            self._stats["stale"] += 1
+            self._stats["hits"] -= 1
+            self._stats["misses"] += 1
+
+    def store(self, partition: Hashable, query: str, result: Dict[str, Any]) -> None:
+        normalized = normalize_query(query)
+        vector = self._vectorize(normalized) if self._vectorize is not None else None
+        with self._lock:
+            bucket = self._partitions.setdefault(partition, {})
+            previous = bucket.get(normalized)
+            if previous is not None:
+                self._drop(previous)
+                bucket = self._partitions.setdefault(partition, {})
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (partition, normalized, vector, result, time.monotonic() + self.ttl, query_facts(query))
+            bucket[normalized] = entry_id
+            self._stats["stores"] += 1
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop entries whose partition matches `predicate` (all entries when None)."""
+        with self._lock:
+            stale = [i for i, e in self._entries.items() if predicate is None or predicate(e[0])]
+            for entry_id in stale:
+                self._drop(entry_id)
+            self._stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 3) if lookups else 0.0
+        return snapshot
+
+    def _hit(self, entry_id: int, score: float) -> Dict[str, Any]:
+        self._stats["hits"] += 1
+        self._entries.move_to_end(entry_id)
+        _, matched, _, result, _, _ = self._entries[entry_id]
+        return {"result": result, "similarity": round(score, 4), "matched_query": matched}
+
+    def _alive(self, entry_id: int, now: float) -> bool:
+        if self._entries[entry_id][4] > now:
+            return True
+        self._drop(entry_id)
+        self._stats["expirations"] += 1
+        return False
+
+    def _drop(self, entry_id: int) -> None:
+        partition, normalized = self._entries.pop(entry_id)[:2]
+        bucket = self._partitions.get(partition)
+        if bucket is not None:
+            bucket.pop(normalized, None)
+            if not bucket:
+                del self._partitions[partition]
+
+
+class CachedWorkflow:
+    """Wraps a compiled graph: invoke()/ainvoke() answer repeat questions from the response cache."""
+
+    def __init__(self, workflow: Any, cache: SemanticResponseCache):
+        self._workflow = workflow
+        self.cache = cache
+
+    def partition(self, state: Dict[str, Any]) -> Hashable:
+        # Keyword rules only: cheap and deterministic, so repeats land in the same partition
+        labels = tuple(keyword_intents(state.get("query", "").strip()))
+        return (labels,) + self._dependencies(labels, state)
+
+    @staticmethod
+    def _dependencies(labels: Sequence[str], state: Dict[str, Any]) -> Tuple[str, str]:
+        """(customer id, history hash) an answer to `labels` depends on."""
+        customer_id = ""
+        if "customer" in _scopes(labels):
+            customer_id = (state.get("customer_info") or {}).get("customer_id", "")
+        return customer_id, history_key(labels, state)
+
+    def _classify(self, state: Dict[str, Any], partition: Hashable) -> Tuple[Dict[str, Any], Optional[Tuple]]:
+        """Full classification for a miss, plus the data fingerprint to store (None: do not cache).
+
+        Multi-intent answers depend on the whole label set. If the configured classifier
+        picked labels that need a customer or history the keyword partition leaves out,
+        the answer is not cached under it.
+        """
+        classified = classify_query(state)
+        labels = tuple(classified.get("classifications") or [classified.get("classification", "")])
+        if self._dependencies(labels, state) != tuple(partition[1:]):
+            return classified, None
+        return classified, (labels, fingerprint(labels, partition[1]))
+
+    def _lookup(self, state: Dict[str, Any], partition: Hashable) -> Optional[Dict[str, Any]]:
+        return self.cache.lookup(partition, state.get("query", ""))
+
+    def _fresh(self, partition: Hashable, hit: Dict[str, Any]) -> bool:
+        labels, versions = hit["result"]["fingerprint"]
+        if fingerprint(labels, partition[1]) == versions:
+            return True
+        self.cache.discard(partition, hit["matched_query"])
+        return False
+
+    def _hit(self, state: Dict[str, Any], hit: Dict[str, Any], start: float) -> Dict[str, Any]:
+        query = state.get("query", "")
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        if logger:
+            logger.info(f"Response cache hit for query='{query}' (similarity {hit['similarity']}, {elapsed_ms} ms)")
+        return {**state, **hit["result"]["state"], "cache": {"hit": True, "similarity": hit["similarity"],
+                                                             "matched_query": hit["matched_query"], "elapsed_ms": elapsed_ms}}
+
+    def _store(self, partition: Hashable, query: str, versions: Optional[Tuple], result: Dict[str, Any]) -> Dict[str, Any]:
+        if versions is not None and _cacheable(result):
+            state = {k: result[k] for k in CACHED_KEYS if k in result}
+            self.cache.store(partition, query, {"state": state, "fingerprint": versions})
+        return {**result, "cache": {"hit": False}}
+
+    def invoke(self, state: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        partition = self.partition(state)
+        hit = self._lookup(state, partition)
+        if hit is not None and self._fresh(partition, hit):
+            return self._hit(state, hit, start)
+        classified, versions = self._classify(state, partition)
+        # The graph's classify_query reuses this classification instead of repeating it
+        return self._store(partition, state.get("query", ""), versions, self._workflow.invoke(classified, *args, **kwargs))
+
+    async def ainvoke(self, state: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        partition = self.partition(state)
+        # Embedding (lookup) and the data fingerprint may block; keep them off the event loop
+        hit = await asyncio.to_thread(self._lookup, state, partition)
+        if hit is not None and await run_in_db_thread(self._fresh, partition, hit):
+            return self._hit(state, hit, start)
+        # The configured classifier may call the LLM
+        classified, versions = await asyncio.to_thread(self._classify, state, partition)
+        return self._store(partition, state.get("query", ""), versions, await self._workflow.ainvoke(classified, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._workflow, name)
+
+
+def _cacheable(result: Any) -> bool:
+    if not isinstance(result, dict) or not result.get("final_response"):
+        return False
+    if result.get("status") == "error":
+        return False
+    responses = result.get("intermediate_responses") or {}
+    return not any(isinstance(v, dict) and v.get("status") == "error" for v in responses.values())
+
+
+def _embedding_vectorizer() -> Optional[Callable[[str], Any]]:
+    """Query embedder for similar-query matching, or None (exact matches only)."""
+    if not RESPONSE_CACHE_SEMANTIC:
+        return None
+    if EMBEDDING_BACKEND == "local":
+        # Hashed n-grams measure shared spelling, not meaning
+        if logger:
+            logger.warning("RESPONSE_CACHE_SEMANTIC needs a remote embedding model; using exact matches only")
+        return None
+
+    def vectorize(text: str) -> Any:
+        from utils.embeddings import get_embedding_service
+        return get_embedding_service().embed_query(text)
+
+    return vectorize
+
+
+RESPONSE_CACHE = SemanticResponseCache(
+    maxsize=RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=RESPONSE_CACHE_TTL,
+    similarity_threshold=RESPONSE_CACHE_SIMILARITY,
+    vectorize=_embedding_vectorizer(),
+)
+
+
+def cached_workflow(workflow: Any) -> Any:
+    """Wrap a compiled graph with the shared response cache (no-op when disabled)."""
+    if not RESPONSE_CACHE_ENABLED:
+        return workflow
+    return CachedWorkflow(workflow, RESPONSE_CACHE)
+
+
+def invalidate_customer(customer_id: str) -> int:
+    """Drop cached answers for one customer.
+
+    Not needed after database writes: those bump the data_versions counters, which
+    changes the fingerprint and so misses the old entries anyway.
+    """
+    return RESPONSE_CACHE.invalidate(lambda partition: partition[1] == customer_id)
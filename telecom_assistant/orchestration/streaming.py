@@ -0,0 +1,110 @@
+# Streaming runs of the graph
+#
+# stream_workflow() runs workflow.invoke() on a worker thread with a StreamEmitter
+# bound to its context and yields the emitter's events as they arrive, ending with
+# a "done" event that carries the final state. Time-to-first-token (first answer
+# token, not first status line) and total time are recorded per classification in
+# STREAM_METRICS for the admin view.
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from utils.streaming import StreamEmitter, use_emitter
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(pct * len(ordered)))], 1)
+
+
+class StreamMetrics:
+    """Rolling TTFT / total latency samples per classification."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, Deque[Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, classification: str, ttft_ms: Optional[float], total_ms: float, tokens: int) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(classification or "unknown", deque(maxlen=self.window))
+            samples.append({"ttft_ms": ttft_ms, "total_ms": total_ms, "tokens": tokens})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {label: list(samples) for label, samples in self._samples.items()}
+        report = {}
+        for label, samples in snapshot.items():
+            ttft = [s["ttft_ms"] for s in samples if s["ttft_ms"] is not None]
+            total = [s["total_ms"] for s in samples]
+            report[label] = {
+                "count": len(samples),
+                "ttft_p50_ms": _percentile(ttft, 0.5),
+                "ttft_p95_ms": _percentile(ttft, 0.95),
+                "total_p50_ms": _percentile(total, 0.5),
+                "total_p95_ms": _percentile(total, 0.95),
+            }
+        return report
+
+
+STREAM_METRICS = StreamMetrics()
+
+
+def stream_workflow(workflow: Any, state: Dict[str, Any], poll_interval: float = 0.1) -> Iterator[Dict[str, Any]]:
+    """Yield token/message/status events for one turn, then {"type": "done", "result", "ttft_ms", "total_ms"}.
+
+    An exception inside the graph ends the stream with {"type": "error", "text"}.
+    """
+    emitter = StreamEmitter()
+    outcome: Dict[str, Any] = {}
+    finished = threading.Event()
+
+    def run() -> None:
+        with use_emitter(emitter):
+            try:
+                outcome["result"] = workflow.invoke(state)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+
+    # Copy the caller's context so the worker sees e.g. the active customer bundle
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), name="graph-stream", daemon=True).start()
+
+    while True:
+        try:
+            yield emitter.events.get(timeout=poll_interval)
+            continue
+        except queue.Empty:
+            pass
+        if finished.is_set() and emitter.events.empty():
+            break
+
+    total_ms = round((time.perf_counter() - emitter.started) * 1000, 1)
+    if "error" in outcome:
+        if logger:
+            logger.error(f"Streamed graph run failed: {outcome['error']}")
+        yield {"type": "error", "text": str(outcome["error"]), "elapsed_ms": total_ms}
+        return
+    result = outcome.get("result") or {}
+    classification = result.get("classification", "") if isinstance(result, dict) else ""
+    STREAM_METRICS.record(classification, emitter.ttft_ms, total_ms, emitter.token_count)
+    if logger:
+        logger.info(f"Streamed {classification or 'query'}: first token {emitter.ttft_ms} ms, total {total_ms} ms")
+    yield {"type": "done", "result": result, "ttft_ms": emitter.ttft_ms, "total_ms": total_ms, "elapsed_ms": total_ms}
+
+
+def streaming_stats() -> Dict[str, Any]:
+    """TTFT and total latency percentiles per classification."""
+    return STREAM_METRICS.stats()
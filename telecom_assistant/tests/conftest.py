@@ -0,0 +1,32 @@
+"""
+Shared test fixtures - a private copy of telecom.db per test, removed afterwards
+  temp_db_path   path to the copy (for tests that open their own connections or pool)
+  temp_database  the copy, migrated, with utils.database pointed at it and its pool/caches reset
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SOURCE_DB = os.path.join(os.path.dirname(__file__), '..', 'data', 'telecom.db')
+
+
+@pytest.fixture
+def temp_db_path(tmp_path):
+    path = tmp_path / "telecom.db"
+    shutil.copy(SOURCE_DB, path)
+    return str(path)
+
+
+@pytest.fixture
+def temp_database(temp_db_path, monkeypatch):
+    from utils import database as db
+    db.close_pool()
+    monkeypatch.setattr(db, "SQLITE_DB_PATH", temp_db_path)
+    db.migrate()
+    yield temp_db_path
+    # Close before monkeypatch restores the path so no pool outlives the temp file
+    db.close_pool()
@@ -0,0 +1,101 @@
+"""
+Async database test - runs against a temporary copy of telecom.db, no LLM needed
+Tests: the customer overview's lookups overlap and match the sync helpers, the
+async customer bundle matches the sync one, AutoGen's async tools give the same
+answers as the sync ones
+"""
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import agents.network_agents as na
+import utils.async_database as adb
+from utils import database as db
+from utils.customer_context import aload_customer_context, load_customer_context
+
+
+def _track_overlap(monkeypatch, delay=0.1):
+    """Slow every DB-thread call down by `delay` and record the peak number running at once."""
+    lock, running, peak = threading.Lock(), [0], [0]
+    real = adb.run_in_db_thread
+
+    def slowed(fn):
+        def call(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            try:
+                time.sleep(delay)
+                return fn(*args, **kwargs)
+            finally:
+                with lock:
+                    running[0] -= 1
+        return call
+
+    async def tracked(fn, *args, **kwargs):
+        return await real(slowed(fn), *args, **kwargs)
+
+    monkeypatch.setattr(adb, "run_in_db_thread", tracked)
+    return peak
+
+
+def test_overview_lookups_overlap(temp_database, monkeypatch):
+    customer_id = db.list_customers(1)[0]["customer_id"]
+    peak = _track_overlap(monkeypatch)
+    start = time.perf_counter()
+    overview = asyncio.run(adb.aload_customer_overview(customer_id))
+    elapsed = time.perf_counter() - start
+    # customer, usage and tickets together, then the plan: two delays, not four
+    assert peak[0] == 3 and elapsed < 0.35, (peak[0], elapsed)
+    customer = db.get_customer(customer_id)
+    assert overview == {
+        "customer": customer,
+        "usage": db.get_customer_usage(customer_id),
+        "plan": db.get_service_plan(customer["service_plan_id"]),
+        "tickets": db.get_customer_tickets(customer_id),
+    }
+
+
+def test_gathered_helpers_match_sync(temp_database):
+    async def lookups():
+        return await asyncio.gather(
+            adb.alist_active_incidents("Mumbai"),
+            adb.aget_device_compatibility("Samsung"),
+            adb.aget_service_areas("Delhi"),
+            adb.arun_query("customer.list", (3,), "records"),
+        )
+
+    assert asyncio.run(lookups()) == [
+        db.list_active_incidents("Mumbai"),
+        db.get_device_compatibility("Samsung"),
+        db.get_service_areas("Delhi"),
+        db.run_query("customer.list", (3,), "records"),
+    ]
+
+
+def test_async_customer_context_matches_sync(temp_database):
+    customer_id = db.list_customers(1)[0]["customer_id"]
+    sync, concurrent = load_customer_context(customer_id), asyncio.run(aload_customer_context(customer_id))
+    sync.pop("loaded_at"), concurrent.pop("loaded_at")
+    assert concurrent == sync and concurrent["plan"] is not None
+
+
+def test_async_network_tools_match_sync(temp_database):
+    assert na.ASYNC_FUNCTION_MAP.keys() == na.FUNCTION_MAP.keys()
+    assert all(inspect.iscoroutinefunction(fn) for fn in na.ASYNC_FUNCTION_MAP.values())
+    calls = [
+        ("check_network_incidents", {"region": "Mumbai"}),
+        ("check_network_incidents", {"region": "Atlantis"}),
+        ("check_network_incidents", {}),
+        ("search_network_issue_kb", {"keyword": "call"}),
+        ("get_device_info", {"device_make": "sung"}),
+    ]
+    for name, kwargs in calls:
+        expected = na.FUNCTION_MAP[name](**kwargs)
+        assert asyncio.run(na.ASYNC_FUNCTION_MAP[name](**kwargs)) == expected, name
+    assert "not in our network monitoring" in na.check_network_incidents("Atlantis")
@@ -0,0 +1,82 @@
+"""
+CrewAI crew pool test - fake crews, no LLM needed
+Tests: concurrent billing turns (sync and kickoff_async) each get their own crew,
+crews are reused once a turn finishes, the idle pool stays bounded, a missing
+crew is reported as not initialized
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import agents.billing_agents as ba
+
+
+class FakeCrew:
+    """Fails if two kickoffs overlap, like a Crew whose task outputs get mixed up."""
+
+    def __init__(self):
+        self.running = False
+        self.runs = 0
+
+    def _start(self, inputs):
+        assert not self.running, "crew shared by concurrent turns"
+        self.running = True
+        self.runs += 1
+        return f"{inputs['customer_id']}: {inputs['query']}"
+
+    def kickoff(self, inputs):
+        answer = self._start(inputs)
+        time.sleep(0.05)
+        self.running = False
+        return answer
+
+    async def kickoff_async(self, inputs):
+        answer = self._start(inputs)
+        await asyncio.sleep(0.05)
+        self.running = False
+        return answer
+
+
+def _use_pool(monkeypatch, max_idle=2):
+    pool = ba.BillingCrewPool(FakeCrew, max_idle=max_idle)
+    monkeypatch.setattr(ba, "billing_crews", lambda: pool)
+    return pool
+
+
+def test_concurrent_turns_get_their_own_crew(monkeypatch):
+    pool = _use_pool(monkeypatch)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(ba.process_billing_query(f"CUST00{i}", "Why?")))
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert sorted(r["raw"] for r in results) == [f"CUST00{i}: Why?" for i in range(4)]
+    assert all(r["status"] == "ok" for r in results)
+    stats = pool.stats()
+    assert stats["created"] == 4 and stats["in_use"] == 0 and stats["idle"] == 2 and stats["discarded"] == 2
+
+
+def test_async_turns_get_their_own_crew(monkeypatch):
+    pool = _use_pool(monkeypatch)
+
+    async def turns():
+        return await asyncio.gather(*(ba.aprocess_billing_query(f"CUST00{i}", "Why?") for i in range(3)))
+
+    results = asyncio.run(turns())
+    assert [r["status"] for r in results] == ["ok"] * 3 and pool.stats()["created"] == 3
+    # Idle crews are reused for the next turns
+    asyncio.run(ba.aprocess_billing_query("CUST001", "Again"))
+    assert pool.stats()["reused"] == 1
+
+
+def test_missing_crew_is_not_initialized(monkeypatch):
+    monkeypatch.setattr(ba, "billing_crews", lambda: ba.BillingCrewPool(lambda: None))
+    assert ba.process_billing_query("CUST001", "Why?")["error"] == "CrewAI not initialized"
+    monkeypatch.setattr(ba, "billing_crews", lambda: None)
+    assert asyncio.run(ba.aprocess_billing_query("CUST001", "Why?"))["error"] == "CrewAI not initialized"
@@ -0,0 +1,71 @@
+"""
+Conversation memory test - pure Python, no LLM needed
+Tests: a long chat stays within the token budget, old turns survive as summary
+lines, per-node projections differ (knowledge retrieval gets none), the current
+query is not repeated, history round-trips through the graph state
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.memory import ConversationMemory, count_tokens, project
+
+
+def _long_chat(turns=200):
+    memory = ConversationMemory(max_tokens=400, window_messages=6, summary_tokens=120)
+    for i in range(turns):
+        memory.add("user", f"Question {i}: why was I charged extra for roaming in month {i}? Please explain.")
+        memory.add("assistant", f"Answer {i}: the roaming pack expired on day {i % 28 + 1}. " + "Details follow. " * 20)
+    return memory
+
+
+def test_long_chat_stays_bounded():
+    memory = _long_chat()
+    assert memory.total_messages == 400
+    assert len(memory.messages()) <= 6
+    assert memory.token_count() <= 400
+    assert count_tokens("\n".join(m["content"] for m in memory.history())) <= 420
+
+
+def test_old_turns_become_summary_lines():
+    memory = ConversationMemory(max_tokens=1000, window_messages=2, summary_tokens=200)
+    memory.add("user", "My bill doubled this month. I am on the Basic plan.")
+    memory.add("assistant", "The increase comes from international roaming. You used 3 GB abroad.")
+    memory.add("user", "Can I get a refund?")
+    summary = memory.summary
+    assert "Customer: My bill doubled this month." in summary
+    assert "I am on the Basic plan" not in summary  # first sentence only
+    assert [m["content"] for m in memory.messages()] == [
+        "The increase comes from international roaming. You used 3 GB abroad.", "Can I get a refund?"]
+
+
+def test_oversized_message_is_truncated():
+    memory = ConversationMemory(max_tokens=200, summary_tokens=50)
+    memory.add("user", "log line " * 1000)
+    assert memory.token_count() <= 151
+
+
+def test_projection_per_node():
+    history = _long_chat(20).history() + [{"role": "user", "content": "And now my data is slow"}]
+    billing = project(history, "crew_ai", query="And now my data is slow")
+    network = project(history, "autogen", query="And now my data is slow")
+    assert billing.startswith("Earlier in this conversation:") and "Recent messages:" in billing
+    assert "Earlier in this conversation" not in network
+    assert network.count("\nCustomer:") + network.count("\nAssistant:") == 2
+    assert "And now my data is slow" not in billing
+    assert project(history, "llamaindex") == ""
+    assert project([], "crew_ai") == ""
+
+
+def test_history_round_trip():
+    memory = _long_chat(30)
+    restored = ConversationMemory.from_history(memory.history(), max_tokens=400, window_messages=6, summary_tokens=120)
+    assert restored.history() == memory.history()
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
@@ -0,0 +1,34 @@
+"""
+Customer context test - runs against a temporary copy of telecom.db, no LLM needed
+Tests: bundle matches the individual helpers, tools read the bundle, other customers fall back to the DB
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.customer_context import (
+    context_customer, context_plan, context_usage, current_customer_context,
+    load_customer_context, use_customer_context,
+)
+from utils.database import get_customer, get_customer_usage, get_service_plan, list_customers
+
+
+def test_bundle_matches_helpers(temp_database):
+    customer_id = list_customers(1)[0]["customer_id"]
+    context = load_customer_context(customer_id)
+    assert context["customer"] == get_customer(customer_id)
+    assert context["usage"] == get_customer_usage(customer_id)
+    assert context["plan"] == get_service_plan(context["customer"]["service_plan_id"])
+
+
+def test_reads_prefer_bundle_and_fall_back(temp_database):
+    first, second = [c["customer_id"] for c in list_customers(2)]
+    context = load_customer_context(first)
+    assert current_customer_context() is None
+    with use_customer_context(context):
+        assert context_usage(first) is context["usage"]
+        assert context_customer(first) is context["customer"]
+        assert context_plan(context["plan"]["plan_id"]) is context["plan"]
+        assert context_customer(second) == get_customer(second), "Other customers must come from the DB"
+    assert current_customer_context() is None
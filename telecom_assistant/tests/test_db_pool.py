@@ -0,0 +1,101 @@
+"""
+Connection pool test - runs against a temporary copy of telecom.db
+Tests: reader reuse, nested reads, serialized writes, health checks, metrics
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.db_pool import ConnectionPool, PoolTimeout
+
+
+def test_reader_reuse_and_nesting(temp_db_path):
+    pool = ConnectionPool(temp_db_path, size=2)
+    with pool.read() as outer:
+        with pool.read() as inner:
+            assert outer is inner, "Nested reads on one thread should share a connection"
+    with pool.read() as again:
+        assert again is outer, "Idle connection should be reused"
+    stats = pool.stats()
+    assert stats["connections_created"] == 1, stats
+    assert stats["in_use"] == 0, stats
+    pool.close()
+
+
+def test_readers_are_read_only_and_wal_enabled(temp_db_path):
+    pool = ConnectionPool(temp_db_path, size=1)
+    with pool.read() as con:
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        try:
+            con.execute("DELETE FROM customers")
+            raise AssertionError("Reader connection accepted a write")
+        except Exception as e:
+            assert "readonly" in str(e).lower(), e
+    pool.close()
+
+
+def test_serialized_writes_and_rollback(temp_db_path):
+    pool = ConnectionPool(temp_db_path, size=4)
+
+    def worker(n: int):
+        for i in range(20):
+            with pool.write() as con:
+                con.execute(
+                    "UPDATE customers SET last_billing_date = ? WHERE customer_id = 'CUST001'",
+                    (f"2024-{n:02d}-{i:02d}",),
+                )
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pool.stats()["writes"] == 80
+
+    try:
+        with pool.write() as con:
+            con.execute("DELETE FROM customers")
+            raise ValueError("abort")
+    except ValueError:
+        pass
+    with pool.read() as con:
+        assert con.execute("SELECT COUNT(*) FROM customers").fetchone()[0] > 0, "Rollback failed"
+    pool.close()
+
+
+def test_timeout_when_exhausted(temp_db_path):
+    pool = ConnectionPool(temp_db_path, size=1, timeout=0.2)
+    held = threading.Event()
+    done = threading.Event()
+
+    def hold():
+        with pool.read():
+            held.set()
+            done.wait(2)
+
+    t = threading.Thread(target=hold)
+    t.start()
+    held.wait(2)
+    try:
+        with pool.read():
+            raise AssertionError("Expected PoolTimeout")
+    except PoolTimeout:
+        pass
+    done.set()
+    t.join()
+    assert pool.stats()["timeouts"] == 1
+    pool.close()
+
+
+def test_health_check_replaces_dead_connection(temp_db_path):
+    pool = ConnectionPool(temp_db_path, size=1, health_check_interval=0)
+    with pool.read() as con:
+        first = con
+    first.close()
+    with pool.read() as con:
+        assert con is not first
+        assert con.execute("SELECT 1").fetchone() == (1,)
+    assert pool.stats()["health_check_failures"] == 1
+    pool.close()
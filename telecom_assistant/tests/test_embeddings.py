@@ -0,0 +1,93 @@
+"""
+Embedding service test - deterministic FakeEmbedder and a temporary cache, no API calls
+Tests: order and dedupe, batching, the on-disk cache survives a new service,
+429s are retried while other errors are not, the token limiter makes callers wait,
+the local backend is deterministic and ranks related text higher
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.embeddings import EmbeddingCache, EmbeddingService, FakeEmbedder, RateLimiter, build_embedding_service
+from utils.text_features import dense_cosine
+
+
+def _service(directory, embedder=None, **kwargs):
+    cache = EmbeddingCache(os.path.join(directory, "embeddings.db"))
+    return EmbeddingService(embedder or FakeEmbedder(), cache, backoff_base=0.01, **kwargs)
+
+
+def test_order_dedupe_and_batching(tmp_path):
+    directory = str(tmp_path)
+    embedder = FakeEmbedder()
+    service = _service(directory, embedder, batch_size=3, max_concurrency=2)
+    texts = [f"chunk {i}" for i in range(10)] + ["chunk 0", "chunk 5"]
+    vectors = service.embed(texts)
+    assert len(vectors) == 12 and vectors[0] == vectors[10] and vectors[5] == vectors[11]
+    assert vectors[0] != vectors[1]
+    assert embedder.texts_embedded == 10 and embedder.calls == 4
+    assert vectors == FakeEmbedder().embed(texts)
+
+
+def test_cache_survives_restart(tmp_path):
+    directory = str(tmp_path)
+    first = _service(directory)
+    first.embed(["How do I enable VoLTE?", "Roaming charges explained"])
+    first.cache.close()
+    embedder = FakeEmbedder()
+    second = _service(directory, embedder)
+    second.embed(["Roaming charges explained", "A new chunk"])
+    assert embedder.texts_embedded == 1
+    assert second.stats()["cache_hits"] == 1
+    # Different model, different cache entries
+    other = FakeEmbedder(model="fake-v2")
+    _service(directory, other).embed(["Roaming charges explained"])
+    assert other.texts_embedded == 1
+
+
+def test_rate_limit_errors_are_retried(tmp_path):
+    directory = str(tmp_path)
+    embedder = FakeEmbedder(fail_times=2)
+    service = _service(directory, embedder)
+    assert len(service.embed(["text"])) == 1
+    assert service.stats()["retries"] == 2 and embedder.calls == 3
+
+    class Broken(FakeEmbedder):
+        def embed(self, texts):
+            raise ValueError("bad input")
+
+    broken = _service(directory, Broken(model="broken"))
+    try:
+        broken.embed(["text"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert broken.stats()["retries"] == 0 and broken.stats()["failures"] == 1
+
+
+def test_token_limiter_waits():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=600)
+    limiter.acquire(600)  # the whole minute's budget
+    start = time.perf_counter()
+    limiter.acquire(3)  # 10 tokens/s refill
+    assert 0.2 <= time.perf_counter() - start < 2.0
+
+
+def test_local_backend():
+    service = build_embedding_service("local")
+    assert service.cache is None and service.model.startswith("local-hashed-ngram-")
+    query, related, unrelated = service.embed([
+        "How do I enable VoLTE on my phone?",
+        "Steps to enable VoLTE calling on Android phones",
+        "Your monthly bill includes roaming charges",
+    ])
+    assert len(query) == service.embedder.dim
+    assert dense_cosine(query, related) > dense_cosine(query, unrelated)
+    assert build_embedding_service("local").embed_query("How do I enable VoLTE on my phone?") == query
+    try:
+        build_embedding_service("word2vec")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
@@ -0,0 +1,175 @@
+"""
+HTTP service test - stub LLM workflow behind the real dispatcher and server
+Tests: JSON answers, NDJSON streaming, 400/404 validation (customer lookups use a
+temporary copy of telecom.db), 504 on timeout, a client leaving mid-stream is
+counted without a 500 after the headers, 429 once the worker pool and its
+queue are full, and a slow client cannot hold the accept thread past the drain deadline
+"""
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.http_server import _drain_request, create_server
+from orchestration.dispatcher import AsyncDispatcher
+from utils.streaming import emit_token
+
+
+class StubLLMWorkflow:
+    """Answers like the graph would, after `delay` seconds; 'slow' queries take 2 s."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.release = threading.Event()
+
+    async def ainvoke(self, state):
+        query = state["query"]
+        if query == "block":
+            await asyncio.get_running_loop().run_in_executor(None, self.release.wait, 5)
+        await asyncio.sleep(2.0 if query == "slow" else self.delay)
+        for word in ("Stub", " answer"):
+            emit_token("fallback", word)
+        return {**state, "classification": "fallback", "classifications": ["fallback"],
+                "final_response": "Stub answer", "status": "ok", "customer_context": {"secret": 1}}
+
+
+class _Server:
+    def __init__(self, **kwargs):
+        self.workflow = StubLLMWorkflow()
+        self.dispatcher = AsyncDispatcher(self.workflow)
+        self.server = create_server("127.0.0.1", 0, dispatcher=self.dispatcher, **kwargs)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def post(self, path, body):
+        request = urllib.request.Request(self.url + path, data=json.dumps(body).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+
+    def close(self):
+        self.workflow.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.dispatcher.close()
+
+
+def test_query_and_stream():
+    srv = _Server()
+    try:
+        status, body = srv.post("/v1/query", {"query": "Tell me a joke"})
+        answer = json.loads(body)
+        assert status == 200 and answer["final_response"] == "Stub answer", body
+        assert "customer_context" not in answer  # only public keys leave the server
+        status, body = srv.post("/v1/query/stream", {"query": "Tell me a joke"})
+        events = [json.loads(line) for line in body.splitlines()]
+        assert status == 200 and [e["text"] for e in events if e["type"] == "token"] == ["Stub", " answer"]
+        assert events[-1]["type"] == "done" and events[-1]["result"]["final_response"] == "Stub answer"
+    finally:
+        srv.close()
+
+
+def test_validation_errors(temp_database):
+    srv = _Server()
+    try:
+        assert srv.post("/v1/query", {"query": "  "})[0] == 400
+        assert srv.post("/v1/query", {"query": "hi", "customer_id": "NOBODY"})[0] == 404
+        assert srv.post("/v1/nothing", {"query": "hi"})[0] == 404
+    finally:
+        srv.close()
+
+
+def test_timeout_returns_504():
+    srv = _Server(request_timeout=0.2)
+    try:
+        status, body = srv.post("/v1/query", {"query": "slow"})
+        assert status == 504, body
+        events = [json.loads(line) for line in srv.post("/v1/query/stream", {"query": "slow"})[1].splitlines()]
+        assert events[-1]["type"] == "error" and "No answer" in events[-1]["text"]
+        assert srv.server.stats()["server"]["timed_out"] == 2
+    finally:
+        srv.close()
+
+
+def test_stream_client_disconnect():
+    srv = _Server()
+    srv.workflow.delay = 0.3
+    try:
+        body = json.dumps({"query": "Tell me a joke"}).encode()
+        client = socket.create_connection(srv.server.server_address, timeout=5)
+        client.sendall(b"POST /v1/query/stream HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        head = b""
+        while b"\r\n\r\n" not in head:
+            head += client.recv(1024)
+        assert head.startswith(b"HTTP/1.0 200")
+        # Reset the connection before the first token is written
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        client.close()
+        for _ in range(100):
+            if srv.server.stats()["server"]["active"] == 0:
+                break
+            time.sleep(0.05)
+        stats = srv.server.stats()["server"]
+        assert stats["disconnected"] == 1 and stats["failed"] == 0 and stats["active"] == 0, stats
+    finally:
+        srv.close()
+
+
+def test_saturation_returns_429():
+    srv = _Server(workers=1, queue_size=1)
+    try:
+        results = []
+        blocked = [threading.Thread(target=lambda: results.append(srv.post("/v1/query", {"query": "block"})))
+                   for _ in range(2)]
+        for thread in blocked:
+            thread.start()
+        # Wait until both slots (one worker, one queued) are taken
+        for _ in range(100):
+            if srv.server.stats()["server"]["accepted"] == 2:
+                break
+            threading.Event().wait(0.02)
+        status, body = srv.post("/v1/query", {"query": "Tell me a joke"})
+        assert status == 429 and "busy" in body
+        srv.workflow.release.set()
+        for thread in blocked:
+            thread.join(10)
+        assert sorted(code for code, _ in results) == [200, 200]
+        assert srv.server.stats()["server"]["rejected"] == 1
+    finally:
+        srv.close()
+
+
+def test_drain_deadline_covers_slow_clients():
+    server_side, client = socket.socketpair()
+    stop = threading.Event()
+
+    def trickle():
+        client.sendall(b"POST /v1/query HTTP/1.1\r\nContent-Length: 100000\r\n\r\n")
+        while not stop.is_set():
+            client.sendall(b"x")
+            time.sleep(0.05)
+
+    sender = threading.Thread(target=trickle, daemon=True)
+    sender.start()
+    try:
+        start = time.monotonic()
+        _drain_request(server_side, wait=0.2)
+        # Each recv() gets data within 0.05 s; only a total deadline stops the loop
+        assert time.monotonic() - start < 0.4
+    finally:
+        stop.set()
+        sender.join(1)
+        server_side.close()
+        client.close()
+
@@ -0,0 +1,83 @@
+"""
+Background indexing test - stub rebuild on a private resource registry, no LLM needed
+Tests: readers keep the old engine until the swap, progress and status are
+reported, jobs queued during a run are folded into one rebuild, a failed rebuild
+keeps serving the old engine
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.indexing import IndexingWorker
+from orchestration.resources import ResourceRegistry
+
+
+def _setup(fail=False):
+    registry = ResourceRegistry()
+    versions = iter(range(1, 100))
+    registry.register("engine", lambda: f"engine-v{next(versions)}", valid=lambda value: isinstance(value, str))
+    release = threading.Event()
+    builds = []
+
+    def rebuild(progress):
+        def factory():
+            release.wait(5)
+            for done in (32, 64, 70):
+                progress("embedding", done, 70)
+            builds.append(1)
+            return {"error": "embedding API down"} if fail else f"engine-v{next(versions)}"
+        registry.reload("engine", factory)
+        return registry.get("engine") if not fail else {"error": "embedding API down"}
+
+    worker = IndexingWorker(rebuild, valid=lambda value: isinstance(value, str))
+    return registry, worker, release, builds
+
+
+def test_swap_happens_in_the_background():
+    registry, worker, release, builds = _setup()
+    assert registry.get("engine") == "engine-v1"
+    job_id = worker.submit(["new_plan.pdf"])
+    # While the worker is blocked mid-build, queries get the old engine without waiting
+    assert registry.get("engine") == "engine-v1"
+    release.set()
+    assert worker.wait(5)
+    assert registry.get("engine") == "engine-v2"
+    job = worker.job(job_id)
+    assert job["status"] == "done" and (job["done"], job["total"]) == (70, 70) and job["files"] == ["new_plan.pdf"]
+    worker.close()
+
+
+def test_queued_jobs_share_one_rebuild():
+    registry, worker, release, builds = _setup()
+    registry.get("engine")
+    first = worker.submit(["a.txt"])
+    while worker.job(first)["status"] == "queued":
+        pass
+    second, third = worker.submit(["b.txt"]), worker.submit(["c.txt"])
+    release.set()
+    assert worker.wait(5)
+    assert len(builds) == 2
+    assert [j["status"] for j in worker.jobs()] == ["done", "done", "done"]
+    assert worker.job(second)["started_at"] == worker.job(third)["started_at"]
+    worker.close()
+
+
+def test_failed_rebuild_keeps_old_engine():
+    registry, worker, release, builds = _setup(fail=True)
+    registry.get("engine")
+    release.set()
+    job_id = worker.submit(["broken.pdf"])
+    assert worker.wait(5)
+    job = worker.job(job_id)
+    assert job["status"] == "failed" and "embedding API down" in job["error"]
+    assert registry.get("engine") == "engine-v1"
+    worker.close()
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
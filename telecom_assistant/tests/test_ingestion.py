@@ -0,0 +1,212 @@
+"""
+Incremental ingestion test - temporary documents directory and an in-memory sink
+Tests: the first run ingests everything and a repeat run nothing, an edit embeds
+only the changed chunks, deletes follow removed files, a failed run leaves the
+manifest untouched, changed chunking re-ingests from scratch, the Chroma and
+LlamaIndex sinks reset, delete and persist through their stores' own calls, an
+upload hashes the same as the saved file
+"""
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.ingestion import ChromaSink, IngestionPipeline, LlamaIndexSink, file_hash, load_manifest
+
+PARAGRAPHS = [f"Section {i}. " + f"Roaming and data pack detail number {i}. " * 8 for i in range(6)]
+
+
+class MemorySink:
+    def __init__(self, fail=False):
+        self.vectors = {}
+        self.embedded = 0
+        self.resets = 0
+        self.fail = fail
+
+    def reset(self):
+        self.resets += 1
+        self.vectors.clear()
+
+    def delete(self, ids):
+        for cid in ids:
+            self.vectors.pop(cid, None)
+
+    def add(self, chunks):
+        if self.fail:
+            raise RuntimeError("embedding API down")
+        self.embedded += len(chunks)
+        self.vectors.update({c["id"]: c["text"] for c in chunks})
+
+    def commit(self):
+        pass
+
+
+def _write(directory, name, paragraphs):
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        f.write("\n\n".join(paragraphs))
+
+
+def _setup(root):
+    docs = os.path.join(root, "documents")
+    os.makedirs(docs)
+    _write(docs, "roaming.txt", PARAGRAPHS)
+    _write(docs, "billing.md", ["Bills are issued on the first of the month."])
+    return docs, os.path.join(root, "index", "manifest.json")
+
+
+def _pipeline(sink, docs, manifest, chunk_size=400):
+    return IngestionPipeline([sink], manifest, docs, chunk_size=chunk_size, chunk_overlap=0)
+
+
+def test_first_run_then_nothing_to_do(tmp_path):
+    docs, manifest = _setup(str(tmp_path))
+    sink = MemorySink()
+    report = _pipeline(sink, docs, manifest).run()
+    assert report["added"] == 2 and report["chunks_embedded"] == len(sink.vectors) > 2
+    report = _pipeline(sink, docs, manifest).run()
+    assert report["unchanged"] == 2 and report["chunks_embedded"] == 0 and report["chunks_deleted"] == 0
+
+
+def test_edit_embeds_only_changed_chunks(tmp_path):
+    docs, manifest = _setup(str(tmp_path))
+    sink = MemorySink()
+    _pipeline(sink, docs, manifest).run()
+    before = dict(sink.vectors)
+    edited = PARAGRAPHS[:-1] + ["Section 5 was rewritten: roaming packs now renew automatically."]
+    _write(docs, "roaming.txt", edited)
+    report = _pipeline(sink, docs, manifest).run()
+    assert report["changed"] == 1 and report["unchanged"] == 1
+    assert 1 <= report["chunks_embedded"] < len(before) // 2
+    assert any("rewritten" in text for text in sink.vectors.values())
+    assert len(set(before) & set(sink.vectors)) >= len(before) - report["chunks_deleted"]
+
+
+def test_removed_file_is_deleted(tmp_path):
+    docs, manifest = _setup(str(tmp_path))
+    sink = MemorySink()
+    _pipeline(sink, docs, manifest).run()
+    os.remove(os.path.join(docs, "billing.md"))
+    report = _pipeline(sink, docs, manifest).run()
+    assert report["removed"] == 1 and report["chunks_deleted"] == 1
+    assert not any(cid.startswith("billing.md::") for cid in sink.vectors)
+    assert list(load_manifest(manifest)["files"]) == ["roaming.txt"]
+
+
+def test_failed_run_keeps_manifest(tmp_path):
+    docs, manifest = _setup(str(tmp_path))
+    sink = MemorySink()
+    _pipeline(sink, docs, manifest).run()
+    _write(docs, "new.txt", ["A brand new document about eSIM activation."])
+    try:
+        _pipeline(MemorySink(fail=True), docs, manifest).run()
+    except RuntimeError:
+        pass
+    assert "new.txt" not in load_manifest(manifest)["files"]
+    assert not [f for f in os.listdir(os.path.dirname(manifest)) if f.endswith(".tmp")]
+    assert _pipeline(sink, docs, manifest).run()["added"] == 1
+
+
+def test_changed_chunking_reingests_everything(tmp_path):
+    docs, manifest = _setup(str(tmp_path))
+    sink = MemorySink()
+    _pipeline(sink, docs, manifest).run()
+    report = _pipeline(sink, docs, manifest, chunk_size=200).run()
+    assert report["full_rebuild"] and sink.resets == 2 and report["added"] == 2
+
+
+class FakeChroma:
+    """The parts of LangChain's Chroma store that ChromaSink calls."""
+
+    def __init__(self, ids=()):
+        self.texts = dict.fromkeys(ids, "")
+        self.persisted = 0
+
+    def get(self):
+        return {"ids": list(self.texts)}
+
+    def delete(self, ids):
+        for cid in ids:
+            del self.texts[cid]
+
+    def add_texts(self, texts, metadatas, ids):
+        self.texts.update(zip(ids, texts))
+
+    def persist(self):
+        self.persisted += 1
+
+
+class FakeStorageContext:
+    def __init__(self):
+        self.persisted_to = []
+
+    def persist(self, persist_dir):
+        self.persisted_to.append(persist_dir)
+
+
+class FakeIndex:
+    """The parts of a LlamaIndex VectorStoreIndex that LlamaIndexSink calls besides insert_nodes."""
+
+    def __init__(self, ref_docs=()):
+        self.ref_doc_info = dict.fromkeys(ref_docs)
+        self.deleted = []
+        self.storage_context = FakeStorageContext()
+
+    def delete_ref_doc(self, ref_doc_id, delete_from_docstore=False):
+        assert delete_from_docstore
+        self.deleted.append(ref_doc_id)
+        del self.ref_doc_info[ref_doc_id]
+
+
+def test_chroma_sink(tmp_path):
+    docs, manifest = _setup(str(tmp_path))
+    # Vectors from before the manifest existed have random ids; a full rebuild clears them
+    store = FakeChroma(ids=["legacy-1", "legacy-2"])
+    report = _pipeline(ChromaSink(store), docs, manifest).run()
+    assert report["full_rebuild"] and "legacy-1" not in store.texts
+    assert len(store.texts) == report["chunks_embedded"] and store.persisted == 1
+    os.remove(os.path.join(docs, "billing.md"))
+    _pipeline(ChromaSink(store), docs, manifest).run()
+    assert not any(cid.startswith("billing.md::") for cid in store.texts)
+
+
+def test_llamaindex_sink_reset_delete_and_commit(tmp_path):
+    index = FakeIndex(ref_docs=["a.txt::1", "a.txt::2", "b.txt::1"])
+    sink = LlamaIndexSink(index, str(tmp_path))
+    sink.delete(["a.txt::1", "b.txt::1"])
+    # Every chunk is its own ref doc, deleted one by one
+    assert index.deleted == ["a.txt::1", "b.txt::1"] and list(index.ref_doc_info) == ["a.txt::2"]
+    sink.reset()
+    assert index.deleted[-1] == "a.txt::2" and not index.ref_doc_info
+    sink.commit()
+    assert index.storage_context.persisted_to == [str(tmp_path)]
+    LlamaIndexSink(index).commit()  # no persist_dir: in-memory only
+    assert index.storage_context.persisted_to == [str(tmp_path)]
+
+
+def test_llamaindex_sink_round_trip(tmp_path):
+    pytest.importorskip("llama_index.core")
+    from llama_index.core import Settings, VectorStoreIndex
+    from llama_index.core.embeddings import MockEmbedding
+
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    docs, manifest = _setup(str(tmp_path))
+    index = VectorStoreIndex(nodes=[])
+    report = _pipeline(LlamaIndexSink(index), docs, manifest).run()
+    assert len(index.ref_doc_info) == report["chunks_embedded"]
+    os.remove(os.path.join(docs, "billing.md"))
+    _pipeline(LlamaIndexSink(index), docs, manifest).run()
+    assert not any(cid.startswith("billing.md::") for cid in index.ref_doc_info)
+
+
+def test_file_hash_of_path_and_upload(tmp_path):
+    path = tmp_path / "plan.txt"
+    path.write_bytes(b"Premium plan: 100 GB")
+    upload = io.BytesIO(b"Premium plan: 100 GB")
+    upload.read(4)  # the uploader may have been read already
+    assert file_hash(upload) == file_hash(str(path)) == file_hash(path)
+    assert upload.read() == b"Premium plan: 100 GB"  # rewound for saving
+    # Same name and size, different content: a different key
+    assert file_hash(io.BytesIO(b"Premium plan: 200 GB")) != file_hash(upload)
@@ -0,0 +1,109 @@
+"""
+Local intent model test - no LLM needed
+Tests: the model generalises to held-out queries, confident answers stay local,
+low-confidence queries escalate to the LLM tier, per-tier stats are tracked,
+the graph routes sample queries correctly with the tier as configured (on by default)
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.intent_model import TRAINING_EXAMPLES, LinearIntentModel, TieredIntentClassifier
+
+# Queries the model never saw in training (TRAINING_EXAMPLES has none of them)
+HELD_OUT = [
+    ("Why is this month's invoice so expensive?", "billing_account"),
+    ("I think I was overcharged for international calls", "billing_account"),
+    ("How do I pay my outstanding balance?", "billing_account"),
+    ("What are these extra fees on my statement?", "billing_account"),
+    ("My bill shows a charge for a service I never ordered", "billing_account"),
+    ("Is there a penalty for cancelling before the contract ends?", "billing_account"),
+    ("My phone keeps losing signal at home", "network_troubleshooting"),
+    ("Data is really slow near the railway station", "network_troubleshooting"),
+    ("I can't receive calls since last night", "network_troubleshooting"),
+    ("Calls drop every time I get into the lift", "network_troubleshooting"),
+    ("Is the network down in Pune?", "network_troubleshooting"),
+    ("My internet connection is unstable on 5G", "network_troubleshooting"),
+    ("Which plan is cheapest for heavy data users?", "service_recommendation"),
+    ("I want a plan for my whole family with lots of data", "service_recommendation"),
+    ("Suggest a plan for frequent international travel", "service_recommendation"),
+    ("Should I move to a plan with unlimited calls?", "service_recommendation"),
+    ("What's the best option for a student?", "service_recommendation"),
+    ("Which plan gives the most data for under 500?", "service_recommendation"),
+    ("How do I enable wifi calling on Android?", "knowledge_retrieval"),
+    ("What are the steps to set up an eSIM on my phone?", "knowledge_retrieval"),
+    ("How do I configure the APN on an iPhone?", "knowledge_retrieval"),
+    ("Which areas in Mumbai have 5G?", "knowledge_retrieval"),
+    ("How do I port my number to your network?", "knowledge_retrieval"),
+    ("How can I turn on VoLTE?", "knowledge_retrieval"),
+    ("What's the score of the football game?", "fallback"),
+    ("Write a haiku about autumn", "fallback"),
+    ("What should I cook for dinner?", "fallback"),
+    ("good evening", "fallback"),
+    ("Who is the president of the USA?", "fallback"),
+    ("Can you recommend a book?", "fallback"),
+]
+
+
+def test_model_generalises_to_held_out_queries():
+    assert not {q for q, _ in HELD_OUT} & {q for q, _ in TRAINING_EXAMPLES}
+    model = LinearIntentModel().fit(TRAINING_EXAMPLES)
+    predictions = [(model.predict(query), label) for query, label in HELD_OUT]
+    correct = sum(predicted == label for (predicted, _), label in predictions)
+    assert correct / len(HELD_OUT) >= 0.85, correct
+    # Answers above the default threshold stay local, so those must be right
+    confident = [(predicted, label) for (predicted, confidence), label in predictions if confidence >= 0.6]
+    assert len(confident) >= len(HELD_OUT) // 2
+    assert sum(p == label for p, label in confident) / len(confident) >= 0.9
+
+
+def test_low_confidence_escalates_to_llm():
+    llm_calls = []
+
+    def fake_llm(query):
+        llm_calls.append(query)
+        return "network_troubleshooting"
+
+    tiers = TieredIntentClassifier(threshold=0.6, llm=fake_llm)
+    confident = tiers.predict("How do I set up VoLTE on my Samsung phone?")
+    assert confident["tier"] == "local" and confident["label"] == "knowledge_retrieval"
+    unsure = tiers.predict("Can you check my usage?")
+    assert unsure["tier"] == "llm" and unsure["label"] == "network_troubleshooting"
+    assert llm_calls == ["Can you check my usage?"]
+
+    stats = tiers.stats()
+    assert stats["tiers"]["local"]["count"] == 2 and stats["tiers"]["llm"]["count"] == 1
+    assert stats["escalation_rate"] == 0.5
+
+    # Without an LLM, unsure queries are left to the keyword heuristic (label None)
+    no_llm = TieredIntentClassifier(threshold=0.99)
+    assert no_llm.predict("Can you check my usage?")["label"] is None
+
+
+def test_graph_routes_with_the_default_tier():
+    from config.config import ENABLE_LOCAL_CLASSIFICATION
+    from orchestration.graph import _intent_classifier, classify_query
+
+    assert _intent_classifier.enabled == ENABLE_LOCAL_CLASSIFICATION
+    if not ENABLE_LOCAL_CLASSIFICATION:
+        pytest.skip("ENABLE_LOCAL_CLASSIFICATION is switched off in this environment")
+    routed = {
+        "Which plan has the most data?": "service_recommendation",
+        "Compare Premium and Standard plans": "service_recommendation",
+        "How do I enable wifi calling?": "knowledge_retrieval",
+        "Why did my bill increase by 200 this month?": "billing_account",
+        "I can't make calls from my home in Mumbai West": "network_troubleshooting",
+    }
+    for query, label in routed.items():
+        assert classify_query({"query": query, "customer_info": {}})["classifications"] == [label], query
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
+
@@ -0,0 +1,78 @@
+"""
+Keyword classifier test - no LLM needed
+Tests: single-pass scanner agrees with the original per-keyword substring rules,
+overlapping keywords are all found, scores and rules are reported
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.classifier import KEYWORD_FAMILIES, classify_text
+
+QUERIES = [
+    "Why did my bill increase by ₹200 this month?",
+    "I see a charge for international roaming but I haven't traveled recently",
+    "What's the early termination fee if I cancel my contract?",
+    "I can't make calls from my home in Mumbai West",
+    "My data connection keeps dropping when I'm on the train",
+    "I get a 'No Service' error in my basement apartment",
+    "What's the best plan for a family of four who watches a lot of videos?",
+    "I'm a light user who mostly just calls and texts. What's my cheapest option?",
+    "How do I set up VoLTE on my Samsung phone?",
+    "What are the APN settings for Android devices?",
+    "How can I enable roaming on my account?",
+    "Tell me a joke about telecom",
+    "My display flickers",                 # "play" is a substring of "display"
+    "I need help with both my bill and network issues",
+    "hello", "hi", "ok", "",
+    "Upgrade my plan, the network is slow",
+    "Where is my invoice balance?",
+]
+
+
+def legacy_label(query):
+    """The keyword rules of classify_query before the precompiled classifier (no LLM)."""
+    query = query.strip()
+    ql = query.lower()
+    if len(query) < 3 or ql in {"hi", "hello", "hey"}:
+        return "fallback"
+    if any(k in ql for k in KEYWORD_FAMILIES["off_topic"]):
+        return "fallback"
+    classification = "billing_account"
+    if any(w in ql for w in ["bill", "charge", "payment", "account"]):
+        classification = "billing_account"
+    elif any(w in ql for w in ["network", "signal", "connection", "call", "data", "slow"]):
+        classification = "network_troubleshooting"
+    has_billing = any(k in ql for k in KEYWORD_FAMILIES["billing"])
+    if any(k in ql for k in KEYWORD_FAMILIES["knowledge"]):
+        if not has_billing:
+            classification = "knowledge_retrieval"
+    elif any(k in ql for k in KEYWORD_FAMILIES["service"]) and not has_billing:
+        if classification not in {"billing_account", "network_troubleshooting"}:
+            classification = "service_recommendation"
+    return classification
+
+
+def test_matches_legacy_rules():
+    for query in QUERIES:
+        assert classify_text(query)["label"] == legacy_label(query), query
+    # An LLM label is kept unless a keyword override applies
+    assert classify_text("Compare your plans", prior="service_recommendation")["label"] == "service_recommendation"
+    assert classify_text("How do I configure APN?", prior="network_troubleshooting")["label"] == "knowledge_retrieval"
+
+
+def test_evidence_and_scores():
+    result = classify_text("Upgrade my plan, the network is slow")
+    assert result["evidence"]["service"] == ["upgrade", "plan"]
+    assert sorted(result["evidence"]["network"]) == ["network", "slow"]
+    assert result["scores"]["network_troubleshooting"] == 0.5
+    assert result["rule"] == "heuristic_network"
+    assert classify_text("My display flickers")["evidence"] == {"off_topic": ["play"]}
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
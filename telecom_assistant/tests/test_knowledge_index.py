@@ -0,0 +1,105 @@
+"""
+Knowledge index loading test - stand-ins for the LlamaIndex storage calls, no LLM needed
+Tests: the first build ingests everything into a new index, later builds load the
+persisted index and embed nothing, a corrupt store drops the manifest and is rebuilt
+from scratch
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import agents.knowledge_agents as ka
+
+
+class RecordingSink:
+    """Stands in for LlamaIndexSink: keeps the chunks on the index it was given."""
+
+    name = "llamaindex"
+
+    def __init__(self, index, persist_dir=None):
+        self.index = index
+        self.persist_dir = persist_dir
+
+    def reset(self):
+        self.index.resets += 1
+        self.index.chunks.clear()
+
+    def delete(self, ids):
+        for cid in ids:
+            self.index.chunks.pop(cid, None)
+
+    def add(self, chunks):
+        self.index.embedded += len(chunks)
+        self.index.chunks.update({c["id"]: c["text"] for c in chunks})
+
+    def commit(self):
+        # What the persisted store holds after this run
+        self.index.store[self.persist_dir] = dict(self.index.chunks)
+
+
+class FakeIndex:
+    def __init__(self, store, chunks=None):
+        self.store = store
+        self.chunks = dict(chunks or {})
+        self.resets = self.embedded = 0
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Documents folder plus the patched LlamaIndex calls; `store` maps persist_dir -> chunks."""
+    docs = tmp_path / "documents"
+    docs.mkdir()
+    (docs / "roaming.txt").write_text("Roaming packs renew monthly.\n\nActivate roaming before travel.", encoding="utf-8")
+    (docs / "volte.md").write_text("Enable VoLTE under mobile network settings.", encoding="utf-8")
+    store, calls = {}, {"loads": 0, "corrupt": False}
+
+    class FakeStorageContext:
+        @staticmethod
+        def from_defaults(persist_dir):
+            return persist_dir
+
+    def load_index_from_storage(persist_dir):
+        calls["loads"] += 1
+        if calls["corrupt"]:
+            raise ValueError("docstore.json is truncated")
+        return FakeIndex(store, store[persist_dir])
+
+    monkeypatch.setattr(ka, "StorageContext", FakeStorageContext)
+    monkeypatch.setattr(ka, "load_index_from_storage", load_index_from_storage)
+    monkeypatch.setattr(ka, "VectorStoreIndex", lambda nodes: FakeIndex(store))
+    monkeypatch.setattr(ka, "LlamaIndexSink", RecordingSink)
+    return {"docs": str(docs), "persist": str(tmp_path / "index"), "store": store, "calls": calls}
+
+
+def _load(storage):
+    return ka.load_vector_index(storage["docs"], storage["persist"])
+
+
+def test_first_build_ingests_everything(storage):
+    index = _load(storage)
+    assert storage["calls"]["loads"] == 0  # no manifest yet: nothing to load
+    assert index.resets == 1 and index.embedded == len(index.chunks) >= 2
+    assert os.path.exists(os.path.join(storage["persist"], ka.INDEX_MANIFEST))
+
+
+def test_later_builds_load_from_storage(storage):
+    first = _load(storage)
+    index = _load(storage)
+    assert storage["calls"]["loads"] == 1 and index is not first
+    assert index.chunks == first.chunks and index.embedded == 0 and index.resets == 0
+
+
+def test_corrupt_store_is_rebuilt(storage, monkeypatch):
+    first = _load(storage)
+    storage["calls"]["corrupt"] = True
+    removed = []
+    real_remove = os.remove
+    monkeypatch.setattr(ka.os, "remove", lambda path: (removed.append(path), real_remove(path)))
+    index = _load(storage)
+    assert removed == [os.path.join(storage["persist"], ka.INDEX_MANIFEST)]
+    # Without the manifest the run is a full rebuild into a fresh index
+    assert index.resets == 1 and index.embedded == len(first.chunks) and index.chunks == first.chunks
+    assert os.path.exists(os.path.join(storage["persist"], ka.INDEX_MANIFEST))
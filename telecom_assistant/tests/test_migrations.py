@@ -0,0 +1,131 @@
+"""
+Schema migration test - runs against a temporary copy of telecom.db
+Tests: pending migrations apply once, re-running is a no-op, opening the pool
+leaves an unmigrated database alone unless DB_AUTO_MIGRATE, indexes are used,
+trigger-maintained summaries stay in step with their tables, search helpers
+fall back to substring matches the FTS index cannot find
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import database as db
+from utils.migrations import MIGRATIONS, apply_migrations, current_version, pending_versions
+from utils.data_versions import customer_scope, read_versions
+from utils.metrics import summarize
+from utils.queries import get_sql
+from utils.search import match_expression
+
+
+@pytest.fixture
+def con(temp_db_path):
+    connection = sqlite3.connect(temp_db_path)
+    connection.execute("DROP TABLE IF EXISTS schema_migrations")
+    yield connection
+    connection.close()
+
+
+def test_migrations_are_idempotent(con):
+    latest = max(m[0] for m in MIGRATIONS)
+    first = apply_migrations(con)
+    assert first == sorted(m[0] for m in MIGRATIONS), first
+    assert apply_migrations(con) == [], "Second run should apply nothing"
+    assert current_version(con) == latest
+
+
+def test_pool_only_migrates_when_enabled(temp_db_path, monkeypatch):
+    with sqlite3.connect(temp_db_path) as con:
+        schema = con.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+    db.close_pool()
+    monkeypatch.setattr(db, "SQLITE_DB_PATH", temp_db_path)
+    monkeypatch.setattr(db, "DB_AUTO_MIGRATE", False)
+    try:
+        with db.get_pool().read() as con:
+            assert pending_versions(con) == sorted(m[0] for m in MIGRATIONS)
+            assert con.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall() == schema
+        db.close_pool()
+        monkeypatch.setattr(db, "DB_AUTO_MIGRATE", True)
+        with db.get_pool().read() as con:
+            assert pending_versions(con) == []
+    finally:
+        db.close_pool()
+
+
+def test_hot_lookups_use_indexes(con):
+    apply_migrations(con)
+    for name, params in [
+        ("usage.by_customer", ("CUST001",)),
+        ("tickets.by_customer_status", ("CUST001", "Open")),
+        ("coverage.by_area_technology", ("AREA001", "5G")),
+        ("towers.by_area", ("AREA001",)),
+        ("tower_tech.active_by_tower", ("TWR001",)),
+    ]:
+        plan = " ".join(r[-1] for r in con.execute(f"EXPLAIN QUERY PLAN {get_sql(name)}", params))
+        assert "USING" in plan and "INDEX" in plan, f"{name} does not use an index: {plan}"
+
+
+def test_search_indexes_follow_table_changes(con):
+    apply_migrations(con)
+    sql = get_sql("buildings.search")
+    con.execute("INSERT INTO building_types VALUES ('BT_TEST', 'Underground Parking', 'Concrete', 80, 'Repeater')")
+    assert [r[0] for r in con.execute(sql, (match_expression("underground"),))] == ["BT_TEST"]
+    con.execute("UPDATE building_types SET building_category = 'Subway Garage' WHERE building_type_id = 'BT_TEST'")
+    assert con.execute(sql, (match_expression("underground"),)).fetchall() == []
+    assert [r[0] for r in con.execute(sql, (match_expression("subw"),))] == ["BT_TEST"], "Prefix match failed"
+    con.execute("DELETE FROM building_types WHERE building_type_id = 'BT_TEST'")
+    assert con.execute(sql, (match_expression("subway"),)).fetchall() == []
+
+
+def test_ticket_metrics_follow_ticket_changes(con):
+    apply_migrations(con)
+
+    def metrics(name):
+        return summarize(con.execute(get_sql(name)).fetchall())
+
+    assert metrics("metrics.tickets") == metrics("metrics.tickets_aggregate")
+    customer_id = con.execute("SELECT customer_id FROM customers LIMIT 1").fetchone()[0]
+    con.executemany(
+        "INSERT INTO support_tickets (ticket_id, customer_id, issue_category, issue_description, creation_time, status, priority) "
+        "VALUES (?, ?, 'Billing', 'Metrics test', '2024-03-01 08:00:00', 'Open', 'Low')",
+        [(f"TKT_M{i}", customer_id) for i in range(3)],
+    )
+    con.execute("UPDATE support_tickets SET status = 'Resolved', resolution_time = '2024-03-01 14:00:00' WHERE ticket_id = 'TKT_M0'")
+    con.execute("UPDATE support_tickets SET status = 'In Progress' WHERE ticket_id = 'TKT_M1'")
+    # An empty resolution_time does not make a ticket resolved (the dashboard's truthy check)
+    con.execute("UPDATE support_tickets SET status = 'Resolved', resolution_time = '' WHERE ticket_id = 'TKT_M2'")
+    summary, aggregate = metrics("metrics.tickets"), metrics("metrics.tickets_aggregate")
+    assert summary["by_status"] == aggregate["by_status"], (summary, aggregate)
+    resolved = con.execute("SELECT resolution_time FROM support_tickets WHERE status = 'Resolved'").fetchall()
+    assert summary["resolved"] == aggregate["resolved"] == len([r for r, in resolved if r])
+    con.execute("DELETE FROM support_tickets WHERE ticket_id = 'TKT_M2'")
+    summary, aggregate = metrics("metrics.tickets"), metrics("metrics.tickets_aggregate")
+    assert summary["by_status"] == aggregate["by_status"], (summary, aggregate)
+    assert summary["resolved"] == aggregate["resolved"]
+    assert abs((summary["avg_resolution_hours"] or 0) - (aggregate["avg_resolution_hours"] or 0)) < 0.01
+
+
+def test_data_versions_follow_writes(con):
+    apply_migrations(con)
+    customer_id = con.execute("SELECT customer_id FROM customers LIMIT 1").fetchone()[0]
+    scopes = (customer_scope(customer_id), "network_incidents")
+    before = read_versions(con, scopes)
+    con.execute("UPDATE customers SET email = email WHERE customer_id = ?", (customer_id,))
+    after_customer = read_versions(con, scopes)
+    assert after_customer[0] > before[0] and after_customer[1] == before[1]
+    con.execute("DELETE FROM network_incidents WHERE rowid = (SELECT MIN(rowid) FROM network_incidents)")
+    assert read_versions(con, scopes)[1] > before[1]
+    assert read_versions(con, ("customer:NOBODY",)) == (0,)
+
+
+def test_search_helpers_fall_back_to_substring_match(temp_database):
+    assert db.search_ready()
+    # Token prefixes come from the FTS index, substrings from the LIKE fallback
+    assert [d["device_make"] for d in db.get_device_compatibility("Sams")] == ["Samsung"]
+    assert [d["device_make"] for d in db.get_device_compatibility("sung")] == ["Samsung"]
+    assert [d["device_model"] for d in db.get_device_compatibility("Apple", "Phone 12")] == ["iPhone 12"]
+    assert [b["building_category"] for b in db.get_building_types("ment")] == ["High-rise Apartment", "Basement Apartment"]
+    assert db.get_device_compatibility("Nokia") == []
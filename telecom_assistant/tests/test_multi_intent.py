@@ -0,0 +1,90 @@
+"""
+Multi-intent fan-out test - local classifier only, no LLM needed
+Tests: compound queries get several intents (single requests keep one),
+route_query fans out to one node per intent, the reducer and formulate_response
+merge parallel branches in a stable order with a combined status
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.classifier import CLASSIFIER
+from orchestration.graph import classify_query, formulate_response, merge_responses, route_query
+
+# Single requests that mention a second family's keyword in passing
+SINGLE_INTENT = [
+    "Compare Premium and Standard plans",
+    "What plans do you have under 500?",
+    "How do I enable wifi calling?",
+    "Which plan has the most data?",
+    "I need a plan with good international calling to the US",
+    "I'm a light user who mostly just calls and texts. What's my cheapest option?",
+    "Is there a cheaper plan with the same data and calls?",
+    "Why is my data so slow and why do calls drop?",
+    "How do I set up VoLTE and enable wifi calling on my phone?",
+    "I need help with my account",
+]
+
+
+def _labels(query):
+    return classify_query({"query": query, "customer_info": {}})["classifications"]
+
+
+def test_compound_queries_get_several_intents():
+    assert set(_labels("my bill went up and my data keeps dropping in Mumbai")) == {
+        "billing_account", "network_troubleshooting"}
+    assert set(_labels("Why is my bill high and what plan should I switch to?")) == {
+        "billing_account", "service_recommendation"}
+
+
+def test_single_intent_queries_stay_single():
+    for query in SINGLE_INTENT:
+        labels = _labels(query)
+        assert len(labels) == 1, (query, labels)
+
+
+def test_secondary_intent_needs_its_own_clause_and_probability():
+    def decision(query):
+        return CLASSIFIER.classify(query)
+
+    compound = decision("My bill is too high. Also, my calls keep dropping at home")
+    assert CLASSIFIER.intents(compound) == ["billing_account", "network_troubleshooting"]
+    # The model is asked about the secondary's clause alone; below the floor it is dropped
+    assert CLASSIFIER.intents(compound, lambda text: {"network_troubleshooting": 0.9}) == [
+        "billing_account", "network_troubleshooting"]
+    assert CLASSIFIER.intents(compound, lambda text: {"network_troubleshooting": 0.2}) == ["billing_account"]
+    # No keyword for the primary label (a default guess): nothing to fan out from
+    assert CLASSIFIER.intents(decision("Compare Premium and Standard plans")) == ["billing_account"]
+    assert CLASSIFIER.intents(compound, max_labels=1) == ["billing_account"]
+
+
+def test_route_query_fans_out():
+    assert route_query({"classifications": ["billing_account", "network_troubleshooting"]}) == [
+        "crew_ai_node", "autogen_node"]
+    assert route_query({"classification": "fallback"}) == ["fallback_handler"]
+    assert route_query({"classification": "knowledge_retrieval"}) == ["llamaindex_node"]
+
+
+def test_branches_merge_in_stable_order():
+    # The network branch finished first; the answer still lists billing first
+    responses = merge_responses({}, {"autogen": {"transcript": ["Restart your phone."], "status": "ok"}})
+    responses = merge_responses(responses, {"crew_ai": {"raw": "Your bill rose by 200.", "status": "ok"}})
+    result = formulate_response({"query": "q", "intermediate_responses": responses, "status": "classified"})
+    answer = result["final_response"]
+    assert answer.index("**Billing**") < answer.index("Your bill") < answer.index("**Network**") < answer.index("Restart")
+    assert result["status"] == "ok"
+    responses["autogen"] = {"error": "AutoGen chat failed", "detail": "", "status": "error"}
+    assert formulate_response({"intermediate_responses": responses})["status"] == "partial"
+
+
+def test_single_branch_answer_is_unchanged():
+    result = formulate_response({"intermediate_responses": {"crew_ai": {"raw": "Your bill rose by 200.", "status": "ok"}}})
+    assert result["final_response"] == "Your bill rose by 200." and result["status"] == "ok"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
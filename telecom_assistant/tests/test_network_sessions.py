@@ -0,0 +1,118 @@
+"""
+AutoGen session pool test - minimal stand-ins for the AutoGen classes, no LLM needed
+Tests: concurrent conversations get separate group chats (no interleaved
+transcripts), sessions are reset and reused, the idle pool stays bounded,
+async sessions carry the coroutine tools
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import agents.network_agents as na
+
+
+class FakeAgent:
+    def __init__(self, name, function_map=None, **kwargs):
+        self.name = name
+        self.function_map = function_map
+        self.history = []
+
+    def register_hook(self, hookable_method, hook):
+        pass
+
+    def reset(self):
+        self.history.clear()
+
+    def initiate_chat(self, manager, message):
+        # Every turn is written to the session's own group chat
+        for turn in range(3):
+            manager.groupchat.messages.append({"content": f"{message} #{turn}"})
+            time.sleep(0.01)
+
+
+class FakeGroupChat:
+    def __init__(self, agents, messages, **kwargs):
+        self.agents = agents
+        self.messages = messages
+
+    def reset(self):
+        self.messages.clear()
+
+
+class FakeManager:
+    def __init__(self, groupchat, llm_config):
+        self.groupchat = groupchat
+
+
+def _pool(max_idle=2):
+    originals = (na.UserProxyAgent, na.AssistantAgent, na.GroupChat, na.GroupChatManager)
+    na.UserProxyAgent = na.AssistantAgent = FakeAgent
+    na.GroupChat, na.GroupChatManager = FakeGroupChat, FakeManager
+    config = na.NetworkAgentConfig({"model": "test"}, {"model": "test", "functions": []},
+                                   na.FUNCTION_MAP, na.ASYNC_FUNCTION_MAP)
+    return na.NetworkSessionPool(config, max_idle=max_idle), originals
+
+
+def _restore(originals):
+    na.UserProxyAgent, na.AssistantAgent, na.GroupChat, na.GroupChatManager = originals
+
+
+def _chat(pool, query, out):
+    with pool.session() as session:
+        session.user_proxy.initiate_chat(session.manager, message=query)
+        out[query] = session.transcript()
+
+
+def test_concurrent_conversations_are_isolated():
+    pool, originals = _pool()
+    try:
+        transcripts = {}
+        threads = [threading.Thread(target=_chat, args=(pool, f"user{i}", transcripts)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for query, transcript in transcripts.items():
+            assert transcript == [f"{query} #0", f"{query} #1", f"{query} #2"], transcript
+        stats = pool.stats()
+        assert stats["in_use"] == 0 and stats["idle"] <= 2
+        assert stats["created"] + stats["reused"] == 6
+    finally:
+        _restore(originals)
+
+
+def test_sessions_are_reset_and_reused():
+    pool, originals = _pool()
+    try:
+        first, second = {}, {}
+        _chat(pool, "my data is slow", first)
+        _chat(pool, "no signal at home", second)
+        assert second["no signal at home"] == ["no signal at home #0", "no signal at home #1", "no signal at home #2"]
+        assert pool.stats()["created"] == 1 and pool.stats()["reused"] == 1
+    finally:
+        _restore(originals)
+
+
+
+def test_async_sessions_get_coroutine_tools():
+    pool, originals = _pool()
+    try:
+        with pool.session(asynchronous=True) as session:
+            assert session.user_proxy.function_map is na.ASYNC_FUNCTION_MAP
+        with pool.session() as session:
+            assert session.user_proxy.function_map is na.FUNCTION_MAP
+        # Each kind is reused only for its own kind
+        with pool.session(asynchronous=True) as session:
+            assert session.asynchronous
+        assert pool.stats()["created"] == 2 and pool.stats()["reused"] == 1 and pool.stats()["idle"] == 2
+    finally:
+        _restore(originals)
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
@@ -0,0 +1,73 @@
+"""
+Query registry test - pure shaping checks plus a temporary copy of telecom.db
+Tests: the four result shapes agree, unknown shapes and query names fail clearly,
+ticket page queries are registered once per filter combination and run
+"""
+import itertools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import database as db
+from utils.queries import QUERIES, SHAPES, TICKET_PAGE_FILTERS, get_sql, shape_rows, ticket_page_query
+
+COLUMNS = ["plan_id", "name", "monthly_cost"]
+ROWS = [("P1", "Basic", 199.0), ("P2", "Premium", 799.0)]
+
+
+def test_shapes_agree():
+    dicts = shape_rows("plan.test", COLUMNS, ROWS, "dicts")
+    assert dicts == [dict(zip(COLUMNS, row)) for row in ROWS]
+    records = shape_rows("plan.test", COLUMNS, ROWS, "records")
+    assert [r._asdict() for r in records] == dicts and records[1].monthly_cost == 799.0
+    assert type(records[0]) is type(shape_rows("plan.test", COLUMNS, ROWS[:1], "records")[0])
+    assert shape_rows("plan.test", COLUMNS, ROWS, "columns") == {
+        "plan_id": ["P1", "P2"], "name": ["Basic", "Premium"], "monthly_cost": [199.0, 799.0]}
+    assert shape_rows("plan.test", COLUMNS, ROWS, "rows") is ROWS
+
+
+def test_empty_results_keep_their_shape():
+    assert shape_rows("plan.test", COLUMNS, [], "dicts") == []
+    assert shape_rows("plan.test", COLUMNS, [], "records") == []
+    assert shape_rows("plan.test", COLUMNS, [], "columns") == {c: [] for c in COLUMNS}
+
+
+def test_unknown_shape_and_query_name():
+    with pytest.raises(ValueError, match="Unknown result shape"):
+        shape_rows("plan.test", COLUMNS, ROWS, "frame")
+    with pytest.raises(KeyError, match="Unknown query 'plan.by_name'"):
+        get_sql("plan.by_name")
+
+
+def test_run_query_shapes_match(temp_database):
+    customer_id = db.list_customers(1)[0]["customer_id"]
+    results = {shape: db.run_query("usage.by_customer", (customer_id,), shape) for shape in SHAPES}
+    assert results["dicts"] and [r._asdict() for r in results["records"]] == results["dicts"]
+    assert [tuple(d.values()) for d in results["dicts"]] == results["rows"]
+    assert results["columns"]["billing_period_start"] == [d["billing_period_start"] for d in results["dicts"]]
+    assert db.run_query_one("customer.by_id", (customer_id,))["customer_id"] == customer_id
+    assert db.run_query_one("customer.by_id", ("NOBODY",)) is None
+    with pytest.raises(KeyError):
+        db.run_query("customer.by_nickname", ("x",))
+
+
+def test_ticket_page_queries(temp_database):
+    with pytest.raises(ValueError, match="Unsupported ticket filter"):
+        ticket_page_query(["status", "region"], after_cursor=False)
+    values = {"status": "Open", "priority": "High", "issue_category": "Billing", "customer_id": "CUST001"}
+    for count in range(len(TICKET_PAGE_FILTERS) + 1):
+        for filters in itertools.combinations(TICKET_PAGE_FILTERS, count):
+            for after in (False, True):
+                name = ticket_page_query(list(reversed(filters)), after)
+                # Same name (and SQL) whatever order the filters come in
+                assert name == ticket_page_query(list(filters), after) and name in QUERIES
+                sql = get_sql(name)
+                assert all(f"t.{f} = ?" in sql for f in filters) and ("< (?, ?)" in sql) == after
+                params = tuple(values[f] for f in TICKET_PAGE_FILTERS if f in filters)
+                params += ("9999-12-31 00:00:00", "TKT~") if after else ()
+                assert sql.count("?") == len(params) + 1  # + LIMIT
+                rows = db.run_query(name, params + (5,))
+                assert len(rows) <= 5 and all(r[f] == values[f] for r in rows for f in filters)
@@ -88,13 +88,17 @@ test("CrewAI Tools Availability", test_crewai_tools)
 
 # Test 4: AutoGen agents
 def test_autogen_agents():
-    from agents.network_agents import create_network_agents
-    user_proxy, manager = create_network_agents()
+    from agents.network_agents import network_sessions
+    pool = network_sessions()
     
-    if manager is None:
+    if pool is None:
         print("    - SKIP: AutoGen not initialized (API key missing)")
         return
     
+    with pool.session() as session:
+        check_autogen_session(session.user_proxy, session.manager)
+
+def check_autogen_session(user_proxy, manager):
     assert manager is not None, "Manager not created"
     assert user_proxy is not None, "User proxy not created"
     
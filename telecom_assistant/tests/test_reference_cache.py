@@ -0,0 +1,85 @@
+"""
+Reference cache test - no database or LLM needed
+Tests: TTL expiry, LRU eviction, per-table invalidation, hit/miss counters,
+editing a returned value leaves the cached one intact
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.cache import ReferenceCache, TTLCache
+
+
+def test_ttl_expiry_and_lru_eviction():
+    cache = TTLCache(maxsize=2, default_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # "a" becomes most recently used
+    cache.set("c", 3)                   # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    cache.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    stats = cache.stats()
+    assert stats["evictions"] >= 1 and stats["expirations"] == 1, stats
+
+
+def test_read_through_and_invalidation():
+    calls = []
+    cache = ReferenceCache({"service_plans": 60})
+
+    @cache.cached("service_plans")
+    def get_plan(plan_id):
+        calls.append(plan_id)
+        return {"plan_id": plan_id}
+
+    @cache.cached("coverage_quality")
+    def get_coverage(area_id=None):
+        calls.append(area_id)
+        return [area_id]
+
+    assert get_plan("STD_500") == {"plan_id": "STD_500"}
+    assert get_plan("STD_500") == {"plan_id": "STD_500"}
+    get_coverage(area_id="AREA001")
+    get_coverage(area_id="AREA001").append("mutated")
+    assert get_coverage(area_id="AREA001") == ["AREA001"], "Cached lists must be handed out as copies"
+    assert calls == ["STD_500", "AREA001"], calls
+
+    cache.invalidate_table("service_plans")
+    get_plan("STD_500")
+    get_coverage(area_id="AREA001")
+    assert calls == ["STD_500", "AREA001", "STD_500"], calls
+    tables = cache.stats()["tables"]
+    assert tables["service_plans"] == {"hits": 1, "misses": 2}, tables
+
+
+
+def test_returned_values_are_private_copies():
+    cache = ReferenceCache({"service_plans": 60})
+
+    @cache.cached("service_plans")
+    def get_plan(plan_id):
+        return {"plan_id": plan_id, "features": ["5G"]}
+
+    @cache.cached("service_plans")
+    def list_plans():
+        return [{"plan_id": "P1", "monthly_cost": 199.0}]
+
+    first = get_plan("P1")  # the miss: the caller's copy is not the cached one either
+    first["features"].append("edited")
+    get_plan("P1")["plan_id"] = "edited"
+    plans = list_plans()
+    list_plans()[0]["monthly_cost"] = 0.0
+    plans.append({"plan_id": "P2"})
+    assert get_plan("P1") == {"plan_id": "P1", "features": ["5G"]}
+    assert list_plans() == [{"plan_id": "P1", "monthly_cost": 199.0}]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
@@ -0,0 +1,94 @@
+"""
+Resource registry test - stub factories, no LLM needed
+Tests: concurrent first use builds once, failed builds are retried rather than
+cached, reload swaps atomically and closes the old instance, close() closes all,
+the shared graph/dispatcher come from the registry
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.resources import RESOURCES, ResourceRegistry
+
+
+class Counter:
+    def __init__(self, results=None, delay=0.0):
+        self.calls = 0
+        self.results = list(results or [])
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.results.pop(0) if self.results else object()
+
+
+def test_concurrent_first_use_builds_once():
+    registry = ResourceRegistry()
+    factory = Counter(delay=0.05)
+    registry.register("crew", factory)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(registry.get("crew"))) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert factory.calls == 1
+    assert len({id(v) for v in seen}) == 1
+    assert registry.stats()["crew"]["builds"] == 1
+
+
+def test_unusable_builds_are_retried():
+    registry = ResourceRegistry()
+    factory = Counter(results=[{"error": "no key"}, "engine"])
+    registry.register("engine", factory, valid=lambda v: not isinstance(v, dict))
+    assert registry.get("engine") == {"error": "no key"}
+    assert registry.get("engine") == "engine"
+    assert registry.get("engine") == "engine" and factory.calls == 2
+    assert registry.warm(["engine"]) == {"engine": True}
+
+
+def test_reload_swaps_and_closes_old():
+    registry = ResourceRegistry()
+    closed = []
+    registry.register("engine", Counter(results=["v1", "v2", None]), closer=closed.append)
+    assert registry.get("engine") == "v1"
+    assert registry.reload("engine") == "v2" and registry.get("engine") == "v2"
+    assert closed == ["v1"]
+    # A failed rebuild keeps serving the current instance
+    assert registry.reload("engine") == "v2" and closed == ["v1"]
+
+
+def test_close_runs_closers_and_forgets():
+    registry = ResourceRegistry()
+    closed = []
+    registry.register("a", Counter(), closer=closed.append)
+    registry.register("b", Counter(), closer=closed.append)
+    registry.register("unused", Counter(), closer=closed.append)
+    first = registry.get("a"), registry.get("b")
+    registry.close()
+    assert closed == [first[1], first[0]]
+    assert registry.get("a") is not first[0]
+
+
+def test_shared_graph_and_dispatcher():
+    from agents.knowledge_agents import create_knowledge_engine
+    from orchestration.dispatcher import get_dispatcher
+
+    assert RESOURCES.get("graph") is RESOURCES.get("graph")
+    assert get_dispatcher() is get_dispatcher()
+    assert set(RESOURCES.names()) >= {"billing_crews", "network_sessions", "service_executor", "knowledge_engine"}
+    # Without llama_index the engine is an error dict, and it is not cached
+    engine = create_knowledge_engine()
+    if isinstance(engine, dict):
+        assert not RESOURCES.stats()["knowledge_engine"]["built"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
@@ -0,0 +1,191 @@
+"""
+Response cache test - stub workflow, no LLM needed
+Tests: exact repeats are served from cache, near misses (other place, amount or a
+negation) and other customers miss, similar-query matching needs an embedding and
+equal facts, TTL and LRU limits, data changes (fingerprint) and a different
+conversation force a fresh answer, hits never run the configured (LLM)
+classifier, embeddings are computed outside the cache lock
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration import response_cache
+from orchestration.response_cache import CachedWorkflow, SemanticResponseCache, normalize_query, query_facts
+
+
+class StubWorkflow:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, state):
+        self.calls.append(state["query"])
+        return {**state, "final_response": f"answer #{len(self.calls)}", "intermediate_responses": {}, "status": "ok"}
+
+
+NEAR_MISSES = [
+    ("I can't make calls from my home in Mumbai West", "I can't make calls from my home in Mumbai East"),
+    ("Why did my bill increase by 200 this month?", "Why did my bill increase by 500 this month?"),
+    ("Can I cancel my contract early?", "Can I not cancel my contract early?"),
+    ("Can I cancel my contract early?", "Why can't I cancel my contract early?"),
+    ("I need a plan with good international calling to the US", "I need a plan with good international calling to the UK"),
+]
+
+
+def test_exact_repeats_only_by_default():
+    cache = SemanticResponseCache(maxsize=2, ttl=60)
+    cache.store(("billing_account", "CUST001", ()), "Why is my bill high?", {"final_response": "A"})
+    assert cache.lookup(("billing_account", "CUST001", ()), "why is my bill high")["similarity"] == 1.0
+    assert cache.lookup(("billing_account", "CUST001", ()), "Why is my bill so high?") is None
+    assert cache.lookup(("billing_account", "CUST002", ()), "Why is my bill high?") is None
+    for cached, asked in NEAR_MISSES:
+        cache.store("p", cached, {"final_response": cached})
+        assert cache.lookup("p", asked) is None, asked
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["similar_hits"] == 0, stats
+
+
+def test_similar_queries_need_the_same_facts():
+    # Stand-in for an embedding model that finds every pair of queries similar
+    cache = SemanticResponseCache(ttl=60, similarity_threshold=0.9, vectorize=lambda text: [1.0, 0.0])
+    cache.store("p", "Why is my bill so high this month?", {"final_response": "A"})
+    similar = cache.lookup("p", "Why did my bill increase this month?")
+    assert similar and similar["result"]["final_response"] == "A" and similar["similarity"] == 1.0
+    for cached, asked in NEAR_MISSES:
+        cache.store("p", cached, {"final_response": cached})
+        hit = cache.lookup("p", asked)
+        assert hit is None or hit["matched_query"] != normalize_query(cached), (cached, asked)
+    assert query_facts("Why did my bill go up by ₹1,200 in March?") == (("1200",), ("march",), False)
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_threshold_applies_to_the_embedding_score():
+    vectors = {"why is my bill high": [1.0, 0.0], "why did my bill increase": [0.95, 0.31], "is my data slow": [0.0, 1.0]}
+    cache = SemanticResponseCache(ttl=60, similarity_threshold=0.9, vectorize=vectors.__getitem__)
+    cache.store("p", "Why is my bill high?", {"final_response": "A"})
+    assert cache.lookup("p", "Why did my bill increase?")["result"]["final_response"] == "A"
+    assert cache.lookup("p", "Is my data slow?") is None
+
+
+def test_embedding_runs_outside_the_lock():
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_embedding(text):
+        if text == "why did my bill increase":
+            entered.set()
+            release.wait(5)  # a remote embedding request in flight
+        return [1.0, 0.0]
+
+    cache = SemanticResponseCache(ttl=60, vectorize=slow_embedding)
+    cache.store("p", "Why is my bill high?", {"final_response": "A"})
+    results = []
+    waiting = threading.Thread(target=lambda: results.append(cache.lookup("p", "Why did my bill increase?")))
+    waiting.start()
+    assert entered.wait(5)
+    try:
+        # Other lookups and stores go ahead while that embedding is outstanding
+        start = time.monotonic()
+        cache.store("q", "Tell me a joke", {"final_response": "B"})
+        assert cache.lookup("q", "tell me a joke")["result"]["final_response"] == "B"
+        assert time.monotonic() - start < 1.0
+    finally:
+        release.set()
+        waiting.join(5)
+    assert results[0]["result"]["final_response"] == "A"
+
+
+def test_ttl_and_lru_limits():
+    cache = SemanticResponseCache(maxsize=2, ttl=60)
+    for i, query in enumerate(["first question here", "second question here", "third question here"]):
+        cache.store(("fallback", "", ()), query, {"final_response": str(i)})
+    assert cache.lookup(("fallback", "", ()), "first question here") is None  # evicted
+    short = SemanticResponseCache(ttl=0.01)
+    short.store("p", "anything at all", {"final_response": "x"})
+    time.sleep(0.02)
+    assert short.lookup("p", "anything at all") is None
+
+
+def test_workflow_wrapper_and_fingerprint():
+    versions = {"value": 1}
+    original = response_cache.fingerprint
+    response_cache.fingerprint = lambda classification, customer_id: (("customer", versions["value"]),)
+    try:
+        stub = StubWorkflow()
+        workflow = CachedWorkflow(stub, SemanticResponseCache())
+        state = {"query": "Why did my bill increase by 200 this month?", "customer_info": {"customer_id": "CUST001"}}
+        first = workflow.invoke(dict(state))
+        second = workflow.invoke(dict(state))
+        assert stub.calls == [state["query"]] and second["cache"]["hit"] and not first["cache"]["hit"]
+        assert second["final_response"] == first["final_response"]
+        versions["value"] = 2  # e.g. a new usage row for the customer
+        third = workflow.invoke(dict(state))
+        assert not third["cache"]["hit"] and len(stub.calls) == 2
+    finally:
+        response_cache.fingerprint = original
+
+
+def test_hits_skip_the_configured_classifier(monkeypatch):
+    labels = {"value": ["billing_account"]}
+    calls = []
+
+    def classify(state):
+        # Stands in for the tiered classifier, which may call the LLM
+        calls.append(state["query"])
+        return {**state, "classification": labels["value"][0], "classifications": labels["value"],
+                "classification_evidence": {"query": state["query"]}}
+
+    monkeypatch.setattr(response_cache, "classify_query", classify)
+    monkeypatch.setattr(response_cache, "fingerprint", lambda labels, customer_id: ())
+    stub = StubWorkflow()
+    workflow = CachedWorkflow(stub, SemanticResponseCache())
+    state = {"query": "Why is my bill so high?", "customer_info": {"customer_id": "CUST001"}}
+    workflow.invoke(dict(state))
+    assert workflow.invoke(dict(state))["cache"]["hit"] and calls == [state["query"]]
+    # The classifier chose labels whose answer depends on a customer the keyword
+    # partition ("Tell me a joke" -> fallback) leaves out: answered, but not cached
+    labels["value"] = ["billing_account"]
+    joke = {"query": "Tell me a joke", "customer_info": {"customer_id": "CUST001"}}
+    workflow.invoke(dict(joke))
+    assert not workflow.invoke(dict(joke))["cache"]["hit"] and len(stub.calls) == 3
+
+
+def test_async_workflow_wrapper():
+    class AsyncStub(StubWorkflow):
+        async def ainvoke(self, state):
+            return self.invoke(state)
+
+    stub = AsyncStub()
+    workflow = CachedWorkflow(stub, SemanticResponseCache())
+    state = {"query": "Tell me a joke", "customer_info": {}}
+    first = asyncio.run(workflow.ainvoke(dict(state)))
+    second = asyncio.run(workflow.ainvoke(dict(state)))
+    assert first["classification"] == "fallback" and second["cache"]["hit"] and len(stub.calls) == 1
+
+
+def test_conversation_history_is_part_of_the_key():
+    stub = StubWorkflow()
+    workflow = CachedWorkflow(stub, SemanticResponseCache())
+    state = {"query": "Tell me a joke", "customer_info": {}}
+    # The fallback answer does not see the history; knowledge answers never do either
+    workflow.invoke({**state, "chat_history": [{"role": "user", "content": "Hi"}]})
+    assert workflow.invoke(dict(state))["cache"]["hit"]
+    labels = ("network_troubleshooting",)
+    earlier = [{"role": "user", "content": "My calls drop in Pune"}, {"role": "assistant", "content": "Checking Pune."}]
+    other = [{"role": "user", "content": "My calls drop in Delhi"}, {"role": "assistant", "content": "Checking Delhi."}]
+    follow_up = {"query": "Is it fixed yet?"}
+    assert response_cache.history_key(labels, follow_up) == ""
+    assert response_cache.history_key(labels, {**follow_up, "chat_history": earlier}) != ""
+    assert response_cache.history_key(labels, {**follow_up, "chat_history": earlier}) != response_cache.history_key(
+        labels, {**follow_up, "chat_history": other})
+    assert response_cache.history_key(("knowledge_retrieval",), {**follow_up, "chat_history": earlier}) == ""
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
@@ -0,0 +1,77 @@
+"""
+Streaming test - stub workflow built from the real graph nodes, no LLM needed
+Tests: events arrive in order ending with "done", formulate_response streams the
+answer of nodes that did not stream themselves (and only those), TTFT is recorded
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestration.graph import fallback_handler, formulate_response
+from orchestration.streaming import STREAM_METRICS, stream_workflow
+from utils.streaming import emit_status, emit_token
+
+
+class StubWorkflow:
+    """fallback_handler -> formulate_response, with an optional agent that streams its own tokens."""
+
+    def __init__(self, agent_tokens=None, delay=0.0):
+        self.agent_tokens = agent_tokens
+        self.delay = delay
+
+    def invoke(self, state):
+        emit_status("fallback", "Working on it...")
+        time.sleep(self.delay)
+        if self.agent_tokens:
+            for token in self.agent_tokens:
+                emit_token("fallback", token)
+            state = {**state, "intermediate_responses": {"fallback": {"response": "".join(self.agent_tokens), "status": "ok"}}}
+        else:
+            state = {**state, **fallback_handler(state)}
+        return formulate_response({**state, "classification": "fallback"})
+
+
+def _collect(workflow, query="Tell me a joke"):
+    return list(stream_workflow(workflow, {"query": query, "customer_info": {}, "intermediate_responses": {}}))
+
+
+def test_formatted_answer_is_streamed():
+    events = _collect(StubWorkflow(delay=0.05))
+    kinds = [e["type"] for e in events]
+    assert kinds[0] == "status" and kinds[-1] == "done", kinds
+    done = events[-1]
+    streamed = "".join(e["text"] for e in events if e["type"] == "token")
+    assert streamed == done["result"]["final_response"]
+    assert done["ttft_ms"] is not None and done["ttft_ms"] >= 50 and done["total_ms"] >= done["ttft_ms"]
+    assert STREAM_METRICS.stats()["fallback"]["count"] >= 1
+
+
+def test_agent_tokens_are_not_repeated():
+    events = _collect(StubWorkflow(agent_tokens=["Hello", " there", "!"]))
+    tokens = [e["text"] for e in events if e["type"] == "token"]
+    assert tokens == ["Hello", " there", "!"], tokens
+    assert events[-1]["result"]["final_response"] == "Hello there!"
+
+
+def test_errors_end_the_stream():
+    class Broken:
+        def invoke(self, state):
+            raise RuntimeError("boom")
+
+    events = _collect(Broken())
+    assert events[-1]["type"] == "error" and "boom" in events[-1]["text"]
+
+
+def test_plain_invoke_is_unaffected():
+    # No emitter bound: emit_* are no-ops and the graph nodes behave as before
+    result = StubWorkflow().invoke({"query": "hi", "intermediate_responses": {}})
+    assert result["final_response"].startswith("I'm not sure how to help")
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS {name}")
@@ -0,0 +1,45 @@
+"""
+Ticket ID test - runs against a temporary copy of telecom.db
+Tests: concurrent creates never collide, bulk create reports per-row results
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import database as db
+
+
+def test_concurrent_creates_get_unique_ids(temp_database):
+    customer_id = db.list_customers(1)[0]["customer_id"]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(
+            lambda i: db.create_support_ticket(customer_id, "Billing", f"Load test {i}", "Low"),
+            range(200),
+        ))
+    assert len(set(ids)) == 200, "Duplicate ticket IDs issued"
+    stored = db.fetch_one("SELECT COUNT(*) FROM support_tickets WHERE issue_description LIKE 'Load test %'")
+    assert stored[0] == 200
+
+
+def test_bulk_create_reports_per_row_results(temp_database):
+    customer_id = db.list_customers(1)[0]["customer_id"]
+    before = db.fetch_one("SELECT COUNT(*) FROM support_tickets")[0]
+    records = [
+        {"customer_id": customer_id, "category": "Network", "description": "No signal", "priority": "High"},
+        {"customer_id": "CUST_MISSING", "category": "Billing", "description": "Overcharge", "priority": "Low"},
+        {"customer_id": customer_id, "issue_category": "Billing", "priority": "Medium"},
+        {"customer_id": customer_id, "issue_category": "Billing", "issue_description": "Refund",
+         "priority": "Medium", "status": "Resolved", "creation_time": "2024-01-02 10:00:00",
+         "resolution_time": "2024-01-02 12:00:00", "resolution_notes": "Refunded"},
+    ]
+    results = db.create_support_tickets(records)
+    assert [r["ok"] for r in results] == [True, False, False, True], results
+    assert "unknown customer" in results[1]["error"]
+    assert "issue_description" in results[2]["error"]
+    assert results[0]["ticket_id"] != results[3]["ticket_id"]
+    assert db.fetch_one("SELECT COUNT(*) FROM support_tickets")[0] == before + 2
+    replayed = db.fetch_one("SELECT status, creation_time FROM support_tickets WHERE ticket_id = ?",
+                            (results[3]["ticket_id"],))
+    assert replayed == ("Resolved", "2024-01-02 10:00:00")
@@ -0,0 +1,41 @@
+"""
+Ticket pagination test - runs against a temporary copy of telecom.db
+Tests: keyset pages cover every ticket exactly once (ties on creation_time included), filters are pushed down
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import database as db
+
+
+def _walk(**filters):
+    seen, cursor = [], None
+    while True:
+        page = db.list_support_tickets_page(limit=4, after=cursor, **filters)
+        seen.extend(t["ticket_id"] for t in page["tickets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_keyset_pages_match_full_listing(temp_database):
+    customer_id = db.list_customers(1)[0]["customer_id"]
+    # Same creation_time for all of them: the ticket_id tie-breaker must keep pages disjoint
+    db.create_support_tickets([
+        {"customer_id": customer_id, "category": "Billing Inquiry", "description": f"Page test {i}",
+         "priority": "High" if i % 2 else "Low", "creation_time": "2024-05-01 10:00:00"}
+        for i in range(15)
+    ])
+    all_ids = [t["ticket_id"] for t in db.get_all_support_tickets()]
+    walked = _walk()
+    assert len(walked) == len(set(walked)) == len(all_ids), (len(walked), len(all_ids))
+    assert set(walked) == set(all_ids)
+
+    high = _walk(priority="High", customer_id=customer_id, category="Billing Inquiry")
+    expected = db.fetch_all(
+        "SELECT ticket_id FROM support_tickets WHERE priority = 'High' AND customer_id = ? AND issue_category = 'Billing Inquiry'",
+        (customer_id,),
+    )
+    assert sorted(high) == sorted(r[0] for r in expected)
@@ -3,11 +3,17 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from orchestration.graph import create_graph  # type: ignore
+from config.config import ENABLE_STREAMING, UI_HISTORY_LIMIT
+from orchestration.dispatcher import get_dispatcher
+from orchestration.indexing import get_indexer
+from orchestration.resources import RESOURCES
+from orchestration.streaming import stream_workflow, streaming_stats
+from utils.customer_context import load_customer_context
+from utils.ingestion import file_hash
+from utils.memory import ConversationMemory
 from utils.database import (
-    list_customers, get_customer, get_customer_usage, get_service_plan, 
-    list_active_incidents, get_all_support_tickets, create_support_ticket, 
-    update_ticket_status
+    list_customers, list_active_incidents, list_support_tickets_page, get_ticket_metrics,
+    create_support_ticket, update_ticket_status
 )
 
 # Set page configuration
@@ -17,6 +23,10 @@ st.set_page_config(
     layout="wide"
 )
 
+TICKET_CATEGORIES = ["Billing Inquiry", "Connectivity Issue", "Service Request", "Technical Support", "Account Management"]
+TICKETS_PER_PAGE = 25
+
+
 def init_session_state():
     """Initialize all session state variables"""
     if "authenticated" not in st.session_state:
@@ -27,27 +37,49 @@ def init_session_state():
         st.session_state.email = None
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    if "memory" not in st.session_state:
+        # What the graph sees: recent turns plus a summary of older ones, within a token budget
+        st.session_state.memory = ConversationMemory()
     if "graph" not in st.session_state:
-        # Initialize the LangGraph workflow once and cache it
-        st.session_state.graph = create_graph()
+        # All sessions share one async dispatcher (async graph behind the response
+        # cache); turns run as tasks on its event loop instead of blocking a thread each
+        st.session_state.graph = get_dispatcher()
+        # Agents are process-wide too; build them off the request path (no-op once built)
+        RESOURCES.warm(background=True)
     if "selected_customer_id" not in st.session_state:
         st.session_state.selected_customer_id = None
 
 
-def process_query(query: str, customer_info: dict = None) -> str:
-    """Process a user query through the LangGraph workflow"""
-    # Use cached graph from session state
-    workflow = st.session_state.graph
-    
-    # Create state with customer context
-    state = {
+def remember(role: str, content: str):
+    """Record a chat message: on screen (last UI_HISTORY_LIMIT) and in the bounded memory"""
+    st.session_state.chat_history.append({"role": role, "content": content})
+    del st.session_state.chat_history[:-UI_HISTORY_LIMIT]
+    st.session_state.memory.add(role, content)
+
+
+def clear_chat():
+    st.session_state.chat_history = []
+    st.session_state.memory.clear()
+
+
+def build_state(query: str, customer_info: dict = None, customer_context: dict = None) -> dict:
+    """Initial graph state for one turn"""
+    return {
         "query": query,
         "customer_info": customer_info or {},
         "classification": "",
         "intermediate_responses": {},
         "final_response": "",
-        "chat_history": st.session_state.chat_history,
+        "chat_history": st.session_state.memory.history(),
+        "customer_context": customer_context or {},
     }
+
+
+def process_query(query: str, customer_info: dict = None, customer_context: dict = None) -> str:
+    """Process a user query through the LangGraph workflow"""
+    # Use cached graph from session state
+    workflow = st.session_state.graph
+    state = build_state(query, customer_info, customer_context)
     
     try:
         # Process through the graph
@@ -57,7 +89,36 @@ def process_query(query: str, customer_info: dict = None) -> str:
         return f"Error processing query: {str(e)}"
 
 
-def customer_dashboard(customer_info=None, customer_usage=None, service_plan=None):
+def stream_query(query: str, customer_info: dict = None, customer_context: dict = None) -> str:
+    """Render the answer token by token in the current container; return the final text"""
+    progress = st.status("Thinking...", expanded=False)
+    outcome = {}
+
+    def tokens():
+        for event in stream_workflow(st.session_state.graph, build_state(query, customer_info, customer_context)):
+            if event["type"] == "token":
+                yield event["text"]
+            elif event["type"] == "status":
+                progress.update(label=event["text"])
+            elif event["type"] == "message":
+                progress.markdown(f"**{event.get('speaker') or event['node']}:** {event['text'][:400]}")
+            else:  # done / error
+                outcome.update(event)
+
+    streamed = st.write_stream(tokens())
+    if outcome.get("type") == "error":
+        progress.update(label="Failed", state="error")
+        return f"Error processing query: {outcome['text']}"
+    result = outcome.get("result") or {}
+    cached = (result.get("cache") or {}).get("hit")
+    progress.update(label="Answered from cache" if cached else "Done", state="complete")
+    ttft = outcome.get("ttft_ms")
+    st.caption(f"First token {ttft:.0f} ms · total {outcome['total_ms']:.0f} ms" if ttft is not None
+               else f"Total {outcome.get('total_ms', 0):.0f} ms")
+    return result.get("final_response") or (streamed if isinstance(streamed, str) else "") or "No response generated."
+
+
+def customer_dashboard(customer_info=None, customer_usage=None, service_plan=None, customer_context=None):
     st.title("Welcome to Telecom Service Assistant")
     st.caption("Customer Portal")
 
@@ -76,7 +137,7 @@ def customer_dashboard(customer_info=None, customer_usage=None, service_plan=Non
         # Chat input
         if prompt := st.chat_input("How can I help you today?"):
             # Add user message to chat history
-            st.session_state.chat_history.append({"role": "user", "content": prompt})
+            remember("user", prompt)
             
             # Display user message
             with st.chat_message("user"):
@@ -84,12 +145,15 @@ def customer_dashboard(customer_info=None, customer_usage=None, service_plan=Non
             
             # Process user query through LangGraph
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    response = process_query(prompt, customer_info)
-                    st.write(response)
+                if ENABLE_STREAMING:
+                    response = stream_query(prompt, customer_info, customer_context)
+                else:
+                    with st.spinner("Thinking..."):
+                        response = process_query(prompt, customer_info, customer_context)
+                        st.write(response)
             
             # Add assistant response to chat history
-            st.session_state.chat_history.append({"role": "assistant", "content": response})
+            remember("assistant", response)
             
             # Force rerun to update chat display
             st.rerun()
@@ -240,18 +304,11 @@ def customer_dashboard(customer_info=None, customer_usage=None, service_plan=Non
         query = st.text_area("Enter your telecom question", height=120)
         if st.button("Submit Query") and query.strip():
             workflow = st.session_state.graph
-            state = {
-                "query": query,
-                "customer_info": customer_info or {},
-                "classification": "",
-                "intermediate_responses": {},
-                "final_response": "",
-                "chat_history": st.session_state.chat_history,
-            }
+            state = build_state(query, customer_info, customer_context)
             result = workflow.invoke(state)
             resp = result if isinstance(result, dict) else {}
             st.caption(f"Workflow status: {resp.get('status','')} ")
-            st.markdown(f"**Classification:** `{resp.get('classification','')}`")
+            st.markdown(f"**Classification:** `{' + '.join(resp.get('classifications') or [resp.get('classification','')])}`")
             st.subheader("Final Response")
             st.write(resp.get("final_response","(none)"))
             with st.expander("Intermediate Responses JSON"):
@@ -279,8 +336,15 @@ def admin_dashboard():
             type=["pdf", "md", "txt"],
             accept_multiple_files=True,
         )
-        if uploaded_files:
-            for file in uploaded_files:
+        # The uploader keeps its files across reruns; handle each upload once. Keyed on the
+        # content, so a corrected file with the same name and size is still saved
+        handled = st.session_state.setdefault("handled_uploads", set())
+        new_files = [(f, (f.name, file_hash(f))) for f in uploaded_files or []]
+        new_files = [(f, key) for f, key in new_files if key not in handled]
+        if new_files:
+            saved = []
+            for file, key in new_files:
+                handled.add(key)
                 try:
                     # Save file to data/documents/
                     save_path = Path(__file__).parent.parent / "data" / "documents" / file.name
@@ -293,19 +357,42 @@ def admin_dashboard():
                     with open(save_path, "wb") as f:
                         f.write(file.getbuffer())
                     
-                    # Clear LlamaIndex cache to force rebuild
-                    import agents.knowledge_agents as ka
-                    ka._ENGINE_CACHE = None
-                    
+                    saved.append(file.name)
                     st.success(f"✅ {file.name} uploaded successfully!")
-                    st.info("📚 Document will be indexed on next knowledge query (~10-30 seconds)")
                     
                 except Exception as e:
                     st.error(f"❌ Failed to upload {file.name}: {str(e)}")
             
+            if saved:
+                # Indexed in the background; knowledge answers use the current index until the swap
+                job_id = get_indexer().submit(saved)
+                st.info(f"📚 Indexing job #{job_id} queued; see Indexing Jobs below")
+            
             # Refresh document list
             st.rerun()
         
+        st.subheader("Indexing Jobs")
+        jobs = get_indexer().jobs()
+        if jobs:
+            job_rows = []
+            for job in jobs:
+                progress = f"{job['done']}/{job['total']} chunks" if job["total"] else ""
+                job_rows.append({
+                    "Job": job["id"],
+                    "Files": ", ".join(job["files"]),
+                    "Status": job["status"],
+                    "Stage": job["stage"],
+                    "Progress": progress,
+                    "Submitted": datetime.fromtimestamp(job["submitted_at"]).strftime("%H:%M:%S"),
+                    "Duration (s)": f"{job['finished_at'] - job['started_at']:.1f}" if job["finished_at"] and job["started_at"] else "",
+                    "Error": job["error"],
+                })
+            st.dataframe(pd.DataFrame(job_rows), width='stretch')
+            if any(job["status"] in ("queued", "running") for job in jobs) and st.button("🔄 Refresh job status"):
+                st.rerun()
+        else:
+            st.caption("No indexing jobs yet")
+        
         st.subheader("Existing Documents")
         # Read real documents from the active data/documents directory
         # Use absolute path relative to project root
@@ -346,12 +433,7 @@ def admin_dashboard():
                     selected_customer = st.selectbox("Customer", list(customer_options.keys()))
                     
                     # Category dropdown
-                    category = st.selectbox("Issue Category", [
-                        "Billing Inquiry",
-                        "Connectivity Issue",
-                        "Service Request",
-                        "Technical Support"
-                    ])
+                    category = st.selectbox("Issue Category", TICKET_CATEGORIES)
                 
                 with col2:
                     # Priority dropdown
@@ -374,29 +456,43 @@ def admin_dashboard():
         
         st.divider()
         
-        # FILTER AND DISPLAY TICKETS
-        col1, col2 = st.columns([2, 8])
+        # FILTER AND DISPLAY TICKETS (one keyset page at a time, filtered in SQL)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             status_filter = st.selectbox(
                 "Filter by Status",
                 ["All", "Open", "In Progress", "Assigned", "Resolved"]
             )
+        with col2:
+            priority_filter = st.selectbox("Filter by Priority", ["All", "Low", "Medium", "High", "Critical"])
+        with col3:
+            category_filter = st.selectbox("Filter by Category", ["All"] + TICKET_CATEGORIES)
+        with col4:
+            customer_filter = st.text_input("Filter by Customer ID").strip()
+        
+        ticket_filters = {
+            "status": None if status_filter == "All" else status_filter,
+            "priority": None if priority_filter == "All" else priority_filter,
+            "category": None if category_filter == "All" else category_filter,
+            "customer_id": customer_filter or None,
+        }
+        # Start again from the first page whenever the filters change
+        if st.session_state.get("ticket_filters") != ticket_filters:
+            st.session_state.ticket_filters = ticket_filters
+            st.session_state.ticket_page_cursors = [None]
+        page_cursors = st.session_state.ticket_page_cursors
         
         st.subheader("Support Tickets")
         
-        # Fetch tickets with filter
-        if status_filter == "All":
-            all_tickets = get_all_support_tickets()
-        else:
-            all_tickets = get_all_support_tickets(status=status_filter)
+        metrics = get_ticket_metrics()
+        page = list_support_tickets_page(limit=TICKETS_PER_PAGE, after=page_cursors[-1], **ticket_filters)
         
-        if all_tickets:
-            # Display tickets with update functionality
-            displayed_tickets = all_tickets if status_filter == "All" else [t for t in all_tickets if t['status'] == status_filter]
+        if metrics["total"]:
+            displayed_tickets = page["tickets"]
             
             if displayed_tickets:
-                st.write(f"**Found {len(displayed_tickets)} ticket(s)**")
+                st.write(f"**Page {len(page_cursors)}** - showing {len(displayed_tickets)} ticket(s)")
                 
                 # Display each ticket with update controls
                 for idx, ticket in enumerate(displayed_tickets):
@@ -459,44 +555,34 @@ def admin_dashboard():
                                         st.rerun()
                         
                         st.divider()
+                
+                nav_prev, _, nav_next = st.columns([1, 6, 1])
+                with nav_prev:
+                    if len(page_cursors) > 1 and st.button("◀ Previous", key="tickets_prev"):
+                        page_cursors.pop()
+                        st.rerun()
+                with nav_next:
+                    if page["next_cursor"] and st.button("Next ▶", key="tickets_next"):
+                        page_cursors.append(page["next_cursor"])
+                        st.rerun()
             else:
                 st.success("✓ No tickets found for this filter!")
             
             st.divider()
             
-            # Calculate real metrics from ALL tickets (not just displayed ones)
-            open_tickets = len([t for t in all_tickets if t['status'] == 'Open'])
-            in_progress_tickets = len([t for t in all_tickets if t['status'] == 'In Progress'])
-            resolved_tickets = [t for t in all_tickets if t['status'] == 'Resolved' and t['resolution_time']]
-            
-            # Calculate average resolution time
-            avg_resolution_hours = 0
-            if resolved_tickets:
-                total_hours = 0
-                for ticket in resolved_tickets:
-                    try:
-                        created = datetime.strptime(ticket['creation_time'], "%Y-%m-%d %H:%M:%S")
-                        resolved = datetime.strptime(ticket['resolution_time'], "%Y-%m-%d %H:%M:%S")
-                        hours = (resolved - created).total_seconds() / 3600
-                        total_hours += hours
-                    except Exception:
-                        pass
-                if total_hours > 0:
-                    avg_resolution_hours = total_hours / len(resolved_tickets)
+            # Metrics across ALL tickets, aggregated in SQL (not just displayed ones)
+            avg_resolution_hours = metrics["avg_resolution_hours"]
             
             # Metrics row
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Open Tickets", open_tickets)
+                st.metric("Open Tickets", metrics["open"])
             with col2:
-                st.metric("In Progress", in_progress_tickets)
+                st.metric("In Progress", metrics["in_progress"])
             with col3:
-                st.metric("Avg. Resolution Time", f"{avg_resolution_hours:.1f}h" if avg_resolution_hours > 0 else "N/A")
+                st.metric("Avg. Resolution Time", f"{avg_resolution_hours:.1f}h" if avg_resolution_hours else "N/A")
             with col4:
-                total_tickets = len(all_tickets)
-                resolved_count = len(resolved_tickets)
-                satisfaction = int((resolved_count / total_tickets * 100)) if total_tickets > 0 else 0
-                st.metric("Resolution Rate", f"{satisfaction}%")
+                st.metric("Resolution Rate", f"{int(metrics['resolution_rate'])}%")
         else:
             st.info("No support tickets found in database")
 
@@ -536,6 +622,14 @@ def admin_dashboard():
         else:
             st.success("✓ No active incidents reported")
             st.info("All network services are operating normally.")
+        
+        # Time-to-first-token and total latency of streamed chat answers
+        st.subheader("Assistant Response Times")
+        response_times = streaming_stats()
+        if response_times:
+            st.dataframe(pd.DataFrame.from_dict(response_times, orient="index"), width='stretch')
+        else:
+            st.caption("No streamed answers yet.")
 
 
 # Function to run the app
@@ -558,7 +652,7 @@ def main():
                     st.session_state.authenticated = True
                     st.session_state.user_type = user_type
                     st.session_state.email = email
-                    st.session_state.chat_history = []  # Clear chat history on login
+                    clear_chat()  # Clear chat history on login
                     st.success(f"Logged in as {user_type}")
                     st.rerun()
                 else:
@@ -572,7 +666,7 @@ def main():
                 st.session_state.authenticated = False
                 st.session_state.user_type = None
                 st.session_state.email = None
-                st.session_state.chat_history = []
+                clear_chat()
                 st.session_state.selected_customer_id = None
                 st.rerun()
             
@@ -612,17 +706,17 @@ def main():
     if st.session_state.authenticated:
         customer_id = st.session_state.selected_customer_id
         
-        # Fetch all required customer data
-        customer_info = get_customer(customer_id) if customer_id else None
-        customer_usage = get_customer_usage(customer_id) if customer_id else []
-        service_plan = None
-        if customer_info and customer_info.get('service_plan_id'):
-            service_plan = get_service_plan(customer_info['service_plan_id'])
+        # Load customer, usage and plan once for this turn; the bundle also rides
+        # along in the graph state so agent tools don't re-query the same rows
+        customer_context = load_customer_context(customer_id) if customer_id else None
+        customer_info = customer_context["customer"] if customer_context else None
+        customer_usage = customer_context["usage"] if customer_context else []
+        service_plan = customer_context["plan"] if customer_context else None
 
         if st.session_state.user_type == "Admin":
             admin_dashboard()
         else:
-            customer_dashboard(customer_info, customer_usage, service_plan)
+            customer_dashboard(customer_info, customer_usage, service_plan, customer_context)
     else:
         # Welcome screen for non-authenticated users
         st.title("Welcome to Telecom Service Assistant")
@@ -0,0 +1,102 @@
+# Async database access
+#
+# Awaitable versions of the utils.database helpers. Each call runs on a dedicated
+# thread pool sized to the connection pool, so an async graph node or tool can
+# await several lookups at once (asyncio.gather) without blocking the event loop.
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.config import DB_ASYNC_WORKERS
+from utils import database as db
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=DB_ASYNC_WORKERS, thread_name_prefix="telecom-db")
+    return _EXECUTOR
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=wait)
+            _EXECUTOR = None
+
+
+async def run_in_db_thread(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking database callable on the DB executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _awaitable(fn: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_in_db_thread(fn, *args, **kwargs)
+    wrapper.__name__ = f"a{fn.__name__}"
+    wrapper.__qualname__ = wrapper.__name__
+    return wrapper
+
+
+# Generic access
+afetch_one = _awaitable(db.fetch_one)
+afetch_all = _awaitable(db.fetch_all)
+arun_query = _awaitable(db.run_query)
+arun_query_one = _awaitable(db.run_query_one)
+aexecute_query = _awaitable(db.execute_query)
+
+# Customers, usage & plans
+aget_customer = _awaitable(db.get_customer)
+aget_customer_usage = _awaitable(db.get_customer_usage)
+aget_service_plan = _awaitable(db.get_service_plan)
+alist_customers = _awaitable(db.list_customers)
+
+# Network incidents
+aget_covered_regions = _awaitable(db.get_covered_regions)
+alist_active_incidents = _awaitable(db.list_active_incidents)
+
+# Support tickets
+aget_customer_tickets = _awaitable(db.get_customer_tickets)
+aget_all_support_tickets = _awaitable(db.get_all_support_tickets)
+alist_support_tickets_page = _awaitable(db.list_support_tickets_page)
+aget_ticket_metrics = _awaitable(db.get_ticket_metrics)
+acreate_support_ticket = _awaitable(db.create_support_ticket)
+acreate_support_tickets = _awaitable(db.create_support_tickets)
+aupdate_ticket_status = _awaitable(db.update_ticket_status)
+asearch_tickets_by_category = _awaitable(db.search_tickets_by_category)
+
+# Network knowledge
+asearch_common_network_issues = _awaitable(db.search_common_network_issues)
+aget_troubleshooting_steps = _awaitable(db.get_troubleshooting_steps)
+aget_device_compatibility = _awaitable(db.get_device_compatibility)
+
+# Coverage & infrastructure
+aget_service_areas = _awaitable(db.get_service_areas)
+aget_coverage_quality = _awaitable(db.get_coverage_quality)
+aget_cell_towers = _awaitable(db.get_cell_towers)
+aget_tower_technologies = _awaitable(db.get_tower_technologies)
+aget_transportation_routes = _awaitable(db.get_transportation_routes)
+aget_building_types = _awaitable(db.get_building_types)
+
+
+async def aload_customer_overview(customer_id: str) -> Dict[str, Any]:
+    """Fetch customer, usage, tickets (concurrently) and then the customer's plan."""
+    customer, usage, tickets = await asyncio.gather(
+        aget_customer(customer_id),
+        aget_customer_usage(customer_id),
+        aget_customer_tickets(customer_id),
+    )
+    plan = None
+    if customer and customer.get("service_plan_id"):
+        plan = await aget_service_plan(customer["service_plan_id"])
+    return {"customer": customer, "usage": usage, "plan": plan, "tickets": tickets}
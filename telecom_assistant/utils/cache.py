@@ -0,0 +1,120 @@
+# In-process read-through cache for reference tables
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 1024, default_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches; returns how many were removed."""
+        with self._lock:
+            stale = [k for k in self._data if predicate(k)]
+            for k in stale:
+                del self._data[k]
+            self._stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._data)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 3) if lookups else 0.0
+        snapshot["maxsize"] = self.maxsize
+        return snapshot
+
+
+class ReferenceCache:
+    """Read-through cache keyed by table, with a TTL per table and writer invalidation hooks."""
+
+    def __init__(self, ttls: Dict[str, float], maxsize: int = 1024, default_ttl: float = 300.0, enabled: bool = True):
+        self.ttls = dict(ttls)
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, default_ttl=default_ttl)
+        self._table_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def cached(self, table: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator: serve the wrapped reader from memory for `table`'s TTL.
+
+        Every caller gets its own deep copy (plan dicts, lists of row dicts, column
+        dicts), so editing a result never changes what later callers read.
+        """
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                key = (table, fn.__name__, args, tuple(sorted(kwargs.items())))
+                value = self._cache.get(key, _MISSING)
+                self._count(table, "hits" if value is not _MISSING else "misses")
+                if value is _MISSING:
+                    value = fn(*args, **kwargs)
+                    self._cache.set(key, copy.deepcopy(value), self.ttls.get(table))
+                    return value
+                return copy.deepcopy(value)
+            wrapper.__wrapped__ = fn
+            return wrapper
+        return decorator
+
+    def _count(self, table: str, field: str) -> None:
+        with self._lock:
+            counters = self._table_stats.setdefault(table, {"hits": 0, "misses": 0})
+            counters[field] += 1
+
+    def invalidate_table(self, table: str) -> int:
+        return self._cache.invalidate(lambda key: key[0] == table)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._cache.stats()
+        with self._lock:
+            snapshot["tables"] = {t: dict(c) for t, c in self._table_stats.items()}
+        snapshot["enabled"] = self.enabled
+        return snapshot
@@ -0,0 +1,102 @@
+# Per-turn customer context bundle
+#
+# The UI loads the customer, their usage history and their plan once per chat
+# turn and attaches the bundle to the graph state. While a node runs with the
+# bundle installed (use_customer_context), agent tools read from it and only go
+# to the database when they ask about a different customer or plan.
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, TypedDict
+
+from utils.async_database import aload_customer_overview
+from utils.database import get_customer, get_customer_usage, get_pool, get_service_plan
+
+
+class CustomerContext(TypedDict):
+    customer_id: str
+    customer: Optional[Dict[str, Any]]
+    usage: List[Dict[str, Any]]
+    plan: Optional[Dict[str, Any]]
+    loaded_at: float
+
+
+_CURRENT: ContextVar[Optional[CustomerContext]] = ContextVar("customer_context", default=None)
+
+
+def load_customer_context(customer_id: str) -> CustomerContext:
+    """Load customer, usage and plan in one read transaction on one pooled connection."""
+    with get_pool().read() as con:
+        con.execute("BEGIN")  # one consistent snapshot for all three lookups
+        try:
+            customer = get_customer(customer_id)
+            usage = get_customer_usage(customer_id)
+            plan = None
+            if customer and customer.get("service_plan_id"):
+                plan = get_service_plan(customer["service_plan_id"])
+        finally:
+            con.execute("COMMIT")
+    return {
+        "customer_id": customer_id,
+        "customer": customer,
+        "usage": usage,
+        "plan": plan,
+        "loaded_at": time.time(),
+    }
+
+
+async def aload_customer_context(customer_id: str) -> CustomerContext:
+    """Async load for graph nodes: the lookups run concurrently on the DB executor.
+
+    Unlike load_customer_context they use separate connections, so they are not
+    one snapshot; fine for a turn's read-only context.
+    """
+    overview = await aload_customer_overview(customer_id)
+    return {
+        "customer_id": customer_id,
+        "customer": overview["customer"],
+        "usage": overview["usage"],
+        "plan": overview["plan"],
+        "loaded_at": time.time(),
+    }
+
+
+@contextmanager
+def use_customer_context(context: Optional[CustomerContext]) -> Iterator[None]:
+    """Make `context` visible to tools called from this thread/task for the block."""
+    token = _CURRENT.set(context or None)
+    try:
+        yield
+    finally:
+        _CURRENT.reset(token)
+
+
+def current_customer_context(customer_id: Optional[str] = None) -> Optional[CustomerContext]:
+    context = _CURRENT.get()
+    if context is None:
+        return None
+    if customer_id is not None and context.get("customer_id") != customer_id:
+        return None
+    return context
+
+
+def context_customer(customer_id: str) -> Optional[Dict[str, Any]]:
+    context = current_customer_context(customer_id)
+    if context is not None and context.get("customer"):
+        return context["customer"]
+    return get_customer(customer_id)
+
+
+def context_usage(customer_id: str) -> List[Dict[str, Any]]:
+    context = current_customer_context(customer_id)
+    if context is not None and context.get("customer"):
+        return context["usage"]
+    return get_customer_usage(customer_id)
+
+
+def context_plan(plan_id: str) -> Optional[Dict[str, Any]]:
+    context = current_customer_context()
+    plan = context.get("plan") if context else None
+    if plan and plan.get("plan_id") == plan_id:
+        return plan
+    return get_service_plan(plan_id)
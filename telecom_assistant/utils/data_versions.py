@@ -0,0 +1,64 @@
+# Data version counters maintained by triggers
+#
+# data_versions holds one counter per "scope": per customer for the tables keyed
+# by customer_id ("customer:CUST001"), and per table for shared data such as
+# network incidents. Every insert/update/delete bumps the matching counter, so a
+# caller can fingerprint the data an answer was built from with one small query,
+# and that fingerprint also sees writes made by other processes.
+import sqlite3
+from typing import List, Tuple
+
+# (table, scope expression over the row alias)
+CUSTOMER_TABLES = ("customers", "customer_usage", "support_tickets")
+SHARED_TABLES = ("network_incidents", "service_plans", "coverage_quality")
+
+
+def customer_scope(customer_id: str) -> str:
+    return f"customer:{customer_id}"
+
+
+def _bump(scope_sql: str) -> str:
+    return f"""INSERT INTO data_versions (scope, version) VALUES ({scope_sql}, 1)
+            ON CONFLICT(scope) DO UPDATE SET version = version + 1;"""
+
+
+def _triggers(table: str, scope: str) -> List[str]:
+    # scope is a SQL expression using {row} for NEW/OLD
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} BEGIN
+               {_bump(scope.format(row='new'))}
+           END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_version_ad AFTER DELETE ON {table} BEGIN
+               {_bump(scope.format(row='old'))}
+           END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE ON {table} BEGIN
+               {_bump(scope.format(row='old'))}
+               {_bump(scope.format(row='new'))}
+           END""",
+    ]
+
+
+def data_version_ddl() -> List[str]:
+    statements = ["""CREATE TABLE IF NOT EXISTS data_versions (
+           scope TEXT PRIMARY KEY,
+           version INTEGER NOT NULL
+       )"""]
+    for table in CUSTOMER_TABLES:
+        statements.extend(_triggers(table, "'customer:' || {row}.customer_id"))
+    for table in SHARED_TABLES:
+        statements.extend(_triggers(table, f"'{table}'"))
+    return statements
+
+
+def create_data_versions(con: sqlite3.Connection) -> None:
+    for statement in data_version_ddl():
+        con.execute(statement)
+
+
+def read_versions(con: sqlite3.Connection, scopes: Tuple[str, ...]) -> Tuple[int, ...]:
+    """Current counter per scope (0 when a scope has never been written)."""
+    if not scopes:
+        return ()
+    placeholders = ", ".join("?" * len(scopes))
+    found = dict(con.execute(f"SELECT scope, version FROM data_versions WHERE scope IN ({placeholders})", scopes))
+    return tuple(found.get(scope, 0) for scope in scopes)
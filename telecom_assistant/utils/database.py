@@ -1,191 +1,413 @@
 # Database utilities
+import re
 import sqlite3
-from typing import Any, Dict, List, Tuple, Optional
-from config.config import SQLITE_DB_PATH
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from config.config import (
+    SQLITE_DB_PATH,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_HEALTH_CHECK_INTERVAL,
+    DB_WAL_MODE,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_AUTO_MIGRATE,
+    REF_CACHE_ENABLED,
+    REF_CACHE_MAX_ENTRIES,
+    REF_CACHE_DEFAULT_TTL,
+    REF_CACHE_TTLS,
+)
+from utils.cache import ReferenceCache
+from utils.db_pool import ConnectionPool
+from utils.data_versions import read_versions
+from utils.metrics import summarize as summarize_ticket_metrics
+from utils.migrations import apply_migrations, pending_versions
+from utils.search import match_expression, rebuild_search_indexes, search_indexes_present
+from utils.queries import TICKET_PAGE_FILTERS, get_sql, shape_rows, ticket_page_query
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+_POOL: Optional[ConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+_FTS_READY: Optional[bool] = None
+
+# Reference tables change rarely; their readers are served from memory
+_REFERENCE_CACHE = ReferenceCache(
+    REF_CACHE_TTLS,
+    maxsize=REF_CACHE_MAX_ENTRIES,
+    default_ttl=REF_CACHE_DEFAULT_TTL,
+    enabled=REF_CACHE_ENABLED,
+)
+reference_cached = _REFERENCE_CACHE.cached
+_WRITE_TARGET_RE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"`\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use.
+
+    Pending schema migrations are applied when the pool is created only with
+    DB_AUTO_MIGRATE; otherwise they are logged and left to `python -m utils.migrations`.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                pool = ConnectionPool(
+                    SQLITE_DB_PATH,
+                    size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    health_check_interval=DB_HEALTH_CHECK_INTERVAL,
+                    wal=DB_WAL_MODE,
+                    statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                )
+                if DB_AUTO_MIGRATE:
+                    _migrate(pool)
+                else:
+                    _warn_pending(pool)
+                _POOL = pool
+    return _POOL
+
+
+def _migrate(pool: ConnectionPool) -> List[int]:
+    try:
+        with pool.write() as con:
+            return apply_migrations(con)
+    except sqlite3.Error as e:
+        # A read-only or locked database should not take the assistant down
+        if logger:
+            logger.warning(f"Schema migrations not applied to {pool.db_path}: {e}")
+        return []
+
+
+def _warn_pending(pool: ConnectionPool) -> None:
+    try:
+        with pool.read() as con:
+            pending = pending_versions(con)
+    except sqlite3.Error:
+        return
+    if pending and logger:
+        logger.warning(f"{pool.db_path} is missing schema migrations {pending}; run `python -m utils.migrations`")
+
+
+def migrate() -> List[int]:
+    """Apply pending schema migrations; returns the versions applied."""
+    return _migrate(get_pool())
+
+
+def close_pool() -> None:
+    """Close all pooled connections; the next query opens a fresh pool."""
+    global _POOL, _FTS_READY
+    with _POOL_LOCK:
+        _FTS_READY = None
+        _REFERENCE_CACHE.clear()
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Connection pool metrics (checkouts, reuses, waits, health check failures...)."""
+    return get_pool().stats()
+
+
+def transaction():
+    """Context manager yielding the serialized writer connection as one transaction."""
+    return get_pool().write()
+
+
+def invalidate_reference_cache(table: Optional[str] = None) -> None:
+    """Writer hook: drop cached reads for one table (or all tables)."""
+    if table:
+        _REFERENCE_CACHE.invalidate_table(table)
+    else:
+        _REFERENCE_CACHE.clear()
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Reference cache metrics (hits/misses overall and per table, evictions, size)."""
+    return _REFERENCE_CACHE.stats()
+
+
+def search_ready() -> bool:
+    """True when the FTS5 search indexes exist (created by migration 2)."""
+    global _FTS_READY
+    if _FTS_READY is None:
+        with get_pool().read() as con:
+            _FTS_READY = search_indexes_present(con)
+    return _FTS_READY
+
+
+def rebuild_search() -> None:
+    """Re-sync the full-text indexes from their tables (e.g. after VACUUM)."""
+    with get_pool().write() as con:
+        rebuild_search_indexes(con)
+
+
+def get_data_versions(scopes: Sequence[str]) -> Tuple[int, ...]:
+    """Trigger-maintained change counters for the given scopes (see utils.data_versions).
+
+    Returns an empty tuple when the counters do not exist yet (migration 6 not applied).
+    """
+    try:
+        with get_pool().read() as con:
+            return read_versions(con, tuple(scopes))
+    except sqlite3.OperationalError:
+        return ()
+
 
 def get_connection() -> sqlite3.Connection:
+    """Open a standalone connection (not pooled) for ad-hoc scripts."""
     return sqlite3.connect(SQLITE_DB_PATH)
 
 
 def fetch_one(query: str, params: Tuple = ()) -> Optional[Tuple]:
-    con = get_connection()
-    try:
-        cur = con.cursor()
-        cur.execute(query, params)
-        return cur.fetchone()
-    finally:
-        con.close()
+    with get_pool().read() as con:
+        return con.execute(query, params).fetchone()
 
 
 def fetch_all(query: str, params: Tuple = ()) -> List[Tuple]:
-    con = get_connection()
-    try:
-        cur = con.cursor()
-        cur.execute(query, params)
-        return cur.fetchall()
-    finally:
-        con.close()
-
-
-def get_customer_usage(customer_id: str) -> List[Dict[str, Any]]:
-    rows = fetch_all(
-        "SELECT billing_period_start, billing_period_end, data_used_gb, voice_minutes_used, sms_count_used, additional_charges, total_bill_amount FROM customer_usage WHERE customer_id = ? ORDER BY billing_period_start DESC",
-        (customer_id,),
-    )
-    return [
-        {
-            'billing_period_start': r[0],
-            'billing_period_end': r[1],
-            'data_used_gb': r[2],
-            'voice_minutes_used': r[3],
-            'sms_count_used': r[4],
-            'additional_charges': r[5],
-            'total_bill_amount': r[6],
-        } for r in rows
-    ]
+    with get_pool().read() as con:
+        return con.execute(query, params).fetchall()
 
 
-def get_service_plan(plan_id: str) -> Optional[Dict[str, Any]]:
-    row = fetch_one("SELECT plan_id, name, monthly_cost, data_limit_gb, unlimited_data, voice_minutes, unlimited_voice, sms_count, unlimited_sms, contract_duration_months, early_termination_fee, international_roaming, description FROM service_plans WHERE plan_id = ?", (plan_id,))
-    if not row:
+def run_query(name: str, params: Tuple = (), shape: str = "dicts") -> Any:
+    """Run a registered query (see utils.queries) and return rows in the requested shape.
+
+    shape: "dicts" (default), "records" (namedtuples), "columns" ({col: [values]}) or "rows".
+    """
+    columns, rows = _execute(name, params)
+    return shape_rows(name, columns, rows, shape)
+
+
+def _execute(name: str, params: Tuple = ()) -> Tuple[List[str], List[Tuple]]:
+    with get_pool().read() as con:
+        cur = con.execute(get_sql(name), params)
+        rows = cur.fetchall()
+        columns = [d[0] for d in cur.description]
+    return columns, rows
+
+
+def run_query_one(name: str, params: Tuple = (), shape: str = "dicts") -> Any:
+    """Like run_query but returns only the first row (or None)."""
+    with get_pool().read() as con:
+        cur = con.execute(get_sql(name), params)
+        row = cur.fetchone()
+        columns = [d[0] for d in cur.description]
+    if row is None:
         return None
-    keys = ['plan_id','name','monthly_cost','data_limit_gb','unlimited_data','voice_minutes','unlimited_voice','sms_count','unlimited_sms','contract_duration_months','early_termination_fee','international_roaming','description']
-    return dict(zip(keys, row))
+    return shape_rows(name, columns, [row], shape)[0]
+
+
+def _search(search_name: str, match: Optional[str], like_name: str, like_params: Tuple, shape: str = "dicts") -> Any:
+    """FTS5 query when the indexes exist, else (or when it finds nothing) the LIKE query.
+
+    MATCH only finds token prefixes, so the LIKE fallback keeps substring searches
+    ("sung" -> "Samsung") returning what they did before the indexes existed.
+    """
+    if match and search_ready():
+        rows = run_query(search_name, (match,), shape)
+        if rows:
+            return rows
+    return run_query(like_name, like_params, shape)
+
+
+def get_customer_usage(customer_id: str, shape: str = "dicts") -> List[Dict[str, Any]]:
+    return run_query("usage.by_customer", (customer_id,), shape)
+
+
+@reference_cached("service_plans")
+def get_service_plan(plan_id: str) -> Optional[Dict[str, Any]]:
+    return run_query_one("plan.by_id", (plan_id,))
 
 
 def get_customer(customer_id: str) -> Optional[Dict[str, Any]]:
-    row = fetch_one("SELECT customer_id, name, email, phone_number, address, service_plan_id, account_status, registration_date, last_billing_date FROM customers WHERE customer_id = ?", (customer_id,))
-    if not row:
-        return None
-    keys = ['customer_id','name','email','phone_number','address','service_plan_id','account_status','registration_date','last_billing_date']
-    return dict(zip(keys, row))
+    return run_query_one("customer.by_id", (customer_id,))
 
 
 def get_covered_regions() -> List[str]:
     """Get list of regions we have network monitoring for"""
-    rows = fetch_all("SELECT DISTINCT location FROM network_incidents")
-    return [r[0] for r in rows]
+    return run_query("incidents.regions", shape="columns")["location"]
 
 
-def list_active_incidents(region: Optional[str] = None) -> List[Dict[str, Any]]:
+def list_active_incidents(region: Optional[str] = None, shape: str = "dicts") -> List[Dict[str, Any]]:
     if region:
-        rows = fetch_all("SELECT incident_id, incident_type, location, affected_services, start_time, status, severity FROM network_incidents WHERE status != 'Resolved' AND location LIKE ?", (f"%{region}%",))
-    else:
-        rows = fetch_all("SELECT incident_id, incident_type, location, affected_services, start_time, status, severity FROM network_incidents WHERE status != 'Resolved'")
-    return [
-        {
-            'incident_id': r[0],
-            'incident_type': r[1],
-            'location': r[2],
-            'affected_services': r[3],
-            'start_time': r[4],
-            'status': r[5],
-            'severity': r[6],
-        } for r in rows
-    ]
+        return _search("incidents.search_active", match_expression(region),
+                       "incidents.active_by_region", (f"%{region}%",), shape)
+    return run_query("incidents.active", shape=shape)
 
 
 def list_customers(limit: int = 50) -> List[Dict[str, Any]]:
-    rows = fetch_all("SELECT customer_id, name FROM customers LIMIT ?", (limit,))
-    return [{"customer_id": r[0], "name": r[1]} for r in rows]
+    return run_query("customer.list", (limit,))
 
 
 # ============================================================================
 # NEW FUNCTIONS - Support Tickets
 # ============================================================================
 
-def get_customer_tickets(customer_id: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
+def get_customer_tickets(customer_id: str, status: Optional[str] = None, shape: str = "dicts") -> List[Dict[str, Any]]:
     """Get support ticket history for a customer, optionally filtered by status"""
     if status:
-        rows = fetch_all(
-            "SELECT ticket_id, issue_category, issue_description, creation_time, resolution_time, status, priority, resolution_notes FROM support_tickets WHERE customer_id = ? AND status = ? ORDER BY creation_time DESC",
-            (customer_id, status)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT ticket_id, issue_category, issue_description, creation_time, resolution_time, status, priority, resolution_notes FROM support_tickets WHERE customer_id = ? ORDER BY creation_time DESC",
-            (customer_id,)
-        )
-    return [
-        {
-            'ticket_id': r[0],
-            'issue_category': r[1],
-            'issue_description': r[2],
-            'creation_time': r[3],
-            'resolution_time': r[4],
-            'status': r[5],
-            'priority': r[6],
-            'resolution_notes': r[7],
-        } for r in rows
-    ]
-
-
-def get_all_support_tickets(status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return run_query("tickets.by_customer_status", (customer_id, status), shape)
+    return run_query("tickets.by_customer", (customer_id,), shape)
+
+
+def get_all_support_tickets(status: Optional[str] = None, shape: str = "dicts") -> List[Dict[str, Any]]:
     """Get all support tickets across all customers (for admin view), optionally filtered by status"""
     if status:
-        rows = fetch_all(
-            """SELECT t.ticket_id, t.customer_id, c.name as customer_name, t.issue_category, 
-               t.issue_description, t.creation_time, t.resolution_time, t.status, t.priority, 
-               t.resolution_notes 
-               FROM support_tickets t 
-               JOIN customers c ON t.customer_id = c.customer_id 
-               WHERE t.status = ? 
-               ORDER BY t.creation_time DESC""",
-            (status,)
-        )
-    else:
-        rows = fetch_all(
-            """SELECT t.ticket_id, t.customer_id, c.name as customer_name, t.issue_category, 
-               t.issue_description, t.creation_time, t.resolution_time, t.status, t.priority, 
-               t.resolution_notes 
-               FROM support_tickets t 
-               JOIN customers c ON t.customer_id = c.customer_id 
-               ORDER BY t.creation_time DESC"""
-        )
-    return [
-        {
-            'ticket_id': r[0],
-            'customer_id': r[1],
-            'customer_name': r[2],
-            'issue_category': r[3],
-            'issue_description': r[4],
-            'creation_time': r[5],
-            'resolution_time': r[6],
-            'status': r[7],
-            'priority': r[8],
-            'resolution_notes': r[9],
-        } for r in rows
-    ]
+        return run_query("tickets.all_by_status", (status,), shape)
+    return run_query("tickets.all", shape=shape)
+
+
+def list_support_tickets_page(
+    limit: int = 25,
+    after: Optional[Sequence[str]] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    shape: str = "dicts",
+) -> Dict[str, Any]:
+    """One page of tickets (admin view), newest first, with keyset pagination.
+
+    Pass the previous page's `next_cursor` as `after` to fetch the following page;
+    the cost of a page does not grow with its depth. Filters are applied in SQL.
+    Returns {"tickets": [...], "next_cursor": (creation_time, ticket_id) or None}.
+    """
+    values = {"status": status, "priority": priority, "issue_category": category, "customer_id": customer_id}
+    filters = [f for f in TICKET_PAGE_FILTERS if values[f]]
+    params = [values[f] for f in filters]
+    if after:
+        params.extend(after)
+    name = ticket_page_query(filters, after_cursor=bool(after))
+    columns, rows = _execute(name, tuple(params) + (limit + 1,))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = (last["creation_time"], last["ticket_id"])
+    return {"tickets": shape_rows(name, columns, rows, shape), "next_cursor": next_cursor}
+
+
+def get_ticket_metrics() -> Dict[str, Any]:
+    """Ticket counts by status, resolution rate and average resolution hours.
+
+    Reads the trigger-maintained ticket_metrics summary (migration 4); before that
+    migration has run, the same figures are aggregated in SQL from support_tickets.
+    """
+    try:
+        rows = run_query("metrics.tickets", shape="rows")
+    except sqlite3.OperationalError:
+        rows = run_query("metrics.tickets_aggregate", shape="rows")
+    return summarize_ticket_metrics(rows)
 
 
 def execute_query(query: str, params: Tuple = ()) -> int:
     """Execute INSERT/UPDATE/DELETE and return affected rows"""
-    con = get_connection()
-    try:
-        cur = con.cursor()
-        cur.execute(query, params)
-        con.commit()
-        return cur.rowcount
-    finally:
-        con.close()
+    with get_pool().write() as con:
+        rowcount = con.execute(query, params).rowcount
+    target = _WRITE_TARGET_RE.match(query)
+    if target:
+        invalidate_reference_cache(target.group(1))
+    return rowcount
+
+
+_TICKET_ID_PREFIX = "TKT"
+_INSERT_TICKET_SQL = """INSERT INTO support_tickets
+           (ticket_id, customer_id, issue_category, issue_description, priority,
+            status, creation_time, resolution_time, resolution_notes)
+           VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, datetime('now')), ?, ?)"""
+
+
+def reserve_ids(con: sqlite3.Connection, sequence: str, count: int = 1) -> range:
+    """Reserve `count` consecutive values of a sequence inside the caller's write transaction.
+
+    The UPDATE takes SQLite's write lock first, so concurrent writers (threads or
+    processes) can never be handed the same values.
+    """
+    con.execute("UPDATE id_sequences SET next_value = next_value + ? WHERE name = ?", (count, sequence))
+    row = con.execute("SELECT next_value FROM id_sequences WHERE name = ?", (sequence,)).fetchone()
+    if row is None:
+        raise RuntimeError(f"Sequence '{sequence}' not found; run `python -m utils.migrations`")
+    return range(row[0] - count, row[0])
+
+
+def _ticket_id(value: int) -> str:
+    return f"{_TICKET_ID_PREFIX}{value:06d}"
 
 
 def create_support_ticket(customer_id: str, category: str, description: str, priority: str) -> str:
     """Create a new support ticket"""
-    import time
-    ticket_id = f"TKT{str(int(time.time()))[-6:]}"
-    
-    execute_query(
-        """INSERT INTO support_tickets 
-           (ticket_id, customer_id, issue_category, issue_description, 
-            priority, status, creation_time) 
-           VALUES (?, ?, ?, ?, ?, 'Open', datetime('now'))""",
-        (ticket_id, customer_id, category, description, priority)
-    )
-    
+    with get_pool().write() as con:
+        ticket_id = _ticket_id(reserve_ids(con, "support_tickets")[0])
+        con.execute(_INSERT_TICKET_SQL, (ticket_id, customer_id, category, description, priority,
+                                         "Open", None, None, None))
     return ticket_id
 
 
+def _known_customers(con: sqlite3.Connection, customer_ids: List[str], chunk: int = 500) -> set:
+    known = set()
+    for start in range(0, len(customer_ids), chunk):
+        batch = customer_ids[start:start + chunk]
+        placeholders = ", ".join("?" * len(batch))
+        known.update(r[0] for r in con.execute(
+            f"SELECT customer_id FROM customers WHERE customer_id IN ({placeholders})", batch))
+    return known
+
+
+def _ticket_params(record: Dict[str, Any], known: set) -> Tuple[Optional[Tuple], Optional[str]]:
+    category = record.get("issue_category") or record.get("category")
+    description = record.get("issue_description") or record.get("description")
+    missing = [name for name, value in (("customer_id", record.get("customer_id")),
+                                        ("issue_category", category),
+                                        ("issue_description", description),
+                                        ("priority", record.get("priority"))) if not value]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    if record["customer_id"] not in known:
+        return None, f"unknown customer {record['customer_id']}"
+    return (record["customer_id"], category, description, record["priority"],
+            record.get("status") or "Open", record.get("creation_time"),
+            record.get("resolution_time"), record.get("resolution_notes")), None
+
+
+def create_support_tickets(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bulk-create tickets in a single transaction (e.g. call-center replays).
+
+    Each record needs customer_id, issue_category (or category), issue_description
+    (or description) and priority; status, creation_time, resolution_time and
+    resolution_notes are optional. Rows are validated first, valid ones get IDs
+    from one sequence reservation and go in with a single executemany.
+    Returns one result per record, in input order:
+    {"index", "ok", "ticket_id", "error"}.
+    """
+    results: List[Dict[str, Any]] = []
+    if not records:
+        return results
+    with get_pool().write() as con:
+        ids = list({r.get("customer_id") for r in records if r.get("customer_id")})
+        known = _known_customers(con, ids)
+        valid = []
+        for index, record in enumerate(records):
+            params, error = _ticket_params(record, known)
+            results.append({"index": index, "ok": error is None, "ticket_id": None, "error": error})
+            if params is not None:
+                valid.append((index, params))
+        if valid:
+            reserved = reserve_ids(con, "support_tickets", len(valid))
+            rows = []
+            for value, (index, params) in zip(reserved, valid):
+                ticket_id = _ticket_id(value)
+                results[index]["ticket_id"] = ticket_id
+                rows.append((ticket_id,) + params)
+            con.executemany(_INSERT_TICKET_SQL, rows)
+    return results
+
+
 def update_ticket_status(ticket_id: str, status: str, resolution_notes: Optional[str] = None) -> None:
     """Update ticket status and optionally add resolution notes"""
     if status == "Resolved":
@@ -204,259 +426,107 @@ def update_ticket_status(ticket_id: str, status: str, resolution_notes: Optional
 
 def search_tickets_by_category(category: str) -> List[Dict[str, Any]]:
     """Search resolved tickets by issue category for common resolutions"""
-    rows = fetch_all(
-        "SELECT ticket_id, customer_id, issue_description, resolution_notes, priority FROM support_tickets WHERE issue_category LIKE ? AND status = 'Resolved' ORDER BY creation_time DESC LIMIT 10",
-        (f"%{category}%",)
-    )
-    return [
-        {
-            'ticket_id': r[0],
-            'customer_id': r[1],
-            'issue_description': r[2],
-            'resolution_notes': r[3],
-            'priority': r[4],
-        } for r in rows
-    ]
+    return _search("tickets.search_resolved_by_category", match_expression(category),
+                   "tickets.resolved_by_category", (f"%{category}%",))
 
 
 # ============================================================================
 # NEW FUNCTIONS - Common Network Issues
 # ============================================================================
 
+@reference_cached("common_network_issues")
 def search_common_network_issues(keyword: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Search common network issues by keyword or get all"""
+    """Search common network issues by keyword (BM25-ranked full-text match) or get all"""
     if keyword:
-        rows = fetch_all(
-            "SELECT issue_id, issue_category, issue_description, affected_technologies, affected_services, typical_symptoms, troubleshooting_steps, resolution_approach FROM common_network_issues WHERE issue_category LIKE ? OR issue_description LIKE ? OR typical_symptoms LIKE ?",
-            (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%")
-        )
-    else:
-        rows = fetch_all(
-            "SELECT issue_id, issue_category, issue_description, affected_technologies, affected_services, typical_symptoms, troubleshooting_steps, resolution_approach FROM common_network_issues"
-        )
-    return [
-        {
-            'issue_id': r[0],
-            'issue_category': r[1],
-            'issue_description': r[2],
-            'affected_technologies': r[3],
-            'affected_services': r[4],
-            'typical_symptoms': r[5],
-            'troubleshooting_steps': r[6],
-            'resolution_approach': r[7],
-        } for r in rows
-    ]
+        return _search("issues.search", match_expression(keyword),
+                       "issues.by_keyword", (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%"))
+    return run_query("issues.all")
 
 
+@reference_cached("common_network_issues")
 def get_troubleshooting_steps(issue_category: str) -> Optional[Dict[str, Any]]:
     """Get detailed troubleshooting steps for a specific issue category"""
-    row = fetch_one(
-        "SELECT issue_id, issue_category, troubleshooting_steps, resolution_approach, affected_technologies FROM common_network_issues WHERE issue_category LIKE ? LIMIT 1",
-        (f"%{issue_category}%",)
-    )
-    if not row:
-        return None
-    return {
-        'issue_id': row[0],
-        'issue_category': row[1],
-        'troubleshooting_steps': row[2],
-        'resolution_approach': row[3],
-        'affected_technologies': row[4],
-    }
+    return run_query_one("issues.steps_by_category", (f"%{issue_category}%",))
 
 
 # ============================================================================
 # NEW FUNCTIONS - Device Compatibility
 # ============================================================================
 
+@reference_cached("device_compatibility")
 def get_device_compatibility(device_make: Optional[str] = None, device_model: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get device compatibility information and known issues"""
-    if device_make and device_model:
-        rows = fetch_all(
-            "SELECT compatibility_id, device_make, device_model, os_version, network_technology, known_issues, recommended_settings FROM device_compatibility WHERE device_make LIKE ? AND device_model LIKE ?",
-            (f"%{device_make}%", f"%{device_model}%")
-        )
-    elif device_make:
-        rows = fetch_all(
-            "SELECT compatibility_id, device_make, device_model, os_version, network_technology, known_issues, recommended_settings FROM device_compatibility WHERE device_make LIKE ?",
-            (f"%{device_make}%",)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT compatibility_id, device_make, device_model, os_version, network_technology, known_issues, recommended_settings FROM device_compatibility"
-        )
-    return [
-        {
-            'compatibility_id': r[0],
-            'device_make': r[1],
-            'device_model': r[2],
-            'os_version': r[3],
-            'network_technology': r[4],
-            'known_issues': r[5],
-            'recommended_settings': r[6],
-        } for r in rows
-    ]
+    if not device_make:
+        return run_query("devices.all")
+    match = match_expression(device_make, ["device_make"])
+    if match and device_model:
+        model_match = match_expression(device_model, ["device_model"])
+        match = f"{match} AND {model_match}" if model_match else None
+    if device_model:
+        return _search("devices.search", match, "devices.by_make_model", (f"%{device_make}%", f"%{device_model}%"))
+    return _search("devices.search", match, "devices.by_make", (f"%{device_make}%",))
 
 
 # ============================================================================
 # NEW FUNCTIONS - Service Areas & Coverage
 # ============================================================================
 
+@reference_cached("service_areas")
 def get_service_areas(city: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get service area information by city or all areas"""
     if city:
-        rows = fetch_all(
-            "SELECT area_id, city, district, postal_code, region, population_density, terrain_type FROM service_areas WHERE city LIKE ?",
-            (f"%{city}%",)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT area_id, city, district, postal_code, region, population_density, terrain_type FROM service_areas"
-        )
-    return [
-        {
-            'area_id': r[0],
-            'city': r[1],
-            'district': r[2],
-            'postal_code': r[3],
-            'region': r[4],
-            'population_density': r[5],
-            'terrain_type': r[6],
-        } for r in rows
-    ]
-
-
-def get_coverage_quality(area_id: Optional[str] = None, technology: Optional[str] = None) -> List[Dict[str, Any]]:
+        return run_query("areas.by_city", (f"%{city}%",))
+    return run_query("areas.all")
+
+
+@reference_cached("coverage_quality")
+def get_coverage_quality(area_id: Optional[str] = None, technology: Optional[str] = None, shape: str = "dicts") -> List[Dict[str, Any]]:
     """Get coverage quality metrics for an area and/or technology"""
     if area_id and technology:
-        rows = fetch_all(
-            "SELECT coverage_id, area_id, technology, signal_strength_category, avg_download_speed_mbps, avg_upload_speed_mbps, avg_latency_ms FROM coverage_quality WHERE area_id = ? AND technology = ?",
-            (area_id, technology)
-        )
-    elif area_id:
-        rows = fetch_all(
-            "SELECT coverage_id, area_id, technology, signal_strength_category, avg_download_speed_mbps, avg_upload_speed_mbps, avg_latency_ms FROM coverage_quality WHERE area_id = ?",
-            (area_id,)
-        )
-    elif technology:
-        rows = fetch_all(
-            "SELECT coverage_id, area_id, technology, signal_strength_category, avg_download_speed_mbps, avg_upload_speed_mbps, avg_latency_ms FROM coverage_quality WHERE technology = ?",
-            (technology,)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT coverage_id, area_id, technology, signal_strength_category, avg_download_speed_mbps, avg_upload_speed_mbps, avg_latency_ms FROM coverage_quality"
-        )
-    return [
-        {
-            'coverage_id': r[0],
-            'area_id': r[1],
-            'technology': r[2],
-            'signal_strength_category': r[3],
-            'avg_download_speed_mbps': r[4],
-            'avg_upload_speed_mbps': r[5],
-            'avg_latency_ms': r[6],
-        } for r in rows
-    ]
+        return run_query("coverage.by_area_technology", (area_id, technology), shape)
+    if area_id:
+        return run_query("coverage.by_area", (area_id,), shape)
+    if technology:
+        return run_query("coverage.by_technology", (technology,), shape)
+    return run_query("coverage.all", shape=shape)
 
 
 # ============================================================================
 # NEW FUNCTIONS - Cell Towers
 # ============================================================================
 
+@reference_cached("cell_towers")
 def get_cell_towers(area_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get cell tower information for an area"""
     if area_id:
-        rows = fetch_all(
-            "SELECT tower_id, area_id, latitude, longitude, tower_type, height_meters, operational_status FROM cell_towers WHERE area_id = ?",
-            (area_id,)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT tower_id, area_id, latitude, longitude, tower_type, height_meters, operational_status FROM cell_towers"
-        )
-    return [
-        {
-            'tower_id': r[0],
-            'area_id': r[1],
-            'latitude': r[2],
-            'longitude': r[3],
-            'tower_type': r[4],
-            'height_meters': r[5],
-            'operational_status': r[6],
-        } for r in rows
-    ]
-
-
-def get_tower_technologies(tower_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return run_query("towers.by_area", (area_id,))
+    return run_query("towers.all")
+
+
+@reference_cached("tower_technologies")
+def get_tower_technologies(tower_id: Optional[str] = None, shape: str = "dicts") -> List[Dict[str, Any]]:
     """Get technology details for towers"""
     if tower_id:
-        rows = fetch_all(
-            "SELECT tower_tech_id, tower_id, technology, frequency_band, bandwidth_mhz, max_capacity_mbps, active FROM tower_technologies WHERE tower_id = ? AND active = 1",
-            (tower_id,)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT tower_tech_id, tower_id, technology, frequency_band, bandwidth_mhz, max_capacity_mbps, active FROM tower_technologies WHERE active = 1"
-        )
-    return [
-        {
-            'tower_tech_id': r[0],
-            'tower_id': r[1],
-            'technology': r[2],
-            'frequency_band': r[3],
-            'bandwidth_mhz': r[4],
-            'max_capacity_mbps': r[5],
-            'active': r[6],
-        } for r in rows
-    ]
+        return run_query("tower_tech.active_by_tower", (tower_id,), shape)
+    return run_query("tower_tech.active", shape=shape)
 
 
 # ============================================================================
 # NEW FUNCTIONS - Transportation & Buildings
 # ============================================================================
 
+@reference_cached("transportation_routes")
 def get_transportation_routes(route_type: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get transportation route coverage information"""
     if route_type:
-        rows = fetch_all(
-            "SELECT route_id, route_name, route_type, start_point, end_point, coverage_quality, known_issues FROM transportation_routes WHERE route_type LIKE ?",
-            (f"%{route_type}%",)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT route_id, route_name, route_type, start_point, end_point, coverage_quality, known_issues FROM transportation_routes"
-        )
-    return [
-        {
-            'route_id': r[0],
-            'route_name': r[1],
-            'route_type': r[2],
-            'start_point': r[3],
-            'end_point': r[4],
-            'coverage_quality': r[5],
-            'known_issues': r[6],
-        } for r in rows
-    ]
+        return _search("routes.search", match_expression(route_type), "routes.by_type", (f"%{route_type}%",))
+    return run_query("routes.all")
 
 
+@reference_cached("building_types")
 def get_building_types(building_category: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get building type signal characteristics and recommendations"""
     if building_category:
-        rows = fetch_all(
-            "SELECT building_type_id, building_category, construction_material, avg_signal_reduction_percent, recommended_solutions FROM building_types WHERE building_category LIKE ?",
-            (f"%{building_category}%",)
-        )
-    else:
-        rows = fetch_all(
-            "SELECT building_type_id, building_category, construction_material, avg_signal_reduction_percent, recommended_solutions FROM building_types"
-        )
-    return [
-        {
-            'building_type_id': r[0],
-            'building_category': r[1],
-            'construction_material': r[2],
-            'avg_signal_reduction_percent': r[3],
-            'recommended_solutions': r[4],
-        } for r in rows
-    ]
+        return _search("buildings.search", match_expression(building_category),
+                       "buildings.by_category", (f"%{building_category}%",))
+    return run_query("buildings.all")
@@ -0,0 +1,244 @@
+# SQLite connection pool
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no read connection becomes available within the pool timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ("con", "last_used")
+
+    def __init__(self, con: sqlite3.Connection):
+        self.con = con
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Reusable SQLite connections: a bounded set of readers plus one serialized writer.
+
+    A thread checks out one read connection and keeps it for nested calls; when the
+    outermost call finishes it goes back on an idle LIFO stack so the next caller
+    gets a warm connection. Writes share a single connection behind a lock, which
+    matches SQLite's single-writer model. WAL mode lets readers run alongside it.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = 4,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        wal: bool = True,
+        statement_cache_size: int = 128,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.wal = wal
+        self.statement_cache_size = statement_cache_size
+
+        self._idle: "LifoQueue[_PooledConnection]" = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._writer: Optional[_PooledConnection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._wal_ready = not wal
+        self._wal_lock = threading.Lock()
+        self._stats = {
+            "connections_created": 0,
+            "checkouts": 0,
+            "reuses": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "writes": 0,
+            "in_use": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Connection setup
+    # ------------------------------------------------------------------
+    def _connect(self, read_only: bool) -> _PooledConnection:
+        con = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        con.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        if not self._wal_ready:
+            self._enable_wal(con)
+        if read_only:
+            con.execute("PRAGMA query_only = 1")
+        elif self.wal:
+            con.execute("PRAGMA synchronous = NORMAL")
+        self._bump("connections_created")
+        return _PooledConnection(con)
+
+    def _enable_wal(self, con: sqlite3.Connection) -> None:
+        # journal_mode=WAL is persistent in the database file, so once per pool is enough
+        with self._wal_lock:
+            if self._wal_ready:
+                return
+            try:
+                con.execute("PRAGMA journal_mode = WAL")
+            except sqlite3.DatabaseError as e:
+                if logger:
+                    logger.warning(f"Could not enable WAL mode on {self.db_path}: {e}")
+            self._wal_ready = True
+
+    def _healthy(self, pooled: _PooledConnection) -> bool:
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            pooled.con.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._bump("health_check_failures")
+            _close_quietly(pooled.con)
+            return False
+
+    def _bump(self, key: str, delta: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += delta
+
+    # ------------------------------------------------------------------
+    # Readers
+    # ------------------------------------------------------------------
+    def _acquire_reader(self) -> _PooledConnection:
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self._slots.acquire(blocking=False):
+            self._bump("waits")
+            if not self._slots.acquire(timeout=self.timeout):
+                self._bump("timeouts")
+                raise PoolTimeout(f"No database connection available within {self.timeout}s")
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except Empty:
+                    pooled = self._connect(read_only=True)
+                    break
+                if self._healthy(pooled):
+                    self._bump("reuses")
+                    break
+        except Exception:
+            self._slots.release()
+            raise
+        self._bump("checkouts")
+        self._bump("in_use")
+        return pooled
+
+    def _release_reader(self, pooled: _PooledConnection) -> None:
+        pooled.last_used = time.monotonic()
+        self._bump("in_use", -1)
+        if self._closed:
+            _close_quietly(pooled.con)
+        else:
+            self._idle.put(pooled)
+        self._slots.release()
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection; nested calls on one thread share it."""
+        held = getattr(self._local, "reader", None)
+        if held is not None:
+            self._local.depth += 1
+            self._bump("reuses")
+            try:
+                yield held.con
+            finally:
+                self._local.depth -= 1
+            return
+
+        pooled = self._acquire_reader()
+        self._local.reader = pooled
+        self._local.depth = 1
+        try:
+            yield pooled.con
+        finally:
+            self._local.reader = None
+            self._local.depth = 0
+            self._release_reader(pooled)
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection as one transaction (committed on success).
+
+        Re-entrant on the same thread: nested blocks join the outer transaction.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        with self._writer_lock:
+            if self._writer is None or not self._healthy(self._writer):
+                self._writer = self._connect(read_only=False)
+            pooled = self._writer
+            self._writer_depth += 1
+            try:
+                yield pooled.con
+                if self._writer_depth == 1:
+                    pooled.con.commit()
+            except Exception:
+                if self._writer_depth == 1:
+                    pooled.con.rollback()
+                raise
+            finally:
+                self._writer_depth -= 1
+                pooled.last_used = time.monotonic()
+                if self._writer_depth == 0:
+                    self._bump("writes")
+
+    # ------------------------------------------------------------------
+    # Lifecycle / metrics
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot.update({
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "db_path": self.db_path,
+            "closed": self._closed,
+        })
+        return snapshot
+
+    def close(self) -> None:
+        """Close idle readers and the writer; readers still in use close on release."""
+        self._closed = True
+        while True:
+            try:
+                _close_quietly(self._idle.get_nowait().con)
+            except Empty:
+                break
+        with self._writer_lock:
+            if self._writer is not None:
+                _close_quietly(self._writer.con)
+                self._writer = None
+
+
+def _close_quietly(con: sqlite3.Connection) -> None:
+    try:
+        con.close()
+    except Exception:
+        pass
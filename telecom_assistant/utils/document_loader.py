@@ -1,14 +1,19 @@
 import os
+import re
+import tempfile
 from typing import List
-from config.config import DOCUMENTS_DIR, CHROMA_DIR, OPENAI_EMBED_MODEL
+from config.config import DOCUMENTS_DIR, CHROMA_DIR, OPENAI_EMBED_MODEL, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
+from utils.embeddings import LangChainEmbeddings, get_embedding_service
+from utils.ingestion import ChromaSink, IngestionPipeline
 
 try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter  # type: ignore
     from langchain_community.vectorstores import Chroma  # type: ignore
     from langchain_community.document_loaders import TextLoader  # type: ignore
-    from langchain_openai import OpenAIEmbeddings  # type: ignore
 except Exception:  # pragma: no cover
-    RecursiveCharacterTextSplitter = Chroma = TextLoader = OpenAIEmbeddings = object  # type: ignore
+    Chroma = TextLoader = object  # type: ignore
+
+
+INGEST_MANIFEST = "ingest_manifest.json"
 
 
 def load_raw_documents() -> List[str]:
@@ -25,21 +30,22 @@ def load_raw_documents() -> List[str]:
 
 
 def build_vector_store(persist: bool = True):
-    if Chroma is object:
-        return None
-    texts = load_raw_documents()
-    if not texts:
-        return None
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    chunks = []
-    for t in texts:
-        chunks.extend(splitter.split_text(t))
-    embeddings = OpenAIEmbeddings(model=OPENAI_EMBED_MODEL) if OpenAIEmbeddings is not object else None
-    if not embeddings:
+    """Chroma store over DOCUMENTS_DIR; only new or changed chunks are embedded (utils.ingestion)."""
+    if Chroma is object or LangChainEmbeddings is None:
         return None
-    vs = Chroma.from_texts(chunks, embedding=embeddings, persist_directory=CHROMA_DIR if persist else None)
-    if persist:
-        vs.persist()
+    # Batched, rate-limited and cached (utils.embeddings); unchanged text is never re-embedded
+    service = get_embedding_service()
+    embeddings = LangChainEmbeddings(service)
+    # Vector sizes differ between backends, so each embedding model gets its own collection
+    collection = "langchain" if service.model == OPENAI_EMBED_MODEL else "langchain-" + re.sub(r"[^a-zA-Z0-9_-]", "-", service.model)
+    vs = Chroma(collection_name=collection, embedding_function=embeddings, persist_directory=CHROMA_DIR if persist else None)
+    # An in-memory store starts empty, so it gets a throwaway manifest
+    manifest_dir = CHROMA_DIR if persist else tempfile.mkdtemp(prefix="ingest-")
+    manifest = INGEST_MANIFEST if collection == "langchain" else f"ingest_manifest_{collection}.json"
+    IngestionPipeline(
+        [ChromaSink(vs)], os.path.join(manifest_dir, manifest),
+        chunk_size=DEFAULT_CHUNK_SIZE, chunk_overlap=DEFAULT_CHUNK_OVERLAP, embed_model=service.model,
+    ).run()
     return vs
 
 _vector_store_cached = None
@@ -0,0 +1,400 @@
+# Embedding service
+#
+# Every embedding in the app goes through one EmbeddingService, which
+#   - dedupes the texts and serves repeats from a content-addressed SQLite cache
+#     keyed by (model, sha256(text)), so rebuilding an index re-embeds nothing
+#     that was embedded before, under any chunk id or file name
+#   - splits the misses into batches (EMBED_BATCH_SIZE texts each) and runs up to
+#     EMBED_CONCURRENCY of them at once
+#   - waits on a requests/tokens-per-minute limiter before each request and retries
+#     rate-limit, timeout and 5xx errors with exponential backoff (honouring Retry-After)
+#   - writes each finished batch to the cache, so an interrupted build keeps its progress
+# The provider is an "embedder": anything with a `model` name and embed(texts) -> vectors,
+# chosen by EMBEDDING_BACKEND (EMBEDDERS). The "local" backend runs on the CPU with
+# no network: hashed n-gram features folded to EMBED_LOCAL_DIM dimensions, so builds
+# are reproducible and queries embed in microseconds; it skips the cache and limiter.
+# FakeEmbedder is deterministic and offline, for tests. LangChainEmbeddings and
+# LlamaIndexEmbedding expose the service to the vector stores.
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.config import (
+    EMBED_BATCH_SIZE,
+    EMBED_CACHE_PATH,
+    EMBED_CONCURRENCY,
+    EMBED_LOCAL_DIM,
+    EMBED_MAX_RETRIES,
+    EMBED_REQUESTS_PER_MINUTE,
+    EMBED_TOKENS_PER_MINUTE,
+    OPENAI_API_KEY,
+    EMBEDDING_BACKEND,
+    OPENAI_EMBED_MODEL,
+)
+from utils.memory import count_tokens
+from utils.text_features import HashedNgramFeaturizer
+
+try:
+    from langchain_core.embeddings import Embeddings as _LangChainEmbeddings  # type: ignore
+except Exception:  # pragma: no cover
+    _LangChainEmbeddings = None  # type: ignore
+
+try:
+    from llama_index.core.embeddings import BaseEmbedding  # type: ignore
+    from pydantic import PrivateAttr  # type: ignore
+except Exception:  # pragma: no cover
+    BaseEmbedding = None  # type: ignore
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+Vector = List[float]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RateLimitError(Exception):
+    """Raised by embedders on HTTP 429; `retry_after` (seconds) is honoured when set."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = 429
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings API (one request per call)."""
+
+    remote = True
+
+    def __init__(self, model: str = OPENAI_EMBED_MODEL, api_key: Optional[str] = None):
+        from openai import OpenAI  # type: ignore
+        self.model = model
+        self.client = OpenAI(api_key=api_key or OPENAI_API_KEY, max_retries=0)  # EmbeddingService retries
+
+    def embed(self, texts: List[str]) -> List[Vector]:
+        response = self.client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class LocalHashedEmbedder:
+    """CPU-only embeddings: hashed word/char n-grams folded into `dim` dimensions (L2-normalised).
+
+    Lexical rather than semantic similarity, but deterministic, offline and fast;
+    the model name carries the dimension so indexes built with another size are rebuilt.
+    """
+
+    remote = False
+
+    def __init__(self, dim: int = EMBED_LOCAL_DIM):
+        self.dim = dim
+        self.model = f"local-hashed-ngram-{dim}"
+        self.featurizer = HashedNgramFeaturizer()
+
+    def embed(self, texts: List[str]) -> List[Vector]:
+        return [self.featurizer.dense(text, self.dim) for text in texts]
+
+
+class FakeEmbedder:
+    """Deterministic offline embedder for tests: the same text always gives the same unit vector."""
+
+    def __init__(self, dim: int = 32, model: str = "fake", fail_times: int = 0):
+        self.model = model
+        self.dim = dim
+        self.fail_times = fail_times  # raise a 429-style error this many times first
+        self.calls = 0
+        self.texts_embedded = 0
+        self._lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[Vector]:
+        with self._lock:
+            self.calls += 1
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise RateLimitError("fake rate limit", retry_after=0.01)
+            self.texts_embedded += len(texts)
+        vectors = []
+        for text in texts:
+            rng = random.Random(text_hash(text))
+            vector = [rng.uniform(-1.0, 1.0) for _ in range(self.dim)]
+            norm = sum(v * v for v in vector) ** 0.5
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+def _retryable(e: Exception) -> bool:
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(e, (TimeoutError, ConnectionError)) or type(e).__name__ in (
+        "RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError")
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    if getattr(e, "retry_after", None) is not None:
+        return float(e.retry_after)
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute budget shared by all threads (continuously refilled)."""
+
+    def __init__(self, requests_per_minute: int = EMBED_REQUESTS_PER_MINUTE, tokens_per_minute: int = EMBED_TOKENS_PER_MINUTE):
+        self.capacity = {"requests": float(max(requests_per_minute, 1)), "tokens": float(max(tokens_per_minute, 1))}
+        self.available = dict(self.capacity)
+        self.updated = time.monotonic()
+        self.waited_s = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        # A request larger than the whole token budget waits for a full bucket instead of forever
+        needed = {"requests": 1.0, "tokens": float(min(tokens, self.capacity["tokens"]))}
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                for key, capacity in self.capacity.items():
+                    self.available[key] = min(capacity, self.available[key] + (now - self.updated) * capacity / 60.0)
+                self.updated = now
+                wait = max((needed[k] - self.available[k]) * 60.0 / self.capacity[k] for k in needed)
+                if wait <= 0:
+                    for key in needed:
+                        self.available[key] -= needed[key]
+                    return
+                self.waited_s += wait
+            time.sleep(min(wait, 1.0))
+
+
+class EmbeddingCache:
+    """SQLite table of vectors keyed by (model, sha256 of text); float32 blobs."""
+
+    def __init__(self, path: str = EMBED_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._con = sqlite3.connect(path, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._con.commit()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, Vector]:
+        found: Dict[str, Vector] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for offset in range(0, len(unique), 500):
+                chunk = unique[offset:offset + 500]
+                rows = self._con.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, Vector]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self._con.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                [(model, digest, len(vector), array("f", vector).tobytes()) for digest, vector in items.items()],
+            )
+            self._con.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._con.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+class EmbeddingService:
+    """Cached, batched, concurrent, rate-limited embeddings over one embedder."""
+
+    def __init__(
+        self,
+        embedder: Any,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_concurrency: int = EMBED_CONCURRENCY,
+        limiter: Optional[RateLimiter] = None,
+        max_retries: int = EMBED_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        rate_limited: bool = True,
+    ):
+        self.embedder = embedder
+        self.model = embedder.model
+        self.cache = cache
+        self.batch_size = max(batch_size, 1)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limited = rate_limited
+        self._lock = threading.Lock()
+        self._stats = {"texts": 0, "cache_hits": 0, "embedded": 0, "requests": 0, "retries": 0, "failures": 0}
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        """Vectors for `texts`, in order."""
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+        vectors: Dict[str, Vector] = self.cache.get_many(self.model, hashes) if self.cache else {}
+        missing: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors:
+                missing.setdefault(digest, text)
+        self._count(texts=len(texts), cache_hits=sum(1 for h in hashes if h in vectors))
+        if missing:
+            vectors.update(self._embed_missing(missing))
+        return [vectors[digest] for digest in hashes]
+
+    def embed_query(self, text: str) -> Vector:
+        return self.embed([text])[0]
+
+    def _embed_missing(self, missing: Dict[str, str]) -> Dict[str, Vector]:
+        items = list(missing.items())
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        result: Dict[str, Vector] = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches)), thread_name_prefix="embed") as pool:
+            for vectors in pool.map(self._embed_batch, batches):
+                result.update(vectors)
+        return result
+
+    def _embed_batch(self, batch: List[Any]) -> Dict[str, Vector]:
+        texts = [text for _, text in batch]
+        tokens = sum(count_tokens(t) for t in texts) if self.rate_limited else 0
+        attempt = 0
+        while True:
+            if self.rate_limited:
+                self.limiter.acquire(tokens)
+            self._count(requests=1)
+            try:
+                vectors = self.embedder.embed(texts)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not _retryable(e):
+                    self._count(failures=1)
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                attempt += 1
+                self._count(retries=1)
+                if logger:
+                    logger.warning(f"Embedding batch of {len(texts)} failed ({e}); retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+        if len(vectors) != len(texts):
+            raise ValueError(f"Embedder returned {len(vectors)} vectors for {len(texts)} texts")
+        embedded = {digest: list(vector) for (digest, _), vector in zip(batch, vectors)}
+        if self.cache:
+            self.cache.put_many(self.model, embedded)
+        self._count(embedded=len(embedded))
+        return embedded
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "model": self.model, "rate_limit_wait_s": round(self.limiter.waited_s, 2)}
+
+
+if _LangChainEmbeddings is not None:
+
+    class LangChainEmbeddings(_LangChainEmbeddings):  # type: ignore[misc, valid-type]
+        """LangChain Embeddings over an EmbeddingService (for Chroma and other LangChain stores)."""
+
+        def __init__(self, service: EmbeddingService):
+            self.service = service
+
+        def embed_documents(self, texts: List[str]) -> List[Vector]:
+            return self.service.embed(texts)
+
+        def embed_query(self, text: str) -> Vector:
+            return self.service.embed_query(text)
+
+else:  # pragma: no cover
+    LangChainEmbeddings = None  # type: ignore
+
+
+if BaseEmbedding is not None:
+
+    class LlamaIndexEmbedding(BaseEmbedding):  # type: ignore[misc, valid-type]
+        """LlamaIndex embed_model over an EmbeddingService (set as Settings.embed_model)."""
+
+        _service: Any = PrivateAttr()
+
+        def __init__(self, service: EmbeddingService, **kwargs: Any):
+            # The service does its own batching, so LlamaIndex hands it everything at once
+            super().__init__(model_name=service.model, embed_batch_size=2048, **kwargs)
+            self._service = service
+
+        def _get_query_embedding(self, query: str) -> Vector:
+            return self._service.embed_query(query)
+
+        def _get_text_embedding(self, text: str) -> Vector:
+            return self._service.embed_query(text)
+
+        def _get_text_embeddings(self, texts: List[str]) -> List[Vector]:
+            return self._service.embed(texts)
+
+        async def _aget_query_embedding(self, query: str) -> Vector:
+            import asyncio
+            return await asyncio.to_thread(self._service.embed_query, query)
+
+else:  # pragma: no cover
+    LlamaIndexEmbedding = None  # type: ignore
+
+
+EMBEDDERS: Dict[str, Any] = {
+    "openai": OpenAIEmbedder,
+    "local": LocalHashedEmbedder,
+}
+
+
+def create_embedder(backend: str = EMBEDDING_BACKEND) -> Any:
+    try:
+        return EMBEDDERS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {', '.join(EMBEDDERS)}")
+
+
+def build_embedding_service(backend: str = EMBEDDING_BACKEND) -> EmbeddingService:
+    embedder = create_embedder(backend)
+    if not getattr(embedder, "remote", True):
+        # Computing a local vector is cheaper than a cache lookup, and there is no provider to throttle
+        return EmbeddingService(embedder, cache=None, max_concurrency=1, rate_limited=False, max_retries=0)
+    return EmbeddingService(embedder, EmbeddingCache())
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Process-wide embedding service (see orchestration.resources)."""
+    from orchestration.resources import RESOURCES
+    return RESOURCES.get("embeddings")
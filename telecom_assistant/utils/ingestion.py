@@ -0,0 +1,315 @@
+# Incremental document ingestion
+#
+# Keeps a manifest of every document's content hash and the ids of the chunks it
+# produced. Each run scans the documents directory, diffs it against the manifest
+# and touches the vector store(s) only for what changed:
+#   new file       chunk + embed all of its chunks
+#   changed file   embed only chunks whose content hash is new; delete the ones that went away
+#   removed file   delete its chunks
+#   unchanged      nothing (size + mtime match, so it is not even re-hashed)
+# Chunk ids are "<file>::<sha256 of chunk text>", so re-adding a chunk is an upsert.
+# Sinks are updated first and the manifest is written last (temp file + rename): a
+# run that fails part-way leaves the old manifest in place and the next run redoes
+# the same diff. Changing the chunking or the embedding model re-ingests everything.
+import hashlib
+import json
+import os
+import time
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
+
+from config.config import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_SIZE, DOCUMENTS_DIR
+
+try:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter  # type: ignore
+except Exception:  # pragma: no cover
+    RecursiveCharacterTextSplitter = None  # type: ignore
+
+try:
+    from llama_index.core import SimpleDirectoryReader  # type: ignore
+except Exception:  # pragma: no cover
+    SimpleDirectoryReader = None  # type: ignore
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+MANIFEST_VERSION = 1
+TEXT_EXTENSIONS = (".txt", ".md")
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS + (".pdf", ".docx")
+
+Chunk = Dict[str, Any]  # {"id", "text", "metadata": {"source", "chunk"}}
+Progress = Callable[[str, int, int], None]  # (stage, done, total)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(source: Union[str, BinaryIO]) -> str:
+    """sha256 of a file, given its path or an open binary file (read from the start, then rewound)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return file_hash(f)
+    digest = hashlib.sha256()
+    source.seek(0)
+    for block in iter(lambda: source.read(1 << 16), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def read_text(path: str) -> str:
+    """Plain text of a document: .txt/.md directly, other formats through LlamaIndex's file readers."""
+    if path.lower().endswith(TEXT_EXTENSIONS):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    if SimpleDirectoryReader is None:
+        raise RuntimeError(f"No reader for {os.path.basename(path)} (llama-index-readers-file not installed)")
+    docs = SimpleDirectoryReader(input_files=[path]).load_data()
+    return "\n\n".join(doc.text for doc in docs)
+
+
+def _split_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Fallback splitter: paragraphs packed up to chunk_size characters, long ones cut with overlap."""
+    pieces: List[str] = []
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        while len(paragraph) > chunk_size:
+            cut = paragraph.rfind(" ", 0, chunk_size)
+            cut = cut if cut > chunk_size // 2 else chunk_size
+            pieces.append(paragraph[:cut].strip())
+            paragraph = paragraph[max(cut - chunk_overlap, 1):].strip()
+        if paragraph:
+            pieces.append(paragraph)
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + len(piece) + 2 <= chunk_size:
+            chunks[-1] = f"{chunks[-1]}\n\n{piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, chunk_overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[str]:
+    if RecursiveCharacterTextSplitter is not None:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        return [c for c in splitter.split_text(text) if c.strip()]
+    return _split_text(text, chunk_size, chunk_overlap)
+
+
+def chunk_id(source: str, text: str) -> str:
+    return f"{source}::{_sha256(text.encode('utf-8'))[:32]}"
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except Exception:
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    """Atomic replace: readers see the old manifest or the new one, never a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ChromaSink:
+    """A LangChain Chroma vector store (utils.document_loader)."""
+
+    name = "chroma"
+
+    def __init__(self, vector_store: Any):
+        self.vector_store = vector_store
+
+    def reset(self) -> None:
+        # Drop vectors written before the manifest existed (their ids are random)
+        ids = self.vector_store.get().get("ids", [])
+        if ids:
+            self.vector_store.delete(ids=ids)
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self.vector_store.delete(ids=ids)
+
+    def add(self, chunks: List[Chunk]) -> None:
+        if chunks:
+            self.vector_store.add_texts(
+                [c["text"] for c in chunks], metadatas=[c["metadata"] for c in chunks], ids=[c["id"] for c in chunks])
+
+    def commit(self) -> None:
+        persist = getattr(self.vector_store, "persist", None)
+        if callable(persist):  # chromadb >= 0.4 persists on write
+            try:
+                persist()
+            except Exception:
+                pass
+
+
+class LlamaIndexSink:
+    """A LlamaIndex VectorStoreIndex, persisted to `persist_dir` on commit."""
+
+    name = "llamaindex"
+
+    def __init__(self, index: Any, persist_dir: Optional[str] = None):
+        self.index = index
+        self.persist_dir = persist_dir
+
+    def reset(self) -> None:
+        self.delete(list(self.index.ref_doc_info.keys()))
+
+    def delete(self, ids: List[str]) -> None:
+        # Each chunk is its own ref doc, the deletion path every vector store supports
+        for cid in ids:
+            self.index.delete_ref_doc(cid, delete_from_docstore=True)
+
+    def add(self, chunks: List[Chunk]) -> None:
+        if not chunks:
+            return
+        from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode  # type: ignore
+        self.index.insert_nodes([
+            TextNode(id_=c["id"], text=c["text"], metadata=c["metadata"],
+                     relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=c["id"])})
+            for c in chunks
+        ])
+
+    def commit(self) -> None:
+        if self.persist_dir:
+            self.index.storage_context.persist(persist_dir=self.persist_dir)
+
+
+class IngestionPipeline:
+    """Diff `documents_dir` against the manifest at `manifest_path` and apply it to `sinks`."""
+
+    def __init__(
+        self,
+        sinks: List[Any],
+        manifest_path: str,
+        documents_dir: str = DOCUMENTS_DIR,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        embed_model: str = "",
+        batch_size: int = 256,
+        progress: Optional[Progress] = None,
+    ):
+        self.sinks = sinks
+        self.batch_size = max(batch_size, 1)
+        self.progress = progress
+        self.manifest_path = manifest_path
+        self.documents_dir = documents_dir
+        self.settings = {
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "splitter": "recursive" if RecursiveCharacterTextSplitter is not None else "paragraph",
+            "embed_model": embed_model,
+        }
+
+    def _scan(self) -> Dict[str, str]:
+        """{relative path: absolute path} of every supported document."""
+        found: Dict[str, str] = {}
+        if not os.path.isdir(self.documents_dir):
+            return found
+        for root, dirs, files in os.walk(self.documents_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for fname in sorted(files):
+                if fname.lower().endswith(SUPPORTED_EXTENSIONS) and not fname.startswith("."):
+                    path = os.path.join(root, fname)
+                    found[os.path.relpath(path, self.documents_dir).replace(os.sep, "/")] = path
+        return found
+
+    def plan(self, manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """What a run would do: per-file states, chunks to embed and chunk ids to delete."""
+        manifest = manifest or load_manifest(self.manifest_path)
+        full = manifest.get("settings") != self.settings
+        known: Dict[str, Any] = {} if full else manifest.get("files", {})
+        files: Dict[str, Any] = {}
+        to_add: List[Chunk] = []
+        to_delete: List[str] = []
+        counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0, "failed": 0}
+        for source, path in self._scan().items():
+            stat = os.stat(path)
+            previous = known.get(source)
+            if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime:
+                files[source] = previous
+                counts["unchanged"] += 1
+                continue
+            digest = file_hash(path)
+            if previous and previous["sha256"] == digest:
+                files[source] = {**previous, "mtime": stat.st_mtime}
+                counts["unchanged"] += 1
+                continue
+            try:
+                texts = chunk_text(read_text(path), self.settings["chunk_size"], self.settings["chunk_overlap"])
+            except Exception as e:
+                # Keep serving the previous version of the file, if any
+                if logger:
+                    logger.warning(f"Could not read {source}: {e}")
+                counts["failed"] += 1
+                if previous:
+                    files[source] = previous
+                continue
+            old_ids = set(previous["chunks"]) if previous else set()
+            ids: List[str] = []
+            for position, text in enumerate(texts):
+                cid = chunk_id(source, text)
+                if cid in ids:
+                    continue  # identical chunk twice in one file
+                ids.append(cid)
+                if cid not in old_ids:
+                    to_add.append({"id": cid, "text": text, "metadata": {"source": source, "chunk": position}})
+            to_delete.extend(sorted(old_ids - set(ids)))
+            files[source] = {"sha256": digest, "size": stat.st_size, "mtime": stat.st_mtime, "chunks": ids}
+            counts["changed" if previous else "added"] += 1
+        for source in sorted(set(known) - set(files)):
+            to_delete.extend(known[source]["chunks"])
+            counts["removed"] += 1
+        return {"full": full, "files": files, "add": to_add, "delete": to_delete, "counts": counts}
+
+    def run(self) -> Dict[str, Any]:
+        """Apply the diff to every sink, then commit the new manifest; returns a report."""
+        start = time.perf_counter()
+        manifest = load_manifest(self.manifest_path)
+        plan = self.plan(manifest)
+        if plan["full"]:
+            for sink in self.sinks:
+                sink.reset()
+        self._report("planned", 0, len(plan["add"]))
+        for sink in self.sinks:
+            sink.delete(plan["delete"])
+            # Batches bound the size of each embedding request and let callers show progress
+            for offset in range(0, len(plan["add"]), self.batch_size):
+                sink.add(plan["add"][offset:offset + self.batch_size])
+                self._report(f"embedding ({sink.name})" if hasattr(sink, "name") else "embedding",
+                             min(offset + self.batch_size, len(plan["add"])), len(plan["add"]))
+            sink.commit()
+        write_manifest(self.manifest_path, {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "files": plan["files"],
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        report = {
+            **plan["counts"],
+            "full_rebuild": plan["full"],
+            "chunks_embedded": len(plan["add"]),
+            "chunks_deleted": len(plan["delete"]),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        self._report("done", len(plan["add"]), len(plan["add"]))
+        if logger:
+            logger.info(f"Ingestion: {report}")
+        return report
+
+    def _report(self, stage: str, done: int, total: int) -> None:
+        if self.progress is not None:
+            self.progress(stage, done, total)
+
@@ -0,0 +1,175 @@
+# Bounded conversation memory
+#
+# A chat keeps a sliding window of recent messages within a token budget; messages
+# that fall out of the window are folded into a short extractive summary (first
+# sentence of each, oldest lines dropped once the summary reaches its own budget).
+# Neither part grows with the length of the chat, so per-session memory and the
+# history each turn carries stay bounded. Agents do not get the whole history:
+# project() renders just the slice a node is configured to see (NODE_MEMORY).
+import math
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from config.config import MEMORY_MAX_TOKENS, MEMORY_SUMMARY_TOKENS, MEMORY_WINDOW_MESSAGES
+
+try:
+    import tiktoken  # type: ignore
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # pragma: no cover
+    _ENCODING = None
+
+Message = Dict[str, str]
+
+SUMMARY_ROLE = "system"
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_SUMMARY_WORDS = 30
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the ~4 characters/token rule."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        try:
+            return len(_ENCODING.encode(text))
+        except Exception:
+            pass
+    return math.ceil(len(text) / 4)
+
+
+def _gist(message: Message) -> str:
+    """One summary line: the first sentence of a message, capped at _SUMMARY_WORDS words."""
+    text = " ".join(str(message.get("content", "")).split())
+    first = _SENTENCE_RE.split(text, maxsplit=1)[0]
+    words = first.split()
+    if len(words) > _SUMMARY_WORDS:
+        first = " ".join(words[:_SUMMARY_WORDS]) + "..."
+    speaker = "Customer" if message.get("role") == "user" else "Assistant"
+    return f"{speaker}: {first}" if first else ""
+
+
+class ConversationMemory:
+    """Sliding window of recent messages plus a rolling summary of older ones."""
+
+    def __init__(
+        self,
+        max_tokens: int = MEMORY_MAX_TOKENS,
+        window_messages: int = MEMORY_WINDOW_MESSAGES,
+        summary_tokens: int = MEMORY_SUMMARY_TOKENS,
+    ):
+        self.max_tokens = max_tokens
+        self.window_messages = window_messages
+        self.summary_tokens = summary_tokens
+        self._window: Deque[Message] = deque()
+        self._window_tokens = 0
+        self._summary: Deque[str] = deque()
+        self._summary_tokens_used = 0
+        self.total_messages = 0
+
+    @classmethod
+    def from_history(cls, history: Iterable[Dict[str, Any]], **kwargs: Any) -> "ConversationMemory":
+        memory = cls(**kwargs)
+        memory.extend(history)
+        return memory
+
+    def add(self, role: str, content: str) -> None:
+        content = str(content or "")
+        tokens = count_tokens(content)
+        if tokens > self.window_budget:
+            # A single pasted log must not blow the budget on its own
+            content = content[:self.window_budget * 4].rstrip() + "..."
+            tokens = count_tokens(content)
+        message = {"role": str(role), "content": content}
+        self._window.append(message)
+        self._window_tokens += tokens
+        self.total_messages += 1
+        while len(self._window) > 1 and (
+            len(self._window) > self.window_messages or self._window_tokens > self.window_budget
+        ):
+            self._evict()
+
+    def extend(self, history: Iterable[Dict[str, Any]]) -> None:
+        for message in history:
+            if isinstance(message, dict) and message.get("content"):
+                if message.get("role") == SUMMARY_ROLE:
+                    self._add_summary_lines(str(message["content"]).splitlines())
+                else:
+                    self.add(message.get("role", "user"), message["content"])
+
+    @property
+    def window_budget(self) -> int:
+        return max(self.max_tokens - self.summary_tokens, 1)
+
+    def _evict(self) -> None:
+        message = self._window.popleft()
+        self._window_tokens -= count_tokens(message["content"])
+        self._add_summary_lines([_gist(message)])
+
+    def _add_summary_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            line = line.strip()
+            if not line or line == "Earlier in this conversation:" or (self._summary and self._summary[-1] == line):
+                continue
+            self._summary.append(line)
+            self._summary_tokens_used += count_tokens(line)
+        while len(self._summary) > 1 and self._summary_tokens_used > self.summary_tokens:
+            self._summary_tokens_used -= count_tokens(self._summary.popleft())
+
+    @property
+    def summary(self) -> str:
+        if not self._summary:
+            return ""
+        return "Earlier in this conversation:\n" + "\n".join(self._summary)
+
+    def messages(self, last: Optional[int] = None) -> List[Message]:
+        window = list(self._window)
+        return window[-last:] if last else window
+
+    def history(self) -> List[Message]:
+        """The bounded history for the graph state: summary (as a system message) then the window."""
+        summary = self.summary
+        return ([{"role": SUMMARY_ROLE, "content": summary}] if summary else []) + self.messages()
+
+    def token_count(self) -> int:
+        return self._window_tokens + self._summary_tokens_used
+
+    def clear(self) -> None:
+        self._window.clear()
+        self._summary.clear()
+        self._window_tokens = self._summary_tokens_used = self.total_messages = 0
+
+
+# What each graph node sees of the history: recent messages, and whether the summary
+# is included. Knowledge retrieval gets none (history would skew the vector search).
+NODE_MEMORY: Dict[str, Dict[str, Any]] = {
+    "crew_ai": {"messages": 4, "summary": True},
+    "autogen": {"messages": 2, "summary": False},
+    "langchain": {"messages": 4, "summary": True},
+    "llamaindex": {"messages": 0, "summary": False},
+}
+
+
+def project(history: Optional[List[Dict[str, Any]]], node: str, query: str = "", max_tokens: Optional[int] = None) -> str:
+    """Render the part of `history` that `node` needs as prompt text ('' when none).
+
+    `history` is a graph state's chat_history (ConversationMemory.history() output,
+    or any list of {role, content}); a trailing user message equal to `query` (the
+    turn being answered) is left out. The result stays within about `max_tokens`.
+    """
+    spec = NODE_MEMORY.get(node, {"messages": 2, "summary": False})
+    if not history or not (spec["messages"] or spec["summary"]):
+        return ""
+    history = list(history)
+    if query and history and history[-1].get("role") == "user" and history[-1].get("content", "").strip() == query.strip():
+        history.pop()
+    memory = ConversationMemory.from_history(history, max_tokens=max_tokens or MEMORY_MAX_TOKENS)
+    lines: List[str] = []
+    if spec["summary"] and memory.summary:
+        lines.append(memory.summary)
+    if spec["messages"]:
+        recent = memory.messages(spec["messages"])
+        if recent:
+            lines.append("Recent messages:")
+            lines.extend(f"{'Customer' if m['role'] == 'user' else 'Assistant'}: {m['content']}" for m in recent)
+    return "\n".join(lines)
@@ -0,0 +1,81 @@
+# Ticket metrics maintained in SQL
+#
+# ticket_metrics holds one row per ticket status: how many tickets have it, how
+# many of those carry a resolution_time (non-empty, as the dashboard always
+# counted it), and the summed resolution hours. Triggers
+# on support_tickets keep it current on every insert/update/delete, so the admin
+# dashboard reads a handful of rows regardless of ticket volume.
+import sqlite3
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Hours between creation and resolution; NULL when either timestamp is missing/unparseable
+_HOURS = "(julianday({p}.resolution_time) - julianday({p}.creation_time)) * 24"
+# 1 when the ticket has a resolution_time; '' counts as missing
+_RESOLVED = "(COALESCE({p}.resolution_time, '') <> '')"
+
+
+def _add(p: str) -> str:
+    return f"""INSERT INTO ticket_metrics (status, ticket_count, resolved_with_time, resolution_hours_total)
+            VALUES ({p}.status, 1, {_RESOLVED.format(p=p)}, COALESCE({_HOURS.format(p=p)}, 0))
+            ON CONFLICT(status) DO UPDATE SET
+                ticket_count = ticket_count + 1,
+                resolved_with_time = resolved_with_time + {_RESOLVED.format(p=p)},
+                resolution_hours_total = resolution_hours_total + COALESCE({_HOURS.format(p=p)}, 0);"""
+
+
+def _remove(p: str) -> str:
+    return f"""UPDATE ticket_metrics SET
+                ticket_count = ticket_count - 1,
+                resolved_with_time = resolved_with_time - {_RESOLVED.format(p=p)},
+                resolution_hours_total = resolution_hours_total - COALESCE({_HOURS.format(p=p)}, 0)
+            WHERE status = {p}.status;"""
+
+
+TICKET_METRICS_DDL: List[str] = [
+    """CREATE TABLE IF NOT EXISTS ticket_metrics (
+           status TEXT PRIMARY KEY,
+           ticket_count INTEGER NOT NULL DEFAULT 0,
+           resolved_with_time INTEGER NOT NULL DEFAULT 0,
+           resolution_hours_total REAL NOT NULL DEFAULT 0
+       )""",
+    f"""CREATE TRIGGER IF NOT EXISTS support_tickets_metrics_ai AFTER INSERT ON support_tickets BEGIN
+           {_add('new')}
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS support_tickets_metrics_ad AFTER DELETE ON support_tickets BEGIN
+           {_remove('old')}
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS support_tickets_metrics_au
+           AFTER UPDATE OF status, creation_time, resolution_time ON support_tickets BEGIN
+           {_remove('old')}
+           {_add('new')}
+       END""",
+]
+
+# Same columns as the summary table, computed straight from support_tickets
+AGGREGATE_SQL = f"""SELECT status, COUNT(*), SUM({_RESOLVED.format(p='support_tickets')}), COALESCE(SUM({_HOURS.format(p='support_tickets')}), 0)
+       FROM support_tickets GROUP BY status"""
+
+
+def create_ticket_metrics(con: sqlite3.Connection) -> None:
+    """Create the summary table and its triggers, then backfill it from support_tickets."""
+    for statement in TICKET_METRICS_DDL:
+        con.execute(statement)
+    con.execute("DELETE FROM ticket_metrics")
+    con.execute(f"INSERT INTO ticket_metrics (status, ticket_count, resolved_with_time, resolution_hours_total) {AGGREGATE_SQL}")
+
+
+def summarize(rows: Sequence[Tuple[str, int, int, float]]) -> Dict[str, Any]:
+    """Turn per-status (status, count, resolved_with_time, hours_total) rows into dashboard metrics."""
+    by_status = {status: count for status, count, _, _ in rows if count}
+    resolved = next((r for r in rows if r[0] == "Resolved"), ("Resolved", 0, 0, 0.0))
+    resolved_count, hours_total = resolved[2], resolved[3]
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "by_status": by_status,
+        "open": by_status.get("Open", 0),
+        "in_progress": by_status.get("In Progress", 0),
+        "resolved": resolved_count,
+        "resolution_rate": round(resolved_count / total * 100, 1) if total else 0.0,
+        "avg_resolution_hours": round(hours_total / resolved_count, 2) if resolved_count and hours_total > 0 else None,
+    }
@@ -0,0 +1,154 @@
+# Versioned schema migrations for telecom.db
+#
+# Each migration is (version, name, steps). A step is either a SQL statement or a
+# callable taking the writer connection (for backfills). Applied versions are
+# recorded in schema_migrations, so running the migrations again is a no-op.
+import sqlite3
+from typing import Callable, List, Tuple, Union
+from utils.data_versions import create_data_versions
+from utils.metrics import create_ticket_metrics
+from utils.search import create_search_indexes
+
+try:
+    from loguru import logger  # type: ignore
+except Exception:
+    logger = None
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _seed_ticket_sequence(con: sqlite3.Connection) -> None:
+    # Start after the highest numeric ticket ID already issued (TKT005, TKT582443, ...)
+    row = con.execute(
+        "SELECT MAX(CAST(SUBSTR(ticket_id, 4) AS INTEGER)) FROM support_tickets WHERE ticket_id GLOB 'TKT[0-9]*'"
+    ).fetchone()
+    con.execute(
+        "INSERT OR IGNORE INTO id_sequences (name, next_value) VALUES ('support_tickets', ?)",
+        ((row[0] or 0) + 1,),
+    )
+
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "indexes for hot lookups", [
+        # get_customer_usage: covering index, rows come back already ordered
+        """CREATE INDEX IF NOT EXISTS idx_customer_usage_customer
+           ON customer_usage(customer_id, billing_period_start DESC, billing_period_end,
+                             data_used_gb, voice_minutes_used, sms_count_used,
+                             additional_charges, total_bill_amount)""",
+        # get_customer_tickets (with and without status)
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_customer ON support_tickets(customer_id, status, creation_time DESC)",
+        # get_all_support_tickets (admin view, with and without status)
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_status_created ON support_tickets(status, creation_time DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_created ON support_tickets(creation_time DESC)",
+        # get_coverage_quality by area and/or technology
+        "CREATE INDEX IF NOT EXISTS idx_coverage_quality_area_tech ON coverage_quality(area_id, technology)",
+        "CREATE INDEX IF NOT EXISTS idx_coverage_quality_tech ON coverage_quality(technology)",
+        # get_cell_towers / get_tower_technologies
+        "CREATE INDEX IF NOT EXISTS idx_cell_towers_area ON cell_towers(area_id)",
+        "CREATE INDEX IF NOT EXISTS idx_tower_technologies_tower_active ON tower_technologies(tower_id, active)",
+        # list_active_incidents
+        "CREATE INDEX IF NOT EXISTS idx_network_incidents_status_location ON network_incidents(status, location)",
+        "ANALYZE",
+    ]),
+    (2, "full-text search indexes", [
+        create_search_indexes,
+    ]),
+    (3, "id sequences", [
+        """CREATE TABLE IF NOT EXISTS id_sequences (
+               name TEXT PRIMARY KEY,
+               next_value INTEGER NOT NULL
+           )""",
+        _seed_ticket_sequence,
+    ]),
+    (4, "ticket metrics summary", [
+        create_ticket_metrics,
+    ]),
+    (5, "keyset indexes for ticket pagination", [
+        # (creation_time, ticket_id) is the page key; these supersede the creation_time-only indexes
+        "DROP INDEX IF EXISTS idx_support_tickets_created",
+        "DROP INDEX IF EXISTS idx_support_tickets_status_created",
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_keyset ON support_tickets(creation_time DESC, ticket_id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_status_keyset ON support_tickets(status, creation_time DESC, ticket_id DESC)",
+        "ANALYZE",
+    ]),
+    (6, "data version counters", [
+        create_data_versions,
+    ]),
+    (7, "ticket metrics ignore empty resolution times", [
+        # Version 4 counted '' as resolved; recreate the triggers and backfill again
+        "DROP TRIGGER IF EXISTS support_tickets_metrics_ai",
+        "DROP TRIGGER IF EXISTS support_tickets_metrics_ad",
+        "DROP TRIGGER IF EXISTS support_tickets_metrics_au",
+        create_ticket_metrics,
+    ]),
+]
+
+_SCHEMA_TABLE = """CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT (datetime('now'))
+)"""
+
+
+def applied_versions(con: sqlite3.Connection) -> List[int]:
+    con.execute(_SCHEMA_TABLE)
+    return [r[0] for r in con.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+
+def pending_versions(con: sqlite3.Connection) -> List[int]:
+    """Versions not applied yet; only reads, so it is safe on a database nobody migrated."""
+    tracked = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+    ).fetchone()
+    done = {r[0] for r in con.execute("SELECT version FROM schema_migrations")} if tracked else set()
+    return sorted(version for version, _, _ in MIGRATIONS if version not in done)
+
+
+def current_version(con: sqlite3.Connection) -> int:
+    versions = applied_versions(con)
+    return versions[-1] if versions else 0
+
+
+def apply_migrations(con: sqlite3.Connection) -> List[int]:
+    """Apply every pending migration, each in its own transaction.
+
+    Returns the versions applied by this call (empty when already up to date).
+    """
+    done = set(applied_versions(con))
+    if con.in_transaction:
+        con.commit()
+    applied = []
+    for version, name, steps in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done:
+            continue
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            for step in steps:
+                if callable(step):
+                    step(con)
+                else:
+                    con.execute(step)
+            con.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+            con.commit()
+        except Exception:
+            con.rollback()
+            if logger:
+                logger.error(f"Migration {version} ({name}) failed; rolled back")
+            raise
+        applied.append(version)
+        if logger:
+            logger.info(f"Applied migration {version}: {name}")
+    return applied
+
+
+if __name__ == "__main__":  # python -m utils.migrations
+    from config.config import SQLITE_DB_PATH
+
+    connection = sqlite3.connect(SQLITE_DB_PATH)
+    try:
+        newly_applied = apply_migrations(connection)
+        print(f"Database: {SQLITE_DB_PATH}")
+        print(f"Applied now: {newly_applied or 'none'}")
+        print(f"Schema version: {current_version(connection)}")
+    finally:
+        connection.close()
@@ -0,0 +1,184 @@
+# Declarative query registry
+#
+# Every helper in utils.database runs one of these named statements. Reusing the
+# exact same SQL text lets each pooled connection's sqlite3 statement cache keep
+# the compiled statement, and the shaping helpers below turn raw row tuples into
+# the requested result form without per-row Python dict construction code.
+from collections import namedtuple
+from itertools import repeat
+from typing import Any, Dict, List, Sequence, Tuple
+from utils.metrics import AGGREGATE_SQL as _TICKET_AGGREGATE_SQL
+
+_USAGE_COLUMNS = "billing_period_start, billing_period_end, data_used_gb, voice_minutes_used, sms_count_used, additional_charges, total_bill_amount"
+_PLAN_COLUMNS = "plan_id, name, monthly_cost, data_limit_gb, unlimited_data, voice_minutes, unlimited_voice, sms_count, unlimited_sms, contract_duration_months, early_termination_fee, international_roaming, description"
+_CUSTOMER_COLUMNS = "customer_id, name, email, phone_number, address, service_plan_id, account_status, registration_date, last_billing_date"
+_INCIDENT_COLUMNS = "incident_id, incident_type, location, affected_services, start_time, status, severity"
+_TICKET_COLUMNS = "ticket_id, issue_category, issue_description, creation_time, resolution_time, status, priority, resolution_notes"
+_ADMIN_TICKET_COLUMNS = """t.ticket_id, t.customer_id, c.name as customer_name, t.issue_category,
+               t.issue_description, t.creation_time, t.resolution_time, t.status, t.priority,
+               t.resolution_notes"""
+_ISSUE_COLUMNS = "issue_id, issue_category, issue_description, affected_technologies, affected_services, typical_symptoms, troubleshooting_steps, resolution_approach"
+_DEVICE_COLUMNS = "compatibility_id, device_make, device_model, os_version, network_technology, known_issues, recommended_settings"
+_AREA_COLUMNS = "area_id, city, district, postal_code, region, population_density, terrain_type"
+_COVERAGE_COLUMNS = "coverage_id, area_id, technology, signal_strength_category, avg_download_speed_mbps, avg_upload_speed_mbps, avg_latency_ms"
+_TOWER_COLUMNS = "tower_id, area_id, latitude, longitude, tower_type, height_meters, operational_status"
+_TOWER_TECH_COLUMNS = "tower_tech_id, tower_id, technology, frequency_band, bandwidth_mhz, max_capacity_mbps, active"
+_ROUTE_COLUMNS = "route_id, route_name, route_type, start_point, end_point, coverage_quality, known_issues"
+_BUILDING_COLUMNS = "building_type_id, building_category, construction_material, avg_signal_reduction_percent, recommended_solutions"
+
+
+def _prefixed(alias: str, columns: str) -> str:
+    return ", ".join(f"{alias}.{c.strip()}" for c in columns.split(","))
+
+
+QUERIES: Dict[str, str] = {
+    # Customers, usage & plans
+    "customer.by_id": f"SELECT {_CUSTOMER_COLUMNS} FROM customers WHERE customer_id = ?",
+    "customer.list": "SELECT customer_id, name FROM customers LIMIT ?",
+    "usage.by_customer": f"SELECT {_USAGE_COLUMNS} FROM customer_usage WHERE customer_id = ? ORDER BY billing_period_start DESC",
+    "plan.by_id": f"SELECT {_PLAN_COLUMNS} FROM service_plans WHERE plan_id = ?",
+
+    # Network incidents
+    "incidents.regions": "SELECT DISTINCT location FROM network_incidents",
+    "incidents.active": f"SELECT {_INCIDENT_COLUMNS} FROM network_incidents WHERE status != 'Resolved'",
+    "incidents.active_by_region": f"SELECT {_INCIDENT_COLUMNS} FROM network_incidents WHERE status != 'Resolved' AND location LIKE ?",
+    "incidents.search_active": f"""SELECT {_prefixed('n', _INCIDENT_COLUMNS)}
+               FROM network_incidents_fts f JOIN network_incidents n ON n.rowid = f.rowid
+               WHERE network_incidents_fts MATCH ? AND n.status != 'Resolved'
+               ORDER BY bm25(network_incidents_fts)""",
+
+    # Support tickets
+    "tickets.by_customer": f"SELECT {_TICKET_COLUMNS} FROM support_tickets WHERE customer_id = ? ORDER BY creation_time DESC",
+    "tickets.by_customer_status": f"SELECT {_TICKET_COLUMNS} FROM support_tickets WHERE customer_id = ? AND status = ? ORDER BY creation_time DESC",
+    "tickets.all": f"""SELECT {_ADMIN_TICKET_COLUMNS}
+               FROM support_tickets t
+               JOIN customers c ON t.customer_id = c.customer_id
+               ORDER BY t.creation_time DESC""",
+    "tickets.all_by_status": f"""SELECT {_ADMIN_TICKET_COLUMNS}
+               FROM support_tickets t
+               JOIN customers c ON t.customer_id = c.customer_id
+               WHERE t.status = ?
+               ORDER BY t.creation_time DESC""",
+    "tickets.resolved_by_category": "SELECT ticket_id, customer_id, issue_description, resolution_notes, priority FROM support_tickets WHERE issue_category LIKE ? AND status = 'Resolved' ORDER BY creation_time DESC LIMIT 10",
+    "tickets.search_resolved_by_category": """SELECT t.ticket_id, t.customer_id, t.issue_description, t.resolution_notes, t.priority
+               FROM support_tickets_fts f JOIN support_tickets t ON t.rowid = f.rowid
+               WHERE support_tickets_fts MATCH ? AND t.status = 'Resolved'
+               ORDER BY t.creation_time DESC LIMIT 10""",
+    "metrics.tickets": "SELECT status, ticket_count, resolved_with_time, resolution_hours_total FROM ticket_metrics",
+    "metrics.tickets_aggregate": _TICKET_AGGREGATE_SQL,
+
+    # Common network issues
+    "issues.all": f"SELECT {_ISSUE_COLUMNS} FROM common_network_issues",
+    "issues.by_keyword": f"SELECT {_ISSUE_COLUMNS} FROM common_network_issues WHERE issue_category LIKE ? OR issue_description LIKE ? OR typical_symptoms LIKE ?",
+    "issues.search": f"""SELECT {_prefixed('i', _ISSUE_COLUMNS)}
+               FROM common_network_issues_fts f JOIN common_network_issues i ON i.rowid = f.rowid
+               WHERE common_network_issues_fts MATCH ?
+               ORDER BY bm25(common_network_issues_fts, 10.0, 2.0, 1.0)""",
+    "issues.steps_by_category": "SELECT issue_id, issue_category, troubleshooting_steps, resolution_approach, affected_technologies FROM common_network_issues WHERE issue_category LIKE ? LIMIT 1",
+
+    # Device compatibility
+    "devices.all": f"SELECT {_DEVICE_COLUMNS} FROM device_compatibility",
+    "devices.by_make": f"SELECT {_DEVICE_COLUMNS} FROM device_compatibility WHERE device_make LIKE ?",
+    "devices.by_make_model": f"SELECT {_DEVICE_COLUMNS} FROM device_compatibility WHERE device_make LIKE ? AND device_model LIKE ?",
+    "devices.search": f"""SELECT {_prefixed('d', _DEVICE_COLUMNS)}
+               FROM device_compatibility_fts f JOIN device_compatibility d ON d.rowid = f.rowid
+               WHERE device_compatibility_fts MATCH ?
+               ORDER BY bm25(device_compatibility_fts)""",
+
+    # Service areas & coverage
+    "areas.all": f"SELECT {_AREA_COLUMNS} FROM service_areas",
+    "areas.by_city": f"SELECT {_AREA_COLUMNS} FROM service_areas WHERE city LIKE ?",
+    "coverage.all": f"SELECT {_COVERAGE_COLUMNS} FROM coverage_quality",
+    "coverage.by_area": f"SELECT {_COVERAGE_COLUMNS} FROM coverage_quality WHERE area_id = ?",
+    "coverage.by_technology": f"SELECT {_COVERAGE_COLUMNS} FROM coverage_quality WHERE technology = ?",
+    "coverage.by_area_technology": f"SELECT {_COVERAGE_COLUMNS} FROM coverage_quality WHERE area_id = ? AND technology = ?",
+
+    # Cell towers
+    "towers.all": f"SELECT {_TOWER_COLUMNS} FROM cell_towers",
+    "towers.by_area": f"SELECT {_TOWER_COLUMNS} FROM cell_towers WHERE area_id = ?",
+    "tower_tech.active": f"SELECT {_TOWER_TECH_COLUMNS} FROM tower_technologies WHERE active = 1",
+    "tower_tech.active_by_tower": f"SELECT {_TOWER_TECH_COLUMNS} FROM tower_technologies WHERE tower_id = ? AND active = 1",
+
+    # Transportation & buildings
+    "routes.all": f"SELECT {_ROUTE_COLUMNS} FROM transportation_routes",
+    "routes.by_type": f"SELECT {_ROUTE_COLUMNS} FROM transportation_routes WHERE route_type LIKE ?",
+    "routes.search": f"""SELECT {_prefixed('r', _ROUTE_COLUMNS)}
+               FROM transportation_routes_fts f JOIN transportation_routes r ON r.rowid = f.rowid
+               WHERE transportation_routes_fts MATCH ?
+               ORDER BY bm25(transportation_routes_fts)""",
+    "buildings.all": f"SELECT {_BUILDING_COLUMNS} FROM building_types",
+    "buildings.by_category": f"SELECT {_BUILDING_COLUMNS} FROM building_types WHERE building_category LIKE ?",
+    "buildings.search": f"""SELECT {_prefixed('b', _BUILDING_COLUMNS)}
+               FROM building_types_fts f JOIN building_types b ON b.rowid = f.rowid
+               WHERE building_types_fts MATCH ?
+               ORDER BY bm25(building_types_fts)""",
+}
+
+# Columns that list_support_tickets_page can push into the WHERE clause, in SQL order
+TICKET_PAGE_FILTERS = ("status", "priority", "issue_category", "customer_id")
+
+SHAPES = ("dicts", "records", "columns", "rows")
+
+_RECORD_TYPES: Dict[Tuple[str, Tuple[str, ...]], type] = {}
+
+
+def get_sql(name: str) -> str:
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown query '{name}'. Registered: {', '.join(sorted(QUERIES))}") from None
+
+
+def ticket_page_query(filters: Sequence[str], after_cursor: bool) -> str:
+    """Register (once) the keyset page query for a filter combination and return its name.
+
+    Pages are ordered by (creation_time, ticket_id) DESC; the cursor predicate is a
+    row-value comparison, so SQLite seeks straight into the keyset index instead of
+    skipping rows as OFFSET would. CROSS JOIN keeps support_tickets as the outer loop.
+    """
+    unknown = set(filters) - set(TICKET_PAGE_FILTERS)
+    if unknown:
+        raise ValueError(f"Unsupported ticket filter(s): {', '.join(sorted(unknown))}")
+    ordered = [f for f in TICKET_PAGE_FILTERS if f in filters]
+    name = ".".join(["tickets.page"] + ordered + (["after"] if after_cursor else []))
+    if name not in QUERIES:
+        where = [f"t.{f} = ?" for f in ordered]
+        if after_cursor:
+            where.append("(t.creation_time, t.ticket_id) < (?, ?)")
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        QUERIES[name] = f"""SELECT {_ADMIN_TICKET_COLUMNS}
+               FROM support_tickets t
+               CROSS JOIN customers c ON t.customer_id = c.customer_id
+               {where_sql}
+               ORDER BY t.creation_time DESC, t.ticket_id DESC
+               LIMIT ?"""
+    return name
+
+
+def record_type(name: str, columns: Sequence[str]) -> type:
+    """Return the (cached) namedtuple class used for `records` results of a query."""
+    key = (name, tuple(columns))
+    cls = _RECORD_TYPES.get(key)
+    if cls is None:
+        type_name = "".join(part.title() for part in name.replace(".", "_").split("_")) + "Record"
+        cls = namedtuple(type_name, columns)
+        _RECORD_TYPES[key] = cls
+    return cls
+
+
+def shape_rows(name: str, columns: Sequence[str], rows: List[Tuple], shape: str = "dicts") -> Any:
+    """Convert raw row tuples into dicts, namedtuple records, columnar lists or plain rows.
+
+    The conversions run through map/zip so the per-row work stays in C.
+    """
+    if shape == "dicts":
+        return list(map(dict, map(zip, repeat(columns), rows)))
+    if shape == "records":
+        return list(map(record_type(name, columns)._make, rows))
+    if shape == "columns":
+        if not rows:
+            return {col: [] for col in columns}
+        return dict(zip(columns, map(list, zip(*rows))))
+    if shape == "rows":
+        return rows
+    raise ValueError(f"Unknown result shape '{shape}'. Expected one of: {', '.join(SHAPES)}")
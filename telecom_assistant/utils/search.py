@@ -0,0 +1,106 @@
+# Full-text search (SQLite FTS5)
+#
+# Each knowledge table that used to be searched with LIKE '%keyword%' gets an
+# external-content FTS5 index (no duplicate copy of the text) kept in sync by
+# triggers. Keyword searches become token-prefix MATCH queries ranked by BM25.
+import re
+import sqlite3
+from typing import Dict, List, Optional, Sequence
+
+# index name -> source table and the columns that are searchable
+SEARCH_INDEXES: Dict[str, Dict[str, Sequence[str]]] = {
+    "common_network_issues_fts": {
+        "table": "common_network_issues",
+        "columns": ("issue_category", "issue_description", "typical_symptoms"),
+    },
+    "support_tickets_fts": {
+        "table": "support_tickets",
+        "columns": ("issue_category",),
+    },
+    "device_compatibility_fts": {
+        "table": "device_compatibility",
+        "columns": ("device_make", "device_model"),
+    },
+    "transportation_routes_fts": {
+        "table": "transportation_routes",
+        "columns": ("route_type",),
+    },
+    "building_types_fts": {
+        "table": "building_types",
+        "columns": ("building_category",),
+    },
+    "network_incidents_fts": {
+        "table": "network_incidents",
+        "columns": ("location",),
+    },
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts5_supported(con: sqlite3.Connection) -> bool:
+    try:
+        con.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        con.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def index_ddl(name: str) -> List[str]:
+    """Statements that create one FTS index, its sync triggers, and populate it."""
+    spec = SEARCH_INDEXES[name]
+    table = spec["table"]
+    cols = ", ".join(spec["columns"])
+    new_vals = ", ".join(f"new.{c}" for c in spec["columns"])
+    old_vals = ", ".join(f"old.{c}" for c in spec["columns"])
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5(
+            {cols}, content='{table}', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {name}(rowid, {cols}) VALUES (new.rowid, {new_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.rowid, {old_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+            INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.rowid, {old_vals});
+            INSERT INTO {name}(rowid, {cols}) VALUES (new.rowid, {new_vals});
+        END""",
+        f"INSERT INTO {name}({name}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_indexes(con: sqlite3.Connection) -> None:
+    """Migration step: create every FTS index (skipped when SQLite lacks FTS5)."""
+    if not fts5_supported(con):
+        return
+    for name in SEARCH_INDEXES:
+        for stmt in index_ddl(name):
+            con.execute(stmt)
+
+
+def rebuild_search_indexes(con: sqlite3.Connection) -> None:
+    """Re-sync every FTS index from its table (needed after VACUUM renumbers rowids)."""
+    for name in SEARCH_INDEXES:
+        con.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def search_indexes_present(con: sqlite3.Connection) -> bool:
+    names = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return all(name in names for name in SEARCH_INDEXES)
+
+
+def match_expression(text: Optional[str], columns: Optional[Sequence[str]] = None) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression: every token as a quoted prefix, ANDed.
+
+    Returns None when the text has no searchable tokens (callers fall back to LIKE).
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    expr = " AND ".join(f'"{t}"*' for t in tokens)
+    if columns:
+        return f"{{{' '.join(columns)}}} : ({expr})"
+    return expr
@@ -0,0 +1,156 @@
+# Streaming events from agent code to the consumer of a turn
+#
+# A StreamEmitter is bound to the current context while one graph run is being
+# streamed (orchestration.streaming.stream_workflow). Agent code reports partial
+# output through emit_token / emit_message / emit_status; these are no-ops when
+# nothing is listening (plain invoke(), scripts, tests), so agents call them
+# unconditionally. Events are plain dicts:
+#   {"type": "token" | "message" | "status", "node": "crew_ai", "text": "...", "elapsed_ms": 12.5}
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler  # type: ignore
+except Exception:  # pragma: no cover
+    BaseCallbackHandler = None  # type: ignore
+
+
+class StreamEmitter:
+    """Thread-safe event queue for one streamed turn, plus its time-to-first-token."""
+
+    def __init__(self):
+        self.events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.token_count = 0
+        self._streamed_nodes: Set[str] = set()
+        # Set when a turn fans out to several agents: their token streams would
+        # interleave, so only the merged answer from formulate_response goes out
+        self.hold_agent_tokens = False
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, node: str, text: str = "", final: bool = False, **extra: Any) -> None:
+        now = time.perf_counter()
+        if kind == "token":
+            if not text or (self.hold_agent_tokens and not final):
+                return
+            with self._lock:
+                self.token_count += 1
+                self._streamed_nodes.add(node)
+                if self.first_token_at is None:
+                    self.first_token_at = now
+        self.events.put({"type": kind, "node": node, "text": text,
+                         "elapsed_ms": round((now - self.started) * 1000, 1), **extra})
+
+    def has_streamed(self, node: str) -> bool:
+        with self._lock:
+            return node in self._streamed_nodes
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return round((self.first_token_at - self.started) * 1000, 1)
+
+
+_EMITTER: ContextVar[Optional[StreamEmitter]] = ContextVar("stream_emitter", default=None)
+
+
+def current_emitter() -> Optional[StreamEmitter]:
+    return _EMITTER.get()
+
+
+@contextmanager
+def use_emitter(emitter: Optional[StreamEmitter]) -> Iterator[Optional[StreamEmitter]]:
+    token = _EMITTER.set(emitter)
+    try:
+        yield emitter
+    finally:
+        _EMITTER.reset(token)
+
+
+def emit_token(node: str, text: str, final: bool = False) -> None:
+    """A piece of the user-facing answer (`final` = formatted by formulate_response)."""
+    emitter = _EMITTER.get()
+    if emitter is not None:
+        emitter.put("token", node, text, final=final)
+
+
+def emit_message(node: str, text: str, speaker: str = "") -> None:
+    """An intermediate agent message (tool call, group-chat turn, finished task)."""
+    emitter = _EMITTER.get()
+    if emitter is not None and text:
+        emitter.put("message", node, text, speaker=speaker)
+
+
+def emit_status(node: str, text: str) -> None:
+    """A progress note such as 'Checking network incidents...'."""
+    emitter = _EMITTER.get()
+    if emitter is not None:
+        emitter.put("status", node, text)
+
+
+def hold_agent_tokens() -> None:
+    """Stream only the merged answer for the rest of this turn (multi-agent fan-out)."""
+    emitter = _EMITTER.get()
+    if emitter is not None:
+        emitter.hold_agent_tokens = True
+
+
+def has_streamed(node: str) -> bool:
+    """True when answer tokens for `node` already went out during this turn."""
+    emitter = _EMITTER.get()
+    return emitter is not None and emitter.has_streamed(node)
+
+
+if BaseCallbackHandler is not None:
+
+    class LangChainStreamHandler(BaseCallbackHandler):  # type: ignore[misc, valid-type]
+        """Forwards LLM tokens after `marker` (the ReAct 'Final Answer:') and tool calls.
+
+        Callbacks may fire on LangChain worker threads, so the emitter is bound at
+        construction instead of read from the context.
+        """
+
+        def __init__(self, emitter: StreamEmitter, node: str, marker: Optional[str] = "Final Answer:"):
+            self.emitter = emitter
+            self.node = node
+            self.marker = marker
+            self._buffer = ""
+            self._answering = marker is None
+
+        def on_llm_start(self, *_args: Any, **_kwargs: Any) -> None:
+            self._buffer = ""
+            self._answering = self.marker is None
+
+        def on_chat_model_start(self, *_args: Any, **_kwargs: Any) -> None:
+            self.on_llm_start()
+
+        def on_llm_new_token(self, token: str, **_kwargs: Any) -> None:
+            if self._answering:
+                self.emitter.put("token", self.node, token)
+                return
+            self._buffer += token
+            index = self._buffer.find(self.marker or "")
+            if index >= 0:
+                self._answering = True
+                self.emitter.put("token", self.node, self._buffer[index + len(self.marker or ""):].lstrip())
+
+        def on_agent_action(self, action: Any, **_kwargs: Any) -> None:
+            tool = getattr(action, "tool", "")
+            self.emitter.put("message", self.node, f"Using {tool}: {getattr(action, 'tool_input', '')}", speaker="agent")
+
+else:  # pragma: no cover
+    LangChainStreamHandler = None  # type: ignore
+
+
+def langchain_callbacks(node: str, marker: Optional[str] = "Final Answer:") -> List[Any]:
+    """Callback handlers for a LangChain invoke(config={"callbacks": ...}); [] when not streaming."""
+    emitter = _EMITTER.get()
+    if emitter is None or LangChainStreamHandler is None:
+        return []
+    return [LangChainStreamHandler(emitter, node, marker)]
@@ -0,0 +1,88 @@
+# Hashed n-gram text features
+#
+# Turns text into a sparse, L2-normalised {bucket: weight} vector from word
+# unigrams/bigrams and character n-grams, using the "hashing trick" so there is no
+# vocabulary to fit or store. Used by the local intent model and anything else that
+# needs cheap CPU-only text similarity.
+import math
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+SparseVector = Dict[int, float]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class HashedNgramFeaturizer:
+    """Stateless featurizer: the same text always maps to the same sparse vector."""
+
+    def __init__(
+        self,
+        n_features: int = 1 << 18,
+        word_ngrams: Tuple[int, int] = (1, 2),
+        char_ngrams: Tuple[int, int] = (3, 4),
+    ):
+        self.n_features = n_features
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = char_ngrams
+
+    def ngrams(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        grams: List[str] = []
+        lo, hi = self.word_ngrams
+        for n in range(lo, hi + 1):
+            grams.extend("w:" + " ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        lo, hi = self.char_ngrams
+        if hi:
+            for token in tokens:
+                padded = f" {token} "
+                for n in range(lo, hi + 1):
+                    grams.extend("c:" + padded[i:i + n] for i in range(len(padded) - n + 1))
+        return grams
+
+    def transform(self, text: str) -> SparseVector:
+        """Sparse vector with signed hashing (collisions cancel instead of piling up)."""
+        vector: SparseVector = {}
+        size = self.n_features
+        get = vector.get
+        for h in map(zlib.crc32, map(str.encode, self.ngrams(text))):
+            bucket = h % size
+            vector[bucket] = get(bucket, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        return normalize(vector)
+
+    def dense(self, text: str, dim: int) -> List[float]:
+        """Fold the hashed features into a fixed-size dense, L2-normalised vector."""
+        out = [0.0] * dim
+        for bucket, weight in self.transform(text).items():
+            out[bucket % dim] += weight
+        norm = math.sqrt(sum(v * v for v in out))
+        return [v / norm for v in out] if norm else out
+
+
+def normalize(vector: SparseVector) -> SparseVector:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {k: v / norm for k, v in vector.items() if v}
+
+
+def dot(a: SparseVector, b: SparseVector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b[k] for k, v in a.items() if k in b)
+
+
+def cosine(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity of two vectors produced by transform() (already normalised)."""
+    return dot(a, b)
+
+
+def dense_cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    num = sum(x * y for x, y in zip(a, b))
+    den = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return num / den if den else 0.0